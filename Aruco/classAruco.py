@@ -32,7 +32,7 @@ class Aruco():
         """
         偵測 ArUco 標記並估算其位姿
         frame: 輸入的影像
-        cameraMatrix: 相機內部參數矩陣
+        cameraMatrix: 相機內部參數矩陣，或CameraModel(此時distCoeffs可為None，使用模型的畸變係數)
         distCoeffs: 相機畸變係數
         arucoLength: ArUco 標記的長度(Meter)
         isDrawAruco: 是否在影像上繪製 ArUco 標記(預設為False)
@@ -49,7 +49,8 @@ class Aruco():
         if len(corners) == 0:
             return False, [], [], [], []
         
-        rotationVectors, translationVectors, markerPoints = cv2.aruco.estimatePoseSingleMarkers(corners, arucoLength, cameraMatrix, distCoeffs)
+        camera = getCameraModel(cameraMatrix, distCoeffs) # 同一組參數共用已轉換好的矩陣
+        rotationVectors, translationVectors, markerPoints = cv2.aruco.estimatePoseSingleMarkers(corners, arucoLength, camera.cameraMatrix, camera.distCoeffs)
 
         transformMatrixCamToArucoResult = []
         transformMatrixArucoToCamResult = []
@@ -64,8 +65,7 @@ class Aruco():
             translationVectorCamToAruco = translationVector[0].reshape(-1, 1)
 
             # 計算相機到 ArUco 的轉換矩陣
-            translationVectorCamToAruco = combineRotationAndTranslationToHomogeneousMatrix
-            (rotationVectorCamToAruco, translationVectorCamToAruco)
+            translationVectorCamToAruco = combineRotationAndTranslationToHomogeneousMatrix(rotationVectorCamToAruco, translationVectorCamToAruco)
             
             # 計算 ArUco 到相機的轉換矩陣
             translationVectorArucoToCam = np.linalg.inv(translationVectorCamToAruco)
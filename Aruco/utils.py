@@ -1,5 +1,6 @@
 import numpy as np
 from scipy.spatial.transform import Rotation
+from utils.classCameraModel import getCameraModel
 
 def drawOrigin(rotationMatrix, translationVector, ax, scale = 1):
     """
@@ -230,40 +231,35 @@ def rotationMatrix(x, y, z):
     matrix[:, 2] = matrix[:, 2] / np.linalg.norm(matrix[:, 2])
     return matrix
 
-def depthToPointCloud(cameraMatrix, depthImg, minDist = 0, maxDist = 2):
+def getRayGrid(cameraMatrix, height, width):
     """
-    將深度圖轉換成點雲數據
-    cameraMatrix: 相機內部參數矩陣
-    depthImg: 深度圖
-    minDist: 最小距離閾值
-    maxDist: 最大距離閾值
+    取得每個像素在深度為1時的3D座標(射線)，即 cameraMatrix^-1 · (u, v, 1)
+    同一組相機內部參數與影像大小只計算一次(由getCameraModel()快取，見utils.classCameraModel)
+    cameraMatrix: 相機內部參數矩陣或CameraModel
+    height, width: 影像大小
+    return: (height, width, 3) float32 唯讀陣列
     """
-    cameraMatrixInv = np.linalg.inv(cameraMatrix) # 計算相機內部參數矩陣的逆矩陣
-    pointCloud = [] # 用於存儲點雲的空列表
-    #percent = 0
-
-    # 遍歷深度圖中的每個像素
-    for v in range(depthImg.shape[0]): # 行 (高度)
-        for u in range(depthImg.shape[1]): # 列 (寬度)
-            s = depthImg[v][u] / 1000 #z-distance(depth) in meter  # 將深度值從毫米轉換成米 (z 距離)
-
-            # 檢查深度值是否在允許的範圍內
-            if s <= minDist or s >= maxDist:
-                continue
-
-            # 創建該像素點的齊次座標 (u, v, 1)
-            w = np.array([u, v, 1]).reshape(3, 1)
+    return getCameraModel(cameraMatrix).rayGrid(height, width)
 
-            # 使用內部參數矩陣逆變換和深度值計算該點的 3D 座標
-            W = s * np.dot(cameraMatrixInv, w)
-
-            # 將計算出的 3D 點加入點雲列表
-            pointCloud.append(W)
-
-        #顯示進度百分比用的，可以註解掉    
-        percentTemp = int(v / depthImg.shape[0] * 100) + 1
-        #if percentTemp != percent:
-        #    percent = percentTemp
-        #    print(percent, "%")
-    pointCloud = np.array(pointCloud) # 將列表轉換為 NumPy 數組
-    return pointCloud.reshape((len(pointCloud), 3)) # 將點雲數據轉換成 (N, 3) 的形狀
\ No newline at end of file
+def depthToPointCloud(cameraMatrix, depthImg, minDist = 0, maxDist = 2, depthScale = 0.001, organized = False):
+    """
+    將深度圖轉換成點雲數據
+    以快取的射線(getRayGrid())乘上每個像素的深度，一次完成整張影像的反投影，不逐像素迴圈
+    cameraMatrix: 相機內部參數矩陣或CameraModel
+    depthImg: 深度圖
+    minDist: 最小距離閾值(公尺)
+    maxDist: 最大距離閾值(公尺)
+    depthScale: 深度值換算為公尺的比例(預設深度圖單位為毫米)
+    organized: 是否保留影像排列
+    return:
+    organized為False時，(N, 3) float32 陣列，只包含距離在(minDist, maxDist)之間的點，順序與逐行逐列走訪相同
+    organized為True時，(height, width, 3) float32 陣列，超出距離範圍的像素為NaN
+    """
+    depth = np.asarray(depthImg, dtype=np.float32) * np.float32(depthScale) # z-distance(depth) in meter
+    rays = getRayGrid(cameraMatrix, depth.shape[0], depth.shape[1])
+    mask = (depth > minDist) & (depth < maxDist) # 檢查深度值是否在允許的範圍內
+    if organized:
+        pointCloud = rays * depth[..., np.newaxis]
+        pointCloud[~mask] = np.nan
+        return pointCloud
+    return rays[mask] * depth[mask][:, np.newaxis]
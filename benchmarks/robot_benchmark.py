@@ -0,0 +1,187 @@
+"""
+Robot指令與狀態讀取的效能量測
+
+以simulator.DRVSimulator取代實體手臂，對每個Robot公開方法與完整流程(warp_suction_example.py的取放)
+量測每次呼叫的Modbus交易數、p50/p99延遲與吞吐量，結果以JSON輸出以便追蹤回歸。
+
+使用方法:
+python benchmarks/robot_benchmark.py --iterations 200 --latency 1 --output result.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import time
+from typing import Callable, Optional
+
+from robot import Robot, MotionQueue, eRobotCommand
+from simulator import DRVSimulator
+
+# 取放流程使用的位姿(與examples/datas/parameters.csv相同)
+HOME = [424.863, 0.328, 663.11, 178.333, -0.679, -111.784]
+PICK = [424.863, 6.568, 538.236, 178.333, -0.679, -111.784]
+DROP = [424.863, -298.637, 602.202, -148.388, 11.827, -108.439]
+ABOVE_PICK = PICK[:2] + HOME[2:3] + PICK[3:]
+ABOVE_DROP = DROP[:2] + HOME[2:3] + DROP[3:]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    最近排名法的百分位數
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(simulator: DRVSimulator,
+            name: str,
+            call: Callable[[], object],
+            iterations: int,
+            setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    重複執行call，記錄每次的耗時與模擬器收到的Modbus交易數(setup不列入計算)
+    """
+    durations, transactions = [], []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        before = simulator.totalRequests
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+        transactions.append(simulator.totalRequests - before)
+    return {
+        "name": name,
+        "iterations": iterations,
+        "transactionsPerCall": statistics.mean(transactions),
+        "meanMs": statistics.mean(durations) * 1000,
+        "p50Ms": percentile(durations, 50) * 1000,
+        "p99Ms": percentile(durations, 99) * 1000,
+        "callsPerSecond": iterations / sum(durations) if sum(durations) > 0 else None,
+    }
+
+
+def pickAndPlace(robotDRV: Robot):
+    """
+    與warp_suction_example.py的Suction_Behave相同的九個步驟，每一步都等待完成
+    """
+    for position in (ABOVE_PICK, PICK):
+        robotDRV.sendMotionCommand(position, speed=50, robotCommand=eRobotCommand.Robot_Go_MovL)
+    robotDRV.suctionON()
+    for position in (ABOVE_PICK, ABOVE_DROP, DROP):
+        robotDRV.sendMotionCommand(position, speed=50, robotCommand=eRobotCommand.Robot_Go_MovL)
+    robotDRV.suctionOFF()
+    for position in (ABOVE_DROP, HOME):
+        robotDRV.sendMotionCommand(position, speed=50, robotCommand=eRobotCommand.Robot_Go_MovL)
+
+
+def pickAndPlaceQueue(robotDRV: Robot):
+    """
+    以MotionQueue執行相同的取放流程
+    """
+    queue = MotionQueue(robotDRV, moveTimeout=30)
+    queue.append(ABOVE_PICK, speed=50)
+    queue.append(PICK)
+    queue.addAction(Robot.suctionON)
+    queue.append(ABOVE_PICK)
+    queue.append(ABOVE_DROP)
+    queue.append(DROP)
+    queue.addAction(Robot.suctionOFF)
+    queue.append(ABOVE_DROP)
+    queue.append(HOME)
+    queue.execute()
+
+
+def runBenchmarks(simulator: DRVSimulator, robotDRV: Robot, iterations: int, sequenceIterations: int) -> list[dict]:
+    targets = [HOME, PICK]
+    def nextTarget():
+        targets.reverse()
+        return targets[0]
+
+    def moveHome():
+        robotDRV.sendMotionCommand(HOME, robotCommand=eRobotCommand.Robot_Go_MovL)
+        robotDRV.waitRobotReachTargetPosition()
+
+    results = [
+        measure(simulator, "getTCPPose", robotDRV.getTCPPose, iterations),
+        measure(simulator, "getRobotPoseFlag", robotDRV.getRobotPoseFlag, iterations),
+        measure(simulator, "getRobotErrorCode", robotDRV.getRobotErrorCode, iterations),
+        measure(simulator, "getRobotWarningCode", robotDRV.getRobotWarningCode, iterations),
+        measure(simulator, "getRobotMotionState", robotDRV.getRobotMotionState, iterations),
+        measure(simulator, "getRobotStatusSnapshot", robotDRV.getRobotStatusSnapshot, iterations),
+        measure(simulator, "isRobotError", lambda: robotDRV.isRobotError, iterations),
+        measure(simulator, "isRobotReadyForMotion", lambda: robotDRV.isRobotReadyForMotion, iterations),
+        measure(simulator, "getRobotNotReadyReason", robotDRV.getRobotNotReadyReason, iterations),
+        measure(simulator, "setIO", lambda: robotDRV.setIO(0, True), iterations),
+        measure(simulator, "suctionON", robotDRV.suctionON, iterations),
+        measure(simulator, "suctionOFF", robotDRV.suctionOFF, iterations),
+        measure(simulator, "resetRobotError", robotDRV.resetRobotError, iterations),
+        measure(simulator, "sendMotionCommand(nonblocking)",
+                lambda: robotDRV.sendMotionCommand(nextTarget(), robotCommand=eRobotCommand.Robot_Go_MovL),
+                iterations, setup=robotDRV.motionStop),
+        measure(simulator, "motionStop", robotDRV.motionStop, iterations),
+        measure(simulator, "waitRobotReachTargetPosition", robotDRV.waitRobotReachTargetPosition, sequenceIterations,
+                setup=lambda: robotDRV.writeMotionCommand(eRobotCommand.Robot_Go_MovL, nextTarget())),
+    ]
+    robotDRV.block = True
+    results.append(measure(simulator, "pickAndPlace(sendMotionCommand)", lambda: pickAndPlace(robotDRV),
+                           sequenceIterations, setup=moveHome))
+    robotDRV.block = False
+    results.append(measure(simulator, "pickAndPlace(MotionQueue)", lambda: pickAndPlaceQueue(robotDRV),
+                           sequenceIterations, setup=moveHome))
+    results.append(measure(simulator, "prepareRobotForMotion(servoOff)", robotDRV.prepareRobotForMotion,
+                           sequenceIterations, setup=robotDRV.AllAxisDisable))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Robot Modbus效能量測(使用DRVSimulator)")
+    parser.add_argument("--iterations", type=int, default=100, help="單一方法的量測次數")
+    parser.add_argument("--sequence-iterations", type=int, default=5, help="運動流程的量測次數")
+    parser.add_argument("--latency", type=float, default=0.0, help="模擬的單次請求延遲(毫秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="模擬的隨機延遲上限(毫秒)")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="模擬運動時間的倍率")
+    parser.add_argument("--telemetry", type=float, default=None, help="啟用遙測輪詢的週期(秒)，不指定則不啟用")
+    parser.add_argument("--output", default=None, help="JSON輸出檔案，不指定則輸出到stdout")
+    args = parser.parse_args()
+
+    with DRVSimulator(servoEnabled=True, timeScale=args.time_scale,
+                      latency=args.latency / 1000, latencyJitter=args.jitter / 1000) as simulator:
+        robotDRV = Robot(host=simulator.host, port=simulator.port, defaultSpeed=100)
+        if args.telemetry is not None:
+            robotDRV.startTelemetry(period=args.telemetry)
+        try:
+            with contextlib.redirect_stdout(sys.stderr):    # Robot的狀態訊息不混入JSON輸出
+                results = runBenchmarks(simulator, robotDRV, args.iterations, args.sequence_iterations)
+        finally:
+            robotDRV.stopTelemetry()
+            robotDRV.connection.close()
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latencyMs": args.latency,
+            "jitterMs": args.jitter,
+            "timeScale": args.time_scale,
+            "telemetryPeriod": args.telemetry,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
-from pymodbus.payload import BinaryPayloadDecoder
-from pymodbus.constants import Endian
+from robot.poseCodec import decodePose
 import time
 from deprecated import deprecated
 import warnings
@@ -34,21 +33,8 @@ def Get_TCP_Pose(robot_client):
     if request.isError():
         raise RequestErrorExpection("Request error.")
 
-    # 從寄存器中解碼 X, Y, Z, Rx, Ry, Rz 的值
-    decoder_x = BinaryPayloadDecoder.fromRegisters(request.registers[:2], Endian.BIG, wordorder=Endian.LITTLE)
-    decoder_y = BinaryPayloadDecoder.fromRegisters(request.registers[2:4], Endian.BIG, wordorder=Endian.LITTLE)
-    decoder_z = BinaryPayloadDecoder.fromRegisters(request.registers[4:6], Endian.BIG, wordorder=Endian.LITTLE)
-    decoder_rx = BinaryPayloadDecoder.fromRegisters(request.registers[6:8], Endian.BIG, wordorder=Endian.LITTLE)
-    decoder_ry = BinaryPayloadDecoder.fromRegisters(request.registers[8:10], Endian.BIG, wordorder=Endian.LITTLE)
-    decoder_rz = BinaryPayloadDecoder.fromRegisters(request.registers[10:], Endian.BIG, wordorder=Endian.LITTLE)
-
-    # 解析每個座標，並將其縮放到米
-    x  = decoder_x.decode_32bit_int() * 0.001
-    y  = decoder_y.decode_32bit_int() * 0.001
-    z  = decoder_z.decode_32bit_int() * 0.001
-    rx = decoder_rx.decode_32bit_int() * 0.001
-    ry = decoder_ry.decode_32bit_int() * 0.001
-    rz = decoder_rz.decode_32bit_int() * 0.001
+    # 從寄存器中解碼 X, Y, Z, Rx, Ry, Rz 的值，並將其縮放到米
+    x, y, z, rx, ry, rz = decodePose(request.registers)
 
     return x , y , z , rx, ry, rz
 
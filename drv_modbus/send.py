@@ -1,5 +1,4 @@
-from pymodbus.payload import BinaryPayloadBuilder
-from pymodbus.constants import Endian
+from robot.poseCodec import encodePose
 from drv_modbus import request
 from pymodbus.client import ModbusTcpClient
 from deprecated import deprecated
@@ -27,26 +26,14 @@ def Go_Position(c, *args, speed=20, mov=0, block=True):
         block: 是否阻塞直到動作完成 (預設為 True)
     """
     
-    builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-    
     # 如果傳入的是單獨的 x, y, z, rx, ry, rz
     if len(args) == 6:
-        x, y, z, rx, ry, rz = args
-        builder.add_32bit_int(int(x * 1000))
-        builder.add_32bit_int(int(y * 1000))
-        builder.add_32bit_int(int(z * 1000))
-        builder.add_32bit_int(int(rx * 1000))
-        builder.add_32bit_int(int(ry * 1000))
-        builder.add_32bit_int(int(rz * 1000))
+        payload = encodePose(args)
     # 如果傳入的是一個包含 x, y, z, rx, ry, rz 的 list
     elif len(args) == 1 and isinstance(args[0], list) and len(args[0]) == 6:
-        Pose = args[0]
-        for element in Pose:
-            builder.add_32bit_int(int(element * 1000))
+        payload = encodePose(args[0])
     else:
         raise ValueError("參數錯誤，應傳入 6 個座標值或一個包含 6 個值的 list")
-    
-    payload = builder.to_registers()
 
     # 設置移動速度和目標位姿
     c.write_register(0x0324, speed, 2)
@@ -10,6 +10,10 @@ from pymodbus.client import ModbusTcpClient
 import robot
 import utils
 
+#吸盤旁有真空感測器時改為True，以感測器狀態取代固定的等待時間
+#(感測器需接在DI_0，且DI寄存器位址0x02FA尚未在實機確認，見robot/registerMap.py)
+useVacuumSensor = False
+
 if __name__   == "__main__":
     
     parameters = utils.readListFromCsv("examples/datas/parameters.csv")
@@ -34,7 +38,7 @@ if __name__   == "__main__":
     if ret == False:
         print(f"機器人無法進入準備狀態,error code:{robotDRV.getRobotNotReadyReason()}")
         exit()
-    robotDRV.startMonitorErrors()#開始監測Error，若監測到Error就會raise 
+    robotDRV.startMonitorErrors(callback=lambda event: print(event))#開始監測Error，錯誤碼改變時呼叫callback，等待運動完成時若發生Error就會raise
     #robotDRV.stopMonitorErrors()#停止監測Error(如果你需要的話)
     try:
     
@@ -71,9 +75,16 @@ if __name__   == "__main__":
         
         
         robotDRV.suctionON()
-        time.sleep(2)
+        if useVacuumSensor:
+            robotDRV.io.nameInputs(vacuum=0)#真空感測器接在DI_0(請依實際配線修改)
+            robotDRV.waitForInput("vacuum", True, timeout=2)#等待真空建立，取代固定time.sleep(2)，逾時會raise TimeoutError
+        else:
+            time.sleep(2)
         robotDRV.suctionOFF()
-        time.sleep(2)
+        if useVacuumSensor:
+            robotDRV.waitForInput("vacuum", False, timeout=2)
+        else:
+            time.sleep(2)
         robotDRV.setIO(int(0b10010101))#設定io(以2進制輸入)
         time.sleep(2)
         robotDRV.setIO(10,True)#設定特定bit
@@ -8,6 +8,7 @@ import threading
 import time
 
 from robot.classRobot import Robot
+from robot.classJogSession import JogSession
 from robot.enumRobotCommand import eRobotCommand
 from pymodbus.client import ModbusTcpClient
 import utils
@@ -20,7 +21,7 @@ isTabbed=False
 R_TRIG_tab = utils.R_TRIG()
 robotCommand:eRobotCommand = None
 stop_event = threading.Event()  # 使用 Event 來控制線程停止
-img = None
+grabber = realsense.Get_Camera().createFrameGrabber()  # 背景取像，隨時可取得最新的影像
 
 def save_image(image_folder, image, namespace):
     if not os.path.exists(image_folder):
@@ -38,22 +39,28 @@ def save_image(image_folder, image, namespace):
     image_path = os.path.join(image_folder, f'{namespace}_{latest_image_number + 1}.jpg')
     cv2.imwrite(image_path, image)
     
-def sendMotionCommand(robotDRV:Robot, stop_event:threading.Event):
+def sendMotionCommand(session:JogSession, stop_event:threading.Event):
     while not stop_event.is_set():  # 檢查 Event 是否被設置
         if robotCommand is not None:
-            robotDRV.sendMotionCommand(robotCommand=robotCommand)
+            session.jog(robotCommand)#方向不變時不會重複寫入，只重設看門狗；此迴圈停止超過0.5秒會自動停止JOG
         time.sleep(0.1)
+    session.close()
 
 def realsense_thread(stop_event:threading.Event):
-    global img
+    sequence = 0
     while not stop_event.is_set():
-        img = realsense.Get_RGB_Frame()
-        cv2.imshow("RGB",img)
+        try:
+            packet = grabber.waitForFrame(sequence, timeout=1)  # 只等待新的影像，顯示較慢時跳過舊的
+        except (TimeoutError, RuntimeError):
+            continue
+        sequence = packet.sequence
+        cv2.imshow("RGB",packet.color)
         cv2.waitKey(1)
+    grabber.stop()
 
 # 定義鍵盤按下事件
 def on_press(key):
-    global isTabbed,robotCommand,img#宣告有使用到全局變數
+    global isTabbed,robotCommand#宣告有使用到全局變數
     print(f"{key} pressed")
     try:
         print(robotDRV.getTCPPose())
@@ -61,7 +68,9 @@ def on_press(key):
             isTabbed = not isTabbed 
             print (f"isTabbed is {isTabbed}")
         if key == keyboard.Key.f1:
-            save_image("images_test",img,"img")
+            packet = grabber.latest()
+            if packet is not None:
+                save_image("images_test",packet.color,"img")
         if not isTabbed :   
             if key == keyboard.Key.up:  # 按上箭頭，向-x方向移動
                 robotCommand = eRobotCommand.Continue_JOG_X_Negative
@@ -128,7 +137,9 @@ if __name__ == "__main__":
         print("機器人無法進入準備狀態")
         exit()
         
-    threading.Thread(target=sendMotionCommand, args=(robotDRV, stop_event)).start()
+    session = robotDRV.startJogSession(deadmanTimeout=0.5)#只檢查一次是否可運動
+    threading.Thread(target=sendMotionCommand, args=(session, stop_event)).start()
+    grabber.start()
     threading.Thread(target=realsense_thread, args=(stop_event,)).start()
     
     # 啟動鍵盤監聽器，持續監聽鍵盤事件
@@ -8,6 +8,7 @@ import threading
 import time
 
 from robot.classRobot import Robot
+from robot.classJogSession import JogSession
 from robot.enumRobotCommand import eRobotCommand
 from pymodbus.client import ModbusTcpClient
 import utils
@@ -18,11 +19,12 @@ R_TRIG_tab = utils.R_TRIG()
 robotCommand:eRobotCommand = None
 stop_event = threading.Event()  # 使用 Event 來控制線程停止
 
-def sendMotionCommand(robotDRV:Robot, stop_event:threading.Event):
+def sendMotionCommand(session:JogSession, stop_event:threading.Event):
     while not stop_event.is_set():  # 檢查 Event 是否被設置
         if robotCommand is not None:
-            robotDRV.sendMotionCommand(robotCommand=robotCommand)
+            session.jog(robotCommand)#方向不變時不會重複寫入，只重設看門狗；此迴圈停止超過0.5秒會自動停止JOG
         time.sleep(0.1)
+    session.close()
 
 # 定義鍵盤按下事件
 def on_press(key):
@@ -99,7 +101,8 @@ if __name__ == "__main__":
         print("機器人無法進入準備狀態")
         exit()
         
-    threading.Thread(target=sendMotionCommand, args=(robotDRV, stop_event)).start()
+    session = robotDRV.startJogSession(deadmanTimeout=0.5)#只檢查一次是否可運動
+    threading.Thread(target=sendMotionCommand, args=(session, stop_event)).start()
 
     # 啟動鍵盤監聽器，持續監聽鍵盤事件
     with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
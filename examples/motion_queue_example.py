@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from robot import Robot, MotionQueue
+from pymodbus.client import ModbusTcpClient
+import robot
+import utils
+
+"""
+以MotionQueue執行一次取放(與warp_suction_example.py的Suction_Behave相同的九個步驟)
+所有位姿在加入佇列時就已編碼，執行時只檢查一次機器人狀態，並在上一步完成後立即送出下一步
+"""
+
+if __name__ == "__main__":
+    parameters = utils.readListFromCsv("examples/datas/parameters.csv")
+    modbusTCPClient = ModbusTcpClient(host=parameters["host"], port=parameters["port"])
+    robotDRV = Robot(modbusTCPClient)
+
+    if not robotDRV.prepareRobotForMotion():
+        print(f"機器人無法進入準備狀態,error code:{robotDRV.getRobotNotReadyReason()}")
+        exit()
+
+    home = parameters["readyPosition"]
+    pick = parameters["workPosition"]
+    drop = parameters["workPosition2"]
+    abovePick = pick[:2] + home[2:3] + pick[3:]
+    aboveDrop = drop[:2] + home[2:3] + drop[3:]
+
+    queue = MotionQueue(robotDRV, moveTimeout=30)
+    queue.append(abovePick, speed=50, acceleration=50, deceleration=50)
+    queue.append(pick)
+    queue.addAction(Robot.suctionON)
+    queue.append(abovePick)
+    queue.append(aboveDrop)
+    queue.append(drop)
+    queue.addAction(Robot.suctionOFF)
+    queue.append(aboveDrop)
+    queue.append(home)
+
+    try:
+        for progress in queue.run():
+            print(f"步驟 {progress.index + 1}/{progress.total} 完成，經過 {progress.elapsed:.2f} 秒")
+    except robot.RobotErrorException as e:
+        print(e)
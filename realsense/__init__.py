@@ -1 +1,4 @@
-from .realsense import *
\ No newline at end of file
+from .realsense import *
+from .classRealSense import *
+from .classFrameGrabber import *
+from .classDepthProcessor import *
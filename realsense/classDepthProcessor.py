@@ -0,0 +1,149 @@
+from typing import Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+# 依RealSense建議的順序排列，spatial/temporal在視差(disparity)空間中處理效果較好
+DEPTH_FILTER_ORDER = ("decimation", "depthToDisparity", "spatial", "temporal", "disparityToDepth", "holeFilling")
+
+
+class DepthProcessor:
+    """
+    持續使用的深度濾波流程與點雲計算
+
+    濾波器只建立一次並依序串接(每個濾波器處理前一個的輸出)，
+    temporal濾波器因此能保留跨幀、跨呼叫的歷史；stream()逐幀產生點雲，不需每次重新取樣多幀。
+
+    使用方法:
+    processor = DepthProcessor(spatial=True, temporal=True, holeFilling=True, useDisparity=True)
+    points = processor.capture(camera.pipeline, sampleLength=10)   # 以10幀暖機temporal濾波器後的點雲
+    for points in processor.stream(camera.pipeline):               # 逐幀產生點雲
+        ...
+    """
+    def __init__(self,
+                 decimation: bool = False,
+                 spatial: bool = False,
+                 temporal: bool = False,
+                 holeFilling: bool = False,
+                 useDisparity: bool = False,
+                 filterOptions: Optional[Mapping[str, Mapping[str, float]]] = None,
+                 filters: Optional[Sequence] = None,
+                 pointCloud=None):
+        """
+        參數:
+        decimation: 稀疏濾波，減少深度場景的複雜性(降低解析度)
+        spatial: 空間濾波，保留邊緣的平滑
+        temporal: 時間濾波，根據之前的幀平滑深度數據
+        holeFilling: 填補濾波，修復深度影像中的缺失數據
+        useDisparity: spatial/temporal前將深度轉換為視差，處理後再轉換回深度
+        filterOptions: 濾波器參數，名稱(DEPTH_FILTER_ORDER) -> {rs.option的成員名稱: 值}，
+                       例如{"spatial": {"filter_magnitude": 2}}
+        filters: 直接指定依序處理的濾波器(有process(frame)的物件)，指定時忽略上面的選項
+        pointCloud: 計算點雲的物件(rs.pointcloud)，None表示自動建立
+        """
+        enabled = {"decimation": decimation, "spatial": spatial, "temporal": temporal, "holeFilling": holeFilling,
+                   "depthToDisparity": useDisparity, "disparityToDepth": useDisparity}
+        self.__enabled = [name for name in DEPTH_FILTER_ORDER if enabled[name]]
+        self.__filterOptions = dict(filterOptions or {})
+        self.__customFilters = filters is not None
+        self.filters = list(filters) if filters is not None else self.__createFilters()
+        self.__pointCloud = pointCloud
+        self.frameCount = 0     # 已處理的深度幀數
+
+    def reset(self):
+        """
+        重新建立濾波器，清除temporal濾波器的歷史(場景或相機位置改變時呼叫)
+        """
+        if not self.__customFilters:
+            self.filters = self.__createFilters()
+        self.frameCount = 0
+
+    def process(self, depthFrame):
+        """
+        依序以所有濾波器處理一張深度幀
+
+        參數:
+        depthFrame: rs.depth_frame(或rs.composite_frame，會取出其中的深度幀)
+
+        返回:
+        處理後的幀
+        """
+        if hasattr(depthFrame, "get_depth_frame"):
+            depthFrame = depthFrame.get_depth_frame()
+        frame = depthFrame
+        for depthFilter in self.filters:
+            frame = depthFilter.process(frame)
+        self.frameCount += 1
+        return frame
+
+    def pointCloudOf(self, depthFrame, removeInvalid: bool = False) -> np.ndarray:
+        """
+        計算(已處理的)深度幀的點雲
+
+        參數:
+        depthFrame: 深度幀
+        removeInvalid: 是否移除沒有深度(z為0)的點
+
+        返回:
+        np.ndarray: (N, 3) float32，單位為公尺
+        """
+        if self.__pointCloud is None:
+            import pyrealsense2 as rs
+            self.__pointCloud = rs.pointcloud()
+        points = self.__pointCloud.calculate(depthFrame)
+        verts = np.asanyarray(points.get_vertices()).view(np.float32).reshape(-1, 3) # 將頂點數據轉換為浮點數陣列
+        if removeInvalid:
+            verts = verts[verts[:, 2] > 0]
+        return verts
+
+    def capture(self, pipeline, sampleLength: int = 1, removeInvalid: bool = False, timeoutMs: int = 5000) -> np.ndarray:
+        """
+        連續處理sampleLength幀，返回最後一幀的點雲(多幀讓temporal濾波器累積歷史)
+
+        參數:
+        pipeline: 已啟動的rs.pipeline
+        sampleLength: 取樣的幀數
+        removeInvalid: 是否移除沒有深度的點
+        timeoutMs: 等待每一幀的逾時(毫秒)
+        """
+        if sampleLength < 1:
+            raise ValueError("sampleLength必須大於0")
+        for _ in range(sampleLength):
+            frame = self.process(pipeline.wait_for_frames(timeoutMs))
+        return self.pointCloudOf(frame, removeInvalid)
+
+    def stream(self, pipeline, count: Optional[int] = None, removeInvalid: bool = False,
+               timeoutMs: int = 5000) -> Iterator[np.ndarray]:
+        """
+        逐幀處理並產生點雲
+
+        參數:
+        pipeline: 已啟動的rs.pipeline
+        count: 產生幾個點雲，None表示不限
+        removeInvalid: 是否移除沒有深度的點
+        timeoutMs: 等待每一幀的逾時(毫秒)
+        """
+        produced = 0
+        while count is None or produced < count:
+            yield self.pointCloudOf(self.process(pipeline.wait_for_frames(timeoutMs)), removeInvalid)
+            produced += 1
+
+    def __createFilters(self) -> list:
+        if not self.__enabled:
+            return []
+        import pyrealsense2 as rs   # 使用時才載入
+
+        factories = {
+            "decimation": rs.decimation_filter,
+            "depthToDisparity": lambda: rs.disparity_transform(True),
+            "spatial": rs.spatial_filter,
+            "temporal": rs.temporal_filter,
+            "disparityToDepth": lambda: rs.disparity_transform(False),
+            "holeFilling": rs.hole_filling_filter,
+        }
+        filters = []
+        for name in self.__enabled:
+            depthFilter = factories[name]()
+            for option, value in self.__filterOptions.get(name, {}).items():
+                depthFilter.set_option(getattr(rs.option, option), value)
+            filters.append(depthFilter)
+        return filters
@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+RETRY_BACKOFF_MIN = 0.01            # 取像立即失敗後第一次重試前的等待(秒)，之後每次加倍，最多timeoutMs
+
+
+class FramePacket(NamedTuple):
+    """
+    一組RealSense影像(同一個frameset的彩色與深度)
+
+    sequence: FrameGrabber收到的第幾組(從1開始，用來判斷是否為新的影像)
+    frameNumber: 相機的幀編號
+    timestamp: 相機的時間戳記(毫秒)
+    receivedTime: 收到的時間(time.monotonic)
+    color: 彩色影像(H, W, 3)，沒有彩色串流時為None
+    depth: 深度影像(H, W) uint16，沒有深度串流時為None
+    frameset: 原始的rs.composite_frame，color/depth直接指向其記憶體，持有它才能保證陣列有效
+    """
+    sequence: int
+    frameNumber: int
+    timestamp: float
+    receivedTime: float
+    color: Optional[np.ndarray]
+    depth: Optional[np.ndarray]
+    frameset: object
+
+    @property
+    def age(self) -> float:
+        """
+        收到至今經過的時間(秒)
+        """
+        return time.monotonic() - self.receivedTime
+
+
+class FrameGrabber:
+    """
+    在背景執行緒持續取得RealSense影像，只保留最新的幾組(信箱)
+
+    取代在處理迴圈中直接呼叫pipeline.wait_for_frames()：處理影像時相機仍持續收幀，
+    處理完再取最新的一組，不會因為等待USB傳輸而阻塞，也不會讀到累積在佇列中的舊影像。
+    color/depth為直接指向相機幀記憶體的唯讀NumPy陣列(不複製)，需要修改或長期保存時請自行copy()。
+
+    使用方法:
+    with FrameGrabber(realsense.pipeline) as grabber:
+        for packet in grabber.frames():
+            cv2.imshow("RGB", packet.color)
+    """
+    def __init__(self,
+                 pipeline,
+                 bufferSize: int = 1,
+                 timeoutMs: int = 1000,
+                 processFrameset: Optional[Callable[[object], object]] = None,
+                 maxFailures: int = 10):
+        """
+        參數:
+        pipeline: 已啟動的rs.pipeline(或任何有wait_for_frames(timeoutMs)的物件)
+        bufferSize: 保留最近幾組影像(recent())，持有的幀越多，相機幀池越容易不足，建議1~4
+        timeoutMs: 等待一組影像的逾時(毫秒)，逾時不會停止執行緒
+        processFrameset: 收到frameset後的處理(例如rs.align(rs.stream.color).process)，在背景執行緒中執行
+        maxFailures: 連續幾次「沒有等到逾時就失敗」(例如pipeline已停止)後停止取像執行緒，
+                     此時failure為最後的例外，waitForFrame()與frames()會拋出RuntimeError
+        """
+        if bufferSize < 1:
+            raise ValueError("bufferSize必須大於0")
+        self.__pipeline = pipeline
+        self.timeoutMs = timeoutMs
+        self.processFrameset = processFrameset
+        self.__buffer: deque[FramePacket] = deque(maxlen=bufferSize)
+        self.__condition = threading.Condition()
+        self.__sequence = 0
+        self.__stopEvent = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.maxFailures = maxFailures
+        self.errorCount = 0                             # 取得影像失敗(逾時或錯誤)的次數
+        self.lastError: Optional[Exception] = None
+        self.failure: Optional[Exception] = None        # 讓取像執行緒停止的例外
+
+    def __enter__(self) -> "FrameGrabber":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def isRunning(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def frameCount(self) -> int:
+        """
+        已收到的影像組數
+        """
+        return self.__sequence
+
+    def start(self):
+        """
+        啟動取像執行緒(pipeline需已啟動)
+        """
+        if self.isRunning:
+            return
+        self.failure = None
+        self.__stopEvent.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        停止取像執行緒(不會停止pipeline)，等待中的waitForFrame()會拋出RuntimeError
+        """
+        self.__stopEvent.set()
+        with self.__condition:
+            self.__condition.notify_all()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def latest(self) -> Optional[FramePacket]:
+        """
+        最新的一組影像(不等待)，尚未收到任何影像時為None
+        """
+        with self.__condition:
+            return self.__buffer[-1] if self.__buffer else None
+
+    def recent(self) -> list[FramePacket]:
+        """
+        保留中的影像，由舊到新(最多bufferSize組)
+        """
+        with self.__condition:
+            return list(self.__buffer)
+
+    def waitForFrame(self, after: int = 0, timeout: Optional[float] = None) -> FramePacket:
+        """
+        等待比after更新的影像並返回最新的一組
+
+        參數:
+        after: 上一次處理的sequence，0表示任何影像
+        timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+
+        返回:
+        FramePacket: sequence > after 的最新影像
+        """
+        with self.__condition:
+            ready = self.__condition.wait_for(
+                lambda: self.__sequence > after or self.__stopEvent.is_set(), timeout)
+            if self.__sequence > after:
+                return self.__buffer[-1]
+            if not ready:
+                raise TimeoutError(f"等待影像逾時({timeout}秒)")
+            if self.failure is not None:
+                raise RuntimeError(f"FrameGrabber因錯誤停止: {self.failure}") from self.failure
+            raise RuntimeError("FrameGrabber已停止")
+
+    def frames(self, timeout: Optional[float] = None) -> Iterator[FramePacket]:
+        """
+        逐一產生新的影像，處理較慢時跳過中間的影像(每次都是最新的一組)，
+        以stop()停止時結束，因錯誤停止時拋出RuntimeError
+
+        參數:
+        timeout: 等待每一組影像的最長時間(秒)，逾時拋出TimeoutError
+        """
+        sequence = 0
+        while not self.__stopEvent.is_set():
+            try:
+                packet = self.waitForFrame(sequence, timeout)
+            except RuntimeError:
+                if self.failure is not None:
+                    raise
+                return      # 已停止
+            sequence = packet.sequence
+            yield packet
+        if self.failure is not None:
+            # 處理影像期間取像執行緒因錯誤停止
+            raise RuntimeError(f"FrameGrabber因錯誤停止: {self.failure}") from self.failure
+
+    def __run(self):
+        backoff = RETRY_BACKOFF_MIN
+        failures = 0
+        while not self.__stopEvent.is_set():
+            startTime = time.monotonic()
+            try:
+                frameset = self.__pipeline.wait_for_frames(self.timeoutMs)
+                if self.processFrameset is not None:
+                    frameset = self.processFrameset(frameset)
+                packet = self.__makePacket(frameset)
+            except Exception as e:
+                self.errorCount += 1
+                self.lastError = e
+                if time.monotonic() - startTime >= self.timeoutMs / 2000:
+                    # 等待到逾時，相機暫時沒有影像，直接重試
+                    failures = 0
+                    backoff = RETRY_BACKOFF_MIN
+                    continue
+                # 立即失敗(例如pipeline已停止)，等待後重試，避免空轉佔用GIL
+                failures += 1
+                if failures >= self.maxFailures:
+                    self.__fail(e)
+                    return
+                self.__stopEvent.wait(backoff)
+                backoff = min(backoff * 2, self.timeoutMs / 1000)
+                continue
+            failures = 0
+            backoff = RETRY_BACKOFF_MIN
+            with self.__condition:
+                self.__buffer.append(packet)
+                self.__sequence = packet.sequence
+                self.__condition.notify_all()
+
+    def __fail(self, error: Exception):
+        self.failure = error
+        self.__stopEvent.set()
+        with self.__condition:
+            self.__condition.notify_all()
+
+    def __makePacket(self, frameset) -> FramePacket:
+        colorFrame = frameset.get_color_frame()
+        depthFrame = frameset.get_depth_frame()
+        return FramePacket(self.__sequence + 1,
+                           frameset.get_frame_number(),
+                           frameset.get_timestamp(),
+                           time.monotonic(),
+                           self.__asArray(colorFrame),
+                           self.__asArray(depthFrame),
+                           frameset)
+
+    @staticmethod
+    def __asArray(frame) -> Optional[np.ndarray]:
+        if not frame:
+            return None
+        array = np.asanyarray(frame.get_data())    # 不複製，直接指向幀的記憶體
+        array.flags.writeable = False
+        return array
@@ -1,123 +1,198 @@
-import pyrealsense2 as rs
+import threading
+import weakref
+from typing import Mapping, NamedTuple, Optional, Sequence
+
 import numpy as np
 
-# 建立 RealSense 管線，這是一個封裝了相機流和處理功能的物件
-pipeline = rs.pipeline()
-# 配置管線 (可以用來設定流的參數，如解析度、幀率等)
-config = rs.config()
-#config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
+from utils.classCameraModel import CameraModel
+from realsense.classFrameGrabber import FrameGrabber
 
-# 開始管線，啟動相機的數據流
-pipeline.start(config)
 
-# 在 pipeline 啟動後，設置相機的曝光參數
-color_sensor = pipeline.get_active_profile().get_device().query_sensors()[1]  # 獲取彩色影像傳感器
-#color_sensor.set_option(rs.option.enable_auto_exposure, 1)  # 禁用自動曝光
-#color_sensor.set_option(rs.option.exposure, 100)  # 設置手動曝光值，根據需求調整曝光值
+class StreamProfile(NamedTuple):
+    """
+    要啟用的串流設定(對應config.enable_stream())
 
-# 創建點雲物件，用於計算和處理點雲數據
-pc = rs.pointcloud()
+    stream: 串流名稱，rs.stream的成員名稱，例如"color"、"depth"、"infrared"
+    width, height: 解析度
+    format: rs.format的成員名稱，例如"rgb8"、"bgr8"、"z16"，None表示由相機決定
+    fps: 幀率
+    """
+    stream: str
+    width: int = 640
+    height: int = 480
+    format: Optional[str] = None
+    fps: int = 30
 
 
-def Get_Depth_K():
-    """
-    取得深度相機的內部參數矩陣 K
-    K 是 3x3 的相機內部參數矩陣，包含焦距和主點偏移
-    """
-    profile = pipeline.get_active_profile()# 獲取當前的相機配置
-    depth_profile = rs.video_stream_profile(profile.get_stream(rs.stream.depth)) # 獲取深度流的配置
-    depth_intrinsics = depth_profile.get_intrinsics() # 獲取深度相機的內部參數 (焦距、主點偏移等)
-    
-    # 構建 3x3 的相機內部參數矩陣
-    K = np.zeros((3, 3))
-    K[0][0] = depth_intrinsics.fx # x 軸的焦距
-    K[0][2] = depth_intrinsics.ppx # 主點在 x 軸的偏移
-    K[1][1] = depth_intrinsics.fy # y 軸的焦距
-    K[1][2] = depth_intrinsics.ppy # 主點在 y 軸的偏移
-    K[2][2] = 1 # 齊次坐標矩陣的最後一行固定為 [0, 0, 1]
-    return K
-
-def Get_Color_K():
-    """
-    取得彩色相機的內部參數矩陣 K
-    K 是 3x3 的相機內部參數矩陣，包含焦距和主點偏移
-    """
-    profile = pipeline.get_active_profile() # 獲取當前的相機配置
-    color_profile = rs.video_stream_profile(profile.get_stream(rs.stream.color)) # 獲取彩色流的配置
-    color_intrinsics = color_profile.get_intrinsics() # 獲取彩色相機的內部參數 (焦距、主點偏移等)
-    
-    # 構建 3x3 的相機內部參數矩陣
-    K = np.zeros((3, 3))
-    K[0][0] = color_intrinsics.fx # x 軸的焦距
-    K[0][2] = color_intrinsics.ppx # 主點在 x 軸的偏移
-    K[1][1] = color_intrinsics.fy # y 軸的焦距
-    K[1][2] = color_intrinsics.ppy # 主點在 y 軸的偏移
-    K[2][2] = 1 # 齊次坐標矩陣的最後一行固定為 [0, 0, 1]
-    return K
-
-# 取得彩色影像幀，並將其轉換為 NumPy 陣列
-def Get_RGB_Frame():
-    frame = pipeline.wait_for_frames()  # 等待新的一組幀 (彩色和深度)
-    color_frame = frame.get_color_frame()  # 從幀中提取彩色影像
-    return np.asarray(color_frame.get_data())  # 將彩色影像數據轉換為 NumPy 陣列並返回
-
-
-def Get_PointCloud(sample_length = 10, 
-                   is_decimation_filter = False, 
-                   is_spatial_filter = False, 
-                   is_temporal_filter = False, 
-                   is_hole_filling_filter = False,
-                   is_depth_to_disparity = False,
-                   is_disparity_to_depth = False):
+class RealSenseCamera:
     """
-    
-    取得點雲數據
-    sample_length: 取樣的幀數, is_decimation_filter: 是否使用稀疏濾波, is_spatial_filter: 是否使用空間濾波
-    is_temporal_filter: 是否使用時間濾波, is_hole_filling_filter: 是否使用洞填補濾波
-    is_depth_to_disparity: 是否將深度轉換為視差, is_disparity_to_depth: 是否將視差轉換為深度
+    RealSense相機
+
+    建立物件時不會連線相機，第一次需要影像(或呼叫start())時才啟動管線，
+    因此只import套件而不使用相機的程式不需要等待相機啟動，也能在沒有相機(或沒有安裝pyrealsense2)的環境import。
+
+    使用方法:
+    with RealSenseCamera([StreamProfile("color", 640, 480, "rgb8", 30),
+                          StreamProfile("depth", 640, 480, "z16", 30)]) as camera:
+        K = camera.getColorK()
+        frame = camera.getRGBFrame()
     """
+    def __init__(self,
+                 streams: Optional[Sequence[StreamProfile]] = None,
+                 serialNumber: Optional[str] = None,
+                 colorOptions: Optional[Mapping[str, float]] = None):
+        """
+        參數:
+        streams: 要啟用的串流，None表示使用相機預設的串流
+        serialNumber: 指定相機序號(連接多台相機時)，None表示第一台
+        colorOptions: 啟動後設定的彩色感測器參數，rs.option的成員名稱 -> 值，
+                      例如{"enable_auto_exposure": 0, "exposure": 100}
+        """
+        self.streams = tuple(streams or ())
+        self.serialNumber = serialNumber
+        self.colorOptions = dict(colorOptions or {})
+        self.__lock = threading.RLock()
+        self.__pipeline = None
+        self.__profile = None
+        self.__cameraModels: dict[str, CameraModel] = {}
+        self.__grabbers: "weakref.WeakSet[FrameGrabber]" = weakref.WeakSet()   # createFrameGrabber()建立的取像器
+
+    def __enter__(self) -> "RealSenseCamera":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def isStarted(self) -> bool:
+        return self.__pipeline is not None
+
+    @property
+    def pipeline(self):
+        """
+        rs.pipeline(尚未啟動時會先啟動)
+        """
+        self.start()
+        return self.__pipeline
+
+    @property
+    def profile(self):
+        """
+        啟動後的rs.pipeline_profile(尚未啟動時會先啟動)
+        """
+        self.start()
+        return self.__profile
+
+    @property
+    def colorSensor(self):
+        """
+        彩色影像感測器，可以用來設定曝光等參數
+        """
+        return self.profile.get_device().first_color_sensor()
+
+    def start(self):
+        """
+        啟動管線(已啟動時不做任何事)
+        """
+        with self.__lock:
+            if self.__pipeline is not None:
+                return
+            import pyrealsense2 as rs   # 使用相機時才載入
+
+            config = rs.config()
+            if self.serialNumber is not None:
+                config.enable_device(self.serialNumber)
+            for stream in self.streams:
+                if stream.format is None:
+                    config.enable_stream(getattr(rs.stream, stream.stream), stream.width, stream.height, stream.fps)
+                else:
+                    config.enable_stream(getattr(rs.stream, stream.stream), stream.width, stream.height,
+                                         getattr(rs.format, stream.format), stream.fps)
+            pipeline = rs.pipeline()
+            profile = pipeline.start(config)
+            try:
+                if self.colorOptions:
+                    sensor = profile.get_device().first_color_sensor()
+                    for option, value in self.colorOptions.items():
+                        sensor.set_option(getattr(rs.option, option), value)
+            except Exception:
+                pipeline.stop()
+                raise
+            self.__pipeline = pipeline
+            self.__profile = profile
+
+    def stop(self):
+        """
+        停止管線(會先停止createFrameGrabber()建立的取像器)，之後再次使用時會重新啟動
+        """
+        with self.__lock:
+            if self.__pipeline is None:
+                return
+            pipeline = self.__pipeline
+            self.__pipeline = None
+            self.__profile = None
+            self.__cameraModels.clear()     # 重新啟動後的串流設定可能不同
+            for grabber in list(self.__grabbers):
+                grabber.stop()
+            self.__grabbers.clear()
+            pipeline.stop()
+
+    ##################################################################
+
+    def getCameraModel(self, stream: str = "color") -> CameraModel:
+        """
+        取得串流的相機模型(內部參數、畸變係數，以及依解析度快取的射線與去畸變映射表)
+        每次啟動後第一次呼叫時由串流配置讀取內部參數，之後直接返回快取的物件
+
+        參數:
+        stream: 串流名稱("color"、"depth")或rs.stream
+        """
+        name = stream if isinstance(stream, str) else stream.name
+        with self.__lock:
+            model = self.__cameraModels.get(name)
+            if model is None:
+                import pyrealsense2 as rs
+
+                streamProfile = rs.video_stream_profile(self.profile.get_stream(getattr(rs.stream, name)))
+                model = CameraModel.fromIntrinsics(streamProfile.get_intrinsics()) # 焦距、主點偏移與畸變係數
+                self.__cameraModels[name] = model
+            return model
+
+    def getColorK(self) -> np.ndarray:
+        """
+        彩色相機的3x3內部參數矩陣K(焦距與主點偏移)
+        """
+        return self.getCameraModel("color").cameraMatrix.copy()
+
+    def getDepthK(self) -> np.ndarray:
+        """
+        深度相機的3x3內部參數矩陣K(焦距與主點偏移)
+        """
+        return self.getCameraModel("depth").cameraMatrix.copy()
+
+    def getDepthScale(self) -> float:
+        """
+        深度值換算為公尺的比例
+        """
+        return self.profile.get_device().first_depth_sensor().get_depth_scale()
+
+    def waitForFrames(self, timeoutMs: int = 5000):
+        """
+        等待下一組影像(rs.composite_frame)
+        """
+        return self.pipeline.wait_for_frames(timeoutMs)
+
+    def getRGBFrame(self) -> np.ndarray:
+        """
+        等待並返回下一張彩色影像
+        """
+        return np.asarray(self.waitForFrames().get_color_frame().get_data())
 
-    # 將 RealSense 點雲輸出為 np array (nx3)
-    # 初始化濾波器對象 (這邊可以簡單理解為影像前置處理)
-    #output realsense point cloud as a np array(nx3)
-    #Effectively reduces the depth scene complexity
-    decimation = rs.decimation_filter() # 稀疏濾波器，減少深度場景的複雜性
-    #1D edge-preserving spatial filter using high-order domain transform
-    spatial = rs.spatial_filter() # 空間濾波器，用於保留 1D 邊緣
-    #The temporal filter is intended to improve the depth data persistency by manipulating per-pixel values based on previous frames
-    temporal = rs.temporal_filter() # 時間濾波器，用於根據之前幀數平滑深度數據
-    #The filter implements several methods to rectify missing data in the resulting image
-    hole_filling = rs.hole_filling_filter() # 填補濾波器，用於修復深度影像中的缺失數據
-
-    depth_to_disparity = rs.disparity_transform(True)  # 將深度轉換為視差
-    disparity_to_depth = rs.disparity_transform(False)  # 將視差轉換為深度
-
-
-    # 創建幀列表，並從相機讀取 sample_length 個深度幀
-    frames_list = []
-    for f in range(sample_length):
-        frame = pipeline.wait_for_frames() # 等待新的幀
-        frames_list.append(frame.get_depth_frame()) # 提取深度幀並加入列表
-    
-    
-    # 開始處理點雲，從第一個幀開始
-    processed_frame = frames_list[0]
-    # 根據function輸入參數，決定是否啟用對應的濾波器
-    for f in frames_list:
-        if is_decimation_filter:
-            processed_frame = decimation.process(f)
-        if is_spatial_filter:
-            processed_frame = spatial.process(f)
-        if is_temporal_filter:
-            processed_frame = temporal.process(f)
-        if is_hole_filling_filter:
-            processed_frame = hole_filling.process(f)
-        if is_depth_to_disparity:
-            processed_frame = depth_to_disparity.process(f)
-        if is_disparity_to_depth:
-            processed_frame = disparity_to_depth.process(f)
-
-    # 計算點雲，並將頂點數據轉換為 NumPy 陣列
-    points = pc.calculate(processed_frame) # 計算點雲
-    verts = np.asanyarray(points.get_vertices()).view(np.float32).reshape(-1, 3) # 將頂點數據轉換為浮點數陣列
-    return verts # 返回點雲數據 (nx3)
+    def createFrameGrabber(self, **kwargs) -> FrameGrabber:
+        """
+        建立(尚未啟動的)背景取像器，參數見FrameGrabber；相機stop()時會一併停止
+        """
+        grabber = FrameGrabber(self.pipeline, **kwargs)
+        self.__grabbers.add(grabber)
+        return grabber
@@ -1,68 +1,96 @@
-import pyrealsense2 as rs
 import numpy as np
+from realsense.classRealSense import RealSenseCamera, StreamProfile
+from realsense.classDepthProcessor import DepthProcessor
 
-# 建立 RealSense 管線，這是一個封裝了相機流和處理功能的物件
-pipeline = rs.pipeline()
+# 預設相機，第一次使用時才建立並啟動管線(import此模組不會連線相機，也不需要pyrealsense2)
+# 需要指定解析度、幀率、格式或曝光時，請在使用前呼叫Set_Camera()，例如:
+# Set_Camera(RealSenseCamera([StreamProfile("color", 640, 480, "bgr8", 30)], colorOptions={"exposure": 100}))
+_camera = None
 
-# 配置管線 (可以用來設定流的參數，如解析度、幀率等)
-config = rs.config()
-#config.enable_stream(rs.stream.color, 640, 480, rs.format.bgr8, 30)
-
-# 開始管線，啟動相機的數據流
-pipeline.start(config)
-
-# 在 pipeline 啟動後，設置相機的曝光參數
-color_sensor = pipeline.get_active_profile().get_device().query_sensors()[1]  # 獲取彩色影像傳感器
-#color_sensor.set_option(rs.option.enable_auto_exposure, 1)  # 禁用自動曝光
-#color_sensor.set_option(rs.option.exposure, 100)  # 設置手動曝光值，根據需求調整曝光值
+def Get_Camera():
+    """
+    取得預設相機(RealSenseCamera)，第一次呼叫時啟動管線
+    """
+    global _camera
+    if _camera is None:
+        _camera = RealSenseCamera()
+    _camera.start()
+    return _camera
 
-# 創建點雲物件，用於計算和處理點雲數據
-pc = rs.pointcloud()
+def Set_Camera(camera):
+    """
+    以camera取代預設相機(原本的相機會被停止)
+    """
+    global _camera
+    if _camera is not None and _camera is not camera:
+        _camera.stop()
+    _camera = camera
 
+def Stop_Camera():
+    """
+    停止預設相機的管線，之後再次使用時會重新啟動(深度濾波的歷史也會清除)
+    """
+    if _camera is not None:
+        _camera.stop()
+    for processor in _depthProcessors.values():
+        processor.reset()
+
+def __getattr__(name):
+    # 相容舊的模組層級變數：realsense.pipeline等，存取時才啟動相機
+    if name == "pipeline":
+        return Get_Camera().pipeline
+    if name == "color_sensor":
+        return Get_Camera().colorSensor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def Get_Camera_Model(stream = "color"):
+    """
+    取得串流的相機模型(內部參數、畸變係數，以及依解析度快取的射線與去畸變映射表)
+    stream: "color" 或 "depth"
+    """
+    return Get_Camera().getCameraModel(stream)
 
 def Get_Depth_K():
     """
     取得深度相機的內部參數矩陣 K
     K 是 3x3 的相機內部參數矩陣，包含焦距和主點偏移
     """
-    profile = pipeline.get_active_profile()# 獲取當前的相機配置
-    depth_profile = rs.video_stream_profile(profile.get_stream(rs.stream.depth)) # 獲取深度流的配置
-    depth_intrinsics = depth_profile.get_intrinsics() # 獲取深度相機的內部參數 (焦距、主點偏移等)
-    
-    # 構建 3x3 的相機內部參數矩陣
-    K = np.zeros((3, 3))
-    K[0][0] = depth_intrinsics.fx # x 軸的焦距
-    K[0][2] = depth_intrinsics.ppx # 主點在 x 軸的偏移
-    K[1][1] = depth_intrinsics.fy # y 軸的焦距
-    K[1][2] = depth_intrinsics.ppy # 主點在 y 軸的偏移
-    K[2][2] = 1 # 齊次坐標矩陣的最後一行固定為 [0, 0, 1]
-    return K
+    return Get_Camera().getDepthK()
 
 def Get_Color_K():
     """
     取得彩色相機的內部參數矩陣 K
     K 是 3x3 的相機內部參數矩陣，包含焦距和主點偏移
     """
-    profile = pipeline.get_active_profile() # 獲取當前的相機配置
-    color_profile = rs.video_stream_profile(profile.get_stream(rs.stream.color)) # 獲取彩色流的配置
-    color_intrinsics = color_profile.get_intrinsics() # 獲取彩色相機的內部參數 (焦距、主點偏移等)
-    
-    # 構建 3x3 的相機內部參數矩陣
-    K = np.zeros((3, 3))
-    K[0][0] = color_intrinsics.fx # x 軸的焦距
-    K[0][2] = color_intrinsics.ppx # 主點在 x 軸的偏移
-    K[1][1] = color_intrinsics.fy # y 軸的焦距
-    K[1][2] = color_intrinsics.ppy # 主點在 y 軸的偏移
-    K[2][2] = 1 # 齊次坐標矩陣的最後一行固定為 [0, 0, 1]
-    return K
+    return Get_Camera().getColorK()
 
 # 取得彩色影像幀，並將其轉換為 NumPy 陣列
 def Get_RGB_Frame():
-    frame = pipeline.wait_for_frames()  # 等待新的一組幀 (彩色和深度)
-    color_frame = frame.get_color_frame()  # 從幀中提取彩色影像
-    return np.asarray(color_frame.get_data())  # 將彩色影像數據轉換為 NumPy 陣列並返回
+    return Get_Camera().getRGBFrame()
 
 
+# 每組濾波設定只建立一次處理流程，temporal濾波器的歷史跨呼叫保留
+_depthProcessors = {}
+
+def Get_Depth_Processor(is_decimation_filter = False,
+                        is_spatial_filter = False,
+                        is_temporal_filter = False,
+                        is_hole_filling_filter = False,
+                        is_disparity = False):
+    """
+    取得(同一組設定共用的)深度濾波流程，參數見Get_PointCloud
+    """
+    key = (is_decimation_filter, is_spatial_filter, is_temporal_filter, is_hole_filling_filter, is_disparity)
+    processor = _depthProcessors.get(key)
+    if processor is None:
+        processor = DepthProcessor(decimation=is_decimation_filter,
+                                   spatial=is_spatial_filter,
+                                   temporal=is_temporal_filter,
+                                   holeFilling=is_hole_filling_filter,
+                                   useDisparity=is_disparity)
+        _depthProcessors[key] = processor
+    return processor
+
 def Get_PointCloud(sample_length = 10, 
                    is_decimation_filter = False, 
                    is_spatial_filter = False, 
@@ -75,50 +103,14 @@ def Get_PointCloud(sample_length = 10,
     取得點雲數據
     sample_length: 取樣的幀數, is_decimation_filter: 是否使用稀疏濾波, is_spatial_filter: 是否使用空間濾波
     is_temporal_filter: 是否使用時間濾波, is_hole_filling_filter: 是否使用洞填補濾波
-    is_depth_to_disparity: 是否將深度轉換為視差, is_disparity_to_depth: 是否將視差轉換為深度
-    """
-
-    # 將 RealSense 點雲輸出為 np array (nx3)
-    # 初始化濾波器對象 (這邊可以簡單理解為影像前置處理)
-    #output realsense point cloud as a np array(nx3)
-    #Effectively reduces the depth scene complexity
-    decimation = rs.decimation_filter() # 稀疏濾波器，減少深度場景的複雜性
-    #1D edge-preserving spatial filter using high-order domain transform
-    spatial = rs.spatial_filter() # 空間濾波器，用於保留 1D 邊緣
-    #The temporal filter is intended to improve the depth data persistency by manipulating per-pixel values based on previous frames
-    temporal = rs.temporal_filter() # 時間濾波器，用於根據之前幀數平滑深度數據
-    #The filter implements several methods to rectify missing data in the resulting image
-    hole_filling = rs.hole_filling_filter() # 填補濾波器，用於修復深度影像中的缺失數據
+    is_depth_to_disparity, is_disparity_to_depth: 是否在視差空間中做空間/時間濾波(任一為True時，轉換為視差後一定會轉換回深度)
 
-    depth_to_disparity = rs.disparity_transform(True)  # 將深度轉換為視差
-    disparity_to_depth = rs.disparity_transform(False)  # 將視差轉換為深度
-
-
-    # 創建幀列表，並從相機讀取 sample_length 個深度幀
-    frames_list = []
-    for f in range(sample_length):
-        frame = pipeline.wait_for_frames() # 等待新的幀
-        frames_list.append(frame.get_depth_frame()) # 提取深度幀並加入列表
-    
-    
-    # 開始處理點雲，從第一個幀開始
-    processed_frame = frames_list[0]
-    # 根據function輸入參數，決定是否啟用對應的濾波器
-    for f in frames_list:
-        if is_decimation_filter:
-            processed_frame = decimation.process(f)
-        if is_spatial_filter:
-            processed_frame = spatial.process(f)
-        if is_temporal_filter:
-            processed_frame = temporal.process(f)
-        if is_hole_filling_filter:
-            processed_frame = hole_filling.process(f)
-        if is_depth_to_disparity:
-            processed_frame = depth_to_disparity.process(f)
-        if is_disparity_to_depth:
-            processed_frame = disparity_to_depth.process(f)
-
-    # 計算點雲，並將頂點數據轉換為 NumPy 陣列
-    points = pc.calculate(processed_frame) # 計算點雲
-    verts = np.asanyarray(points.get_vertices()).view(np.float32).reshape(-1, 3) # 將頂點數據轉換為浮點數陣列
-    return verts # 返回點雲數據 (nx3)
+    濾波器依序串接(稀疏 -> 深度轉視差 -> 空間 -> 時間 -> 視差轉深度 -> 洞填補)，
+    sample_length 幀依序通過同一組濾波器，返回最後一幀的點雲 (nx3)
+    """
+    processor = Get_Depth_Processor(is_decimation_filter,
+                                    is_spatial_filter,
+                                    is_temporal_filter,
+                                    is_hole_filling_filter,
+                                    is_depth_to_disparity or is_disparity_to_depth)
+    return processor.capture(Get_Camera().pipeline, sample_length)
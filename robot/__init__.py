@@ -1,2 +1,20 @@
 from .classRobot import *
 from .enumRobotCommand import *
+from .classRobotStatusSnapshot import *
+from .registerMap import *
+from .classTelemetryPoller import *
+from .classAsyncRobot import *
+from .classMotionWaiter import *
+from .classMotionQueue import *
+from .classRegisterShadow import *
+from .classWritePlan import *
+from .poseCodec import *
+from .classModbusConnection import *
+from .classTransactionMetrics import *
+from .classRobotFleet import *
+from .classReadinessStateMachine import *
+from .classPoseRecorder import *
+from .classErrorMonitor import *
+from .classIOBank import *
+from .classWaitCondition import *
+from .classJogSession import *
@@ -0,0 +1,423 @@
+import asyncio
+from typing import Callable, Union, Tuple, Optional
+
+from pymodbus.client import AsyncModbusTcpClient
+
+from robot.enumRobotCommand import eRobotCommand, POSITIONLESS_COMMANDS
+from robot.classRobot import RequestErrorException
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot, STATUS_FIELDS
+from robot.classIOBank import IOChannels, IOState, IO_FIELDS
+from robot.classWaitCondition import WaitCondition, InputCondition, PoseReachedCondition, waitForConditionAsync
+from robot.classReadinessStateMachine import ReadinessStateMachine, ReadinessProgress, eReadinessState, READINESS_FIELDS
+from robot.registerMap import RegisterField, DRV_REGISTER_MAP, planRegisterReads, decodeReadBlocks, encodeRegisterField, DEFAULT_MAX_GAP
+
+
+class AsyncRobot:
+    """
+    AsyncRobot 類別
+
+    Robot 的 asyncio 版本，使用 pymodbus 的 AsyncModbusTcpClient，
+    命令(eRobotCommand)與寄存器定義(robot/registerMap.py)與 Robot 共用。
+    所有通訊方法皆為 coroutine，可以在同一個事件迴圈中同時控制多台控制器、PLC與相機，
+    不需要額外的執行緒與 time.sleep 輪詢。
+
+    使用方法:
+    async with AsyncRobot(host="192.168.1.1", port=502) as robotDRV:
+        await robotDRV.prepareRobotForMotion()
+        await robotDRV.sendMotionCommand(position, robotCommand=eRobotCommand.Robot_Go_MovL, block=True)
+    """
+    def __init__(self,
+                 modbusTCPClient: Optional[AsyncModbusTcpClient] = None,
+                 host: Optional[str] = None, port: Optional[int] = None,
+                 motionBlockTime: float = 0.1,
+                 suctionDigitalOutputNumber: int = 0,
+                 closeToTargetThreshold: float = 0.01,
+                 unit: int = 2):
+        """
+        AsyncRobot 類別的建構函數，建立後需await connect()(或使用async with)
+
+        args:
+        modbusTCPClient: AsyncModbusTcpClient，如果提供，則使用該連接
+        host, port: 如果提供，則自動建立AsyncModbusTcpClient
+        motionBlockTime: float，等待運動完成時的輪詢間隔
+        suctionDigitalOutputNumber: int，吸盤的數位輸出位置
+        closeToTargetThreshold: float，到達目標位置的閥值
+        unit: int，Modbus單元標識符
+        """
+        if modbusTCPClient:
+            self.modbusTCPClient = modbusTCPClient
+        elif host and port:
+            self.modbusTCPClient = AsyncModbusTcpClient(host, port=port)
+        else:
+            raise ValueError("需提供modbusTCPClient或host與port")
+
+        self.blockTime = motionBlockTime
+        self.suctionDigitalOutputNumber = suctionDigitalOutputNumber
+        self.closeToTargetThreshold = closeToTargetThreshold
+        self.unit = unit
+        self.latestMotionCommand: Optional[Tuple[float, float, float, float, float, float]] = None
+        self.latestDigitalOutputCommand = 0
+        self.io = IOChannels()                  #DI/DO通道名稱表，與Robot.io共用命名與點位計算
+        self.__lock = asyncio.Lock()            #同一個連線上的請求依序送出
+
+    async def connect(self) -> bool:
+        """
+        建立Modbus連線
+        """
+        if not self.modbusTCPClient.connected:
+            await self.modbusTCPClient.connect()
+        return self.modbusTCPClient.connected
+
+    def close(self):
+        """
+        關閉Modbus連線
+        """
+        self.modbusTCPClient.close()
+
+    async def __aenter__(self) -> "AsyncRobot":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        self.close()
+
+    ##############################################################
+    #狀態查詢
+
+    async def getRobotStatusSnapshot(self, includePoseFlag: bool = False) -> RobotStatusSnapshot:
+        """
+        以區塊讀取取得機器人狀態快照(見Robot.getRobotStatusSnapshot())
+        """
+        fields = STATUS_FIELDS + ("poseFlag",) if includePoseFlag else STATUS_FIELDS
+        return RobotStatusSnapshot.fromFields(await self.readFields(*fields))
+
+    async def isRobotReadyForMotion(self) -> bool:
+        """
+        檢查機器人是否處於可以運動的狀態
+        """
+        return (await self.getRobotStatusSnapshot()).isRobotReadyForMotion
+
+    async def isRobotError(self) -> bool:
+        """
+        檢查機器人是否處於錯誤狀態
+        """
+        return (await self.getRobotErrorCode()) != (0, 0, [0, 0, 0, 0, 0, 0])
+
+    async def isRobotReachTargetPosition(self) -> bool:
+        """
+        檢查Robot是否到達位置
+        """
+        return (await self.getRobotPoseFlag()) == 1
+
+    async def getRobotNotReadyReason(self) -> str:
+        """
+        檢查機器人未準備運動的原因
+        """
+        return (await self.getRobotStatusSnapshot()).notReadyReason
+
+    async def getTCPPose(self) -> Tuple[float, float, float, float, float, float]:
+        """
+        從機械手臂讀取 TCP 位姿 (X, Y, Z, Rx, Ry, Rz)
+        """
+        x, y, z, rx, ry, rz = (await self.readFields("tcpPose"))["tcpPose"]
+        return x, y, z, rx, ry, rz
+
+    async def getRobotPoseFlag(self) -> int:
+        """
+        獲取當前機械手臂的位姿狀態標誌，1 表示到達位置，2表示未到達位置
+        """
+        return (await self.readFields("poseFlag"))["poseFlag"]
+
+    async def getRobotErrorCode(self):
+        """
+        獲取機器人錯誤碼
+        return:
+        tuple(int,int,list[int]): 控制器錯誤碼,機器人組錯誤碼,軸錯誤碼(J1~J6)
+        """
+        values = await self.readFields("controllerError", "robotGroupError", "jointsError")
+        jointsError = values["jointsError"]
+        return values["controllerError"], values["robotGroupError"], jointsError[-4:] + jointsError[:2]
+
+    async def getRobotWarningCode(self) -> int:
+        """
+        獲取機器人警告碼
+        """
+        return (await self.readFields("robotWarning"))["robotWarning"]
+
+    async def getRobotMotionState(self) -> int:
+        """
+        獲取機器人運動狀態,0表示停止,1表示運動中
+        """
+        return (await self.readFields("robotMotionState"))["robotMotionState"]
+
+    async def getRobotSystemState(self) -> int:
+        """
+        獲取機器人系統狀態(見Robot.getRobotSystemState())
+        """
+        return (await self.readFields("robotSystemState"))["robotSystemState"]
+
+    async def getOperationMode(self) -> int:
+        """
+        獲取操作模式狀態(見Robot.getOperationMode())
+        """
+        return (await self.readFields("operationMode"))["operationMode"]
+
+    async def getTeachPanelState(self) -> int:
+        """
+        獲取TP教導盒啟用狀態,0表示未啟用,1表示啟用
+        """
+        return (await self.readFields("teachPanelState"))["teachPanelState"]
+
+    ##############################################################
+    #運動控制
+
+    async def setMotionParameters(self,
+                                  speed: Optional[int] = None,
+                                  acceleration: Optional[int] = None,
+                                  deceleration: Optional[int] = None):
+        """
+        設定速度、加速度、減速度(0~100)，None表示不變更
+        """
+        for name, value in (("speed", speed), ("acceleration", acceleration), ("deceleration", deceleration)):
+            if value is None:
+                continue
+            if not 0 <= value <= 100:
+                raise ValueError(f"{name} 應設為0到100之間的數值")
+            await self.writeRegister(DRV_REGISTER_MAP[name].address, value)
+
+    async def sendMotionCommand(
+        self,
+        position: Optional[Union[list[float], tuple[float, float, float, float, float, float]]] = None,
+        speed: Optional[int] = None,
+        acceleration: Optional[int] = None,
+        deceleration: Optional[int] = None,
+        robotCommand: eRobotCommand = eRobotCommand.Motion_Stop,
+        retry: bool = True,
+        retryTimes: int = 3,
+        retryDelay: float = 1,
+        block: bool = False
+    ) -> bool:
+        """
+        參數與Robot.sendMotionCommand()相同，另外:
+            block: 是否等待運動完成才返回
+
+        返回:
+            bool: 命令是否已送出(機器人不允許運動時返回False)
+        """
+        isReady = await self.isRobotReadyForMotion()
+        if retry:
+            for i in range(retryTimes):
+                if isReady:
+                    break
+                await asyncio.sleep(retryDelay)
+                isReady = await self.isRobotReadyForMotion()
+
+        if not isReady:
+            print("機器人不允許運動")
+            return False
+
+        await self.setMotionParameters(speed, acceleration, deceleration)
+
+        if robotCommand not in POSITIONLESS_COMMANDS:
+            if position is None:
+                raise AssertionError("動作命令不正確且未提供座標")
+            if len(position) != 6:
+                raise ValueError("參數錯誤，應傳入6個座標值或一個包含6個值的list")
+            self.latestMotionCommand = tuple(position)
+            targetPose = DRV_REGISTER_MAP["targetPose"]
+            await self.writeRegisters(targetPose.address, encodeRegisterField(targetPose, list(position)))
+        else:
+            # 回原點/停止/JOG沒有目標座標，等待時只看位姿狀態標誌，不可沿用上一個目標
+            self.latestMotionCommand = None
+
+        await self.writeRegister(DRV_REGISTER_MAP["robotCommand"].address, robotCommand.value)
+        if block:
+            await self.waitRobotReachTargetPosition()
+        return True
+
+    async def waitRobotReachTargetPosition(self, timeout: Optional[float] = None):
+        """
+        等待機械手臂運動完成(即waitUntil(targetReachedCondition()))，每次輪詢只需一次區塊讀取
+
+        參數:
+        timeout: 最長等待時間(秒)，None表示不限；逾時會拋出TimeoutError(即asyncio.TimeoutError)
+        """
+        await self.waitUntil(self.targetReachedCondition(), timeout, self.blockTime)
+
+    def targetReachedCondition(self) -> PoseReachedCondition:
+        """
+        「最近一次運動命令完成」的等待條件，見Robot.targetReachedCondition()
+        """
+        return PoseReachedCondition(self.latestMotionCommand, self.closeToTargetThreshold)
+
+    async def waitUntil(self, condition: WaitCondition, timeout: Optional[float] = None, pollInterval: float = 0.005) -> dict:
+        """
+        輪詢直到條件成立，用法與Robot.waitUntil()相同；逾時拋出TimeoutError
+        """
+        return await waitForConditionAsync(self.readFields, condition, timeout, pollInterval)
+
+    async def waitForInput(self, channel: Union[int, str], state: bool = True,
+                           timeout: Optional[float] = None, pollInterval: float = 0.005):
+        """
+        等待數位輸入變為指定狀態，用法與Robot.waitForInput()相同
+
+        參數:
+        channel: DI編號(0~15)或以self.io.nameInputs()命名的通道
+        """
+        await self.waitUntil(InputCondition(self.io.inputBit(channel), state), timeout, pollInterval)
+
+    async def isCloseToTarget(self) -> bool:
+        """
+        檢查機械手臂是否接近最近一次的目標位置
+        """
+        if self.latestMotionCommand is None:
+            return False
+        currentPose = await self.getTCPPose()
+        distance = sum((current - target) ** 2 for current, target in zip(currentPose, self.latestMotionCommand)) ** 0.5
+        return distance < self.closeToTargetThreshold
+
+    async def motionStop(self):
+        """
+        停止所有運動
+        """
+        self.latestMotionCommand = None
+        await self.writeRegisters(DRV_REGISTER_MAP["robotCommand"].address, [0])
+
+    ##############################################################
+    #IO控制
+
+    async def suctionON(self):
+        """
+        打開吸盤
+        """
+        await self.setIO(self.suctionDigitalOutputNumber, True)
+
+    async def suctionOFF(self):
+        """
+        關閉吸盤
+        """
+        await self.setIO(self.suctionDigitalOutputNumber, False)
+
+    async def setIO(self, *args):
+        """
+        設定數位輸出，用法與Robot.setIO()相同:
+        setIO(value) 以二進制設定所有輸出；setIO(bit, state) 設定特定bit
+        """
+        if len(args) == 1 and isinstance(args[0], int):
+            data = args[0]
+        elif len(args) == 2 and isinstance(args[0], int) and isinstance(args[1], bool):
+            if args[0] > 15 or args[0] < 0:
+                raise ValueError("參數錯誤，應傳入一個數字或一個0~16的數字及True或False")
+            data = self.io.applyStates(self.latestDigitalOutputCommand, {args[0]: args[1]})
+        else:
+            raise ValueError("參數錯誤，應傳入一個數字或一個0~16的數字及True或False")
+        self.latestDigitalOutputCommand = data
+        await self.writeRegister(DRV_REGISTER_MAP["digitalOutput"].address, data)
+
+    async def readIO(self) -> IOState:
+        """
+        以一次讀取取得數位輸入與輸出(與Robot.io.read()相同)，並以讀回的輸出更新latestDigitalOutputCommand
+        """
+        values = await self.readFields(*IO_FIELDS)
+        self.latestDigitalOutputCommand = values["digitalOutput"]
+        return IOState(values["digitalInput"], values["digitalOutput"])
+
+    ##############################################################
+    #系統層級工作
+
+    async def AllAxisEnable(self, enableWaitTime: float = 2):
+        """
+        啟用所有伺服軸
+        """
+        await self.writeRegister(0x0006, int(0x0101))  # 1,2軸
+        await self.writeRegister(0x0007, int(0x0101))  # 3,4軸
+        await self.writeRegister(0x0000, int(0x0101))  # 5,6軸
+        if enableWaitTime > 0:
+            await asyncio.sleep(enableWaitTime)         # 等待使能的時間
+
+    async def AllAxisDisable(self):
+        """
+        禁用所有伺服軸
+        """
+        await self.writeRegister(0x0006, int(0x0000))
+        await self.writeRegister(0x0007, int(0x0000))
+        await self.writeRegister(0x0000, int(0x0000))
+
+    async def resetRobotError(self):
+        """
+        重設機器人錯誤碼(與Robot.resetRobotError()相同的寫入順序)
+        """
+        await self.writeRegisters(0x0020, [257] * 8)
+        await self.writeRegisters(0x0180, [257] * 4)
+        await self.writeRegisters(0x0002, [0] * 2)
+
+    async def prepareRobotForMotion(self,
+                                    retryTimes: int = 5,
+                                    retryDelay: float = 1,
+                                    timeout: Optional[float] = None,
+                                    attemptTimeout: float = 3.0,
+                                    pollInterval: float = 0.05,
+                                    minEnableTime: float = 0.0,
+                                    progressCallback: Optional[Callable[[ReadinessProgress], None]] = None,
+                                    checkServoReadback: bool = False) -> bool:
+        """
+        讓機器人自動進入準備狀態，包括reset軸錯誤，並開啟伺服(參數同Robot.prepareRobotForMotion())
+
+        返回:
+        bool: 如果機器人成功進入準備狀態則返回True，否則返回False
+        """
+        machine = ReadinessStateMachine(retryTimes, retryDelay, attemptTimeout, timeout,
+                                        pollInterval, minEnableTime, progressCallback, checkServoReadback)
+        while True:
+            step = machine.update(await self.readFields(*READINESS_FIELDS))
+            if step.state == eReadinessState.READY:
+                return True
+            if step.state == eReadinessState.FAILED:
+                print(machine.reason)
+                print("機器人無法進入準備狀態")
+                return False
+            if step.resetErrors:
+                await self.resetRobotError()
+            if step.enableServo:
+                await self.AllAxisEnable(enableWaitTime=0)
+            await asyncio.sleep(step.delay)
+
+    ##############################################################
+
+    async def writeRegister(self, address: int, value: int):
+        """
+        寫入單個寄存器並檢查錯誤
+        """
+        async with self.__lock:
+            result = await self.modbusTCPClient.write_register(address, value, slave=self.unit)
+        if result.isError():
+            raise RequestErrorException(f"寫入寄存器 {address} 失敗")
+        return result
+
+    async def writeRegisters(self, address: int, values: list[int]):
+        """
+        寫入多個寄存器並檢查錯誤
+        """
+        async with self.__lock:
+            result = await self.modbusTCPClient.write_registers(address, values, slave=self.unit)
+        if result.isError():
+            raise RequestErrorException(f"寫入寄存器 {address} 失敗")
+        return result
+
+    async def readRegisters(self, address: int, count: int = 1) -> list[int]:
+        """
+        讀取寄存器並檢查錯誤，固定返回list
+        """
+        async with self.__lock:
+            request = await self.modbusTCPClient.read_holding_registers(address, count, slave=self.unit)
+        if request.isError():
+            raise RequestErrorException(f"與modbus連接對象{self.modbusTCPClient.comm_params.host}:{self.modbusTCPClient.comm_params.port}無法通訊")
+        return request.registers
+
+    async def readFields(self, *fields: Union[str, RegisterField], maxGap: int = DEFAULT_MAX_GAP) -> dict:
+        """
+        依寄存器表讀取多個欄位，自動合併成最少次數的區塊讀取(見Robot.readFields())
+        """
+        blocks = planRegisterReads(fields, maxGap=maxGap)
+        blockRegisters = [await self.readRegisters(block.address, block.count) for block in blocks]
+        return decodeReadBlocks(blocks, blockRegisters)
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+from enum import Enum
+from typing import Callable, NamedTuple, Optional
+
+# 錯誤與警告寄存器(0x0140軸錯誤、0x01E0機器人組錯誤、0x01FF控制器錯誤、0x020E警告)
+# 0x0140~0x020E共207個寄存器，超過單次讀取上限125，合併後為兩次區塊讀取(0x0140~0x014F、0x01E0~0x020E)
+ERROR_MONITOR_FIELDS = ("jointsError", "robotGroupError", "controllerError", "robotWarning")
+
+
+class eRobotEventType(Enum):
+    ERROR_RAISED = 1        # 錯誤碼由0變為非0(或變為另一個錯誤碼)
+    ERROR_CLEARED = 2       # 錯誤碼恢復為0
+    WARNING_RAISED = 3
+    WARNING_CLEARED = 4
+    MONITOR_FAILED = 5      # 無法讀取錯誤寄存器(通訊失敗)
+    MONITOR_RECOVERED = 6   # 讀取恢復
+
+
+class RobotEvent(NamedTuple):
+    """
+    錯誤監控偵測到的事件
+
+    eventType: 事件類型
+    source: 來源，"controllerError", "robotGroupError", "robotWarning", "joint1"~"joint6"或"connection"
+    code: 目前的錯誤碼(通訊事件為0)
+    previousCode: 變化前的錯誤碼
+    timestamp: 偵測時間(time.monotonic)
+    error: MONITOR_FAILED時的例外
+    """
+    eventType: eRobotEventType
+    source: str
+    code: int
+    previousCode: int
+    timestamp: float
+    error: Optional[Exception] = None
+
+    @property
+    def isError(self) -> bool:
+        return self.eventType == eRobotEventType.ERROR_RAISED
+
+
+class ErrorMonitor:
+    """
+    以邊緣觸發方式監控機器人錯誤與警告
+
+    背景執行緒以固定週期讀取ERROR_MONITOR_FIELDS，與上一次的值比較，只在錯誤碼改變時產生RobotEvent，
+    並分派給註冊的回呼(addListener())與asyncio佇列(subscribe())。
+    發生錯誤時設定faultEvent，讓等待運動完成的迴圈(MotionWaiter)立即中止，而不是等到逾時。
+    讀取失敗不會讓執行緒結束，而是產生MONITOR_FAILED事件後繼續重試。
+
+    使用方法:
+    monitor = ErrorMonitor(robotDRV.readFieldsCached, period=0.1)
+    monitor.addListener(lambda event: print(event))
+    queue = monitor.subscribe()     # 在asyncio事件迴圈中呼叫
+    monitor.start()
+    """
+    def __init__(self, readFields: Callable[..., dict], period: float = 0.1):
+        """
+        參數:
+        readFields: 讀取欄位的函式，通常是Robot.readFieldsCached(遙測執行緒有讀取時直接共用)
+        period: 輪詢週期(秒)
+        """
+        self.__readFields = readFields
+        self.period = period
+        self.__listeners: list[Callable[[RobotEvent], None]] = []
+        self.__subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.__lock = threading.Lock()
+        self.__previous: Optional[dict[str, int]] = None
+        self.__communicationFailed = False
+        self.__stopEvent = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.faultEvent = threading.Event()         # 目前有錯誤時為set
+        self.activeErrors: dict[str, int] = {}      # 來源 -> 目前的錯誤碼(不含警告)
+        self.warningCode = 0
+        self.lastError: Optional[Exception] = None
+
+    @property
+    def isRunning(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def isFaulted(self) -> bool:
+        return self.faultEvent.is_set()
+
+    @property
+    def faultReason(self) -> str:
+        """
+        目前錯誤的說明，沒有錯誤時為空字串
+        """
+        return ", ".join(f"{source}: {code}" for source, code in self.activeErrors.items())
+
+    def addListener(self, callback: Callable[[RobotEvent], None]):
+        """
+        註冊事件回呼，會在監控執行緒中呼叫，請避免在回呼中做耗時工作
+        """
+        self.__listeners.append(callback)
+
+    def removeListener(self, callback: Callable[[RobotEvent], None]):
+        self.__listeners.remove(callback)
+
+    def subscribe(self, loop: Optional[asyncio.AbstractEventLoop] = None, maxsize: int = 0) -> asyncio.Queue:
+        """
+        取得接收事件的asyncio.Queue(事件以loop.call_soon_threadsafe()放入)
+
+        參數:
+        loop: 佇列所屬的事件迴圈，None表示目前執行中的事件迴圈
+        maxsize: 佇列大小，佇列已滿時丟棄新的事件
+        """
+        loop = loop or asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+        with self.__lock:
+            self.__subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self.__lock:
+            self.__subscribers = [(loop, item) for loop, item in self.__subscribers if item is not queue]
+
+    def acknowledge(self):
+        """
+        清除錯誤狀態(重設錯誤後呼叫)，下一次讀取時仍存在的錯誤會重新產生ERROR_RAISED事件
+        """
+        with self.__lock:
+            self.__previous = None
+            self.activeErrors = {}
+            self.faultEvent.clear()
+
+    def update(self, values: dict, now: Optional[float] = None) -> list[RobotEvent]:
+        """
+        與上一次的值比較並產生事件(不分派)
+
+        參數:
+        values: readFields(*ERROR_MONITOR_FIELDS)的結果
+        now: 目前時間(time.monotonic)，None表示現在
+
+        返回:
+        list[RobotEvent]: 此次偵測到的事件
+        """
+        now = time.monotonic() if now is None else now
+        jointsError = list(values["jointsError"])
+        jointsError = jointsError[-4:] + jointsError[:2]
+        codes = {"controllerError": values["controllerError"], "robotGroupError": values["robotGroupError"]}
+        codes.update({f"joint{index}": code for index, code in enumerate(jointsError, start=1)})
+        codes["robotWarning"] = values["robotWarning"]
+
+        events = []
+        with self.__lock:
+            previous = self.__previous or {}
+            for source, code in codes.items():
+                previousCode = previous.get(source, 0)
+                if code == previousCode:
+                    continue
+                isWarning = source == "robotWarning"
+                if code != 0:
+                    eventType = eRobotEventType.WARNING_RAISED if isWarning else eRobotEventType.ERROR_RAISED
+                else:
+                    eventType = eRobotEventType.WARNING_CLEARED if isWarning else eRobotEventType.ERROR_CLEARED
+                events.append(RobotEvent(eventType, source, code, previousCode, now))
+            self.__previous = codes
+            self.activeErrors = {source: code for source, code in codes.items() if code != 0 and source != "robotWarning"}
+            self.warningCode = codes["robotWarning"]
+            if self.activeErrors:
+                self.faultEvent.set()
+            else:
+                self.faultEvent.clear()
+        return events
+
+    def pollOnce(self) -> list[RobotEvent]:
+        """
+        立即讀取一次，分派並返回偵測到的事件
+        """
+        try:
+            values = self.__readFields(*ERROR_MONITOR_FIELDS)
+        except Exception as e:
+            self.lastError = e
+            events = []
+            if not self.__communicationFailed:
+                self.__communicationFailed = True
+                events.append(RobotEvent(eRobotEventType.MONITOR_FAILED, "connection", 0, 0, time.monotonic(), e))
+            self.__dispatch(events)
+            return events
+        self.lastError = None
+        events = []
+        if self.__communicationFailed:
+            self.__communicationFailed = False
+            events.append(RobotEvent(eRobotEventType.MONITOR_RECOVERED, "connection", 0, 0, time.monotonic()))
+        events += self.update(values)
+        self.__dispatch(events)
+        return events
+
+    def start(self):
+        """
+        啟動監控執行緒
+        """
+        if self.isRunning:
+            return
+        self.__stopEvent.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        停止監控執行緒
+        """
+        self.__stopEvent.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        while not self.__stopEvent.is_set():
+            startTime = time.monotonic()
+            self.pollOnce()
+            self.__stopEvent.wait(max(0.0, self.period - (time.monotonic() - startTime)))
+
+    def __dispatch(self, events: list[RobotEvent]):
+        if not events:
+            return
+        with self.__lock:
+            subscribers = list(self.__subscribers)
+        for event in events:
+            for callback in list(self.__listeners):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"錯誤監控回呼發生錯誤: {e}")
+            for loop, queue in subscribers:
+                try:
+                    loop.call_soon_threadsafe(self.__putNoWait, queue, event)
+                except RuntimeError:
+                    # 事件迴圈已關閉
+                    self.unsubscribe(queue)
+
+    @staticmethod
+    def __putNoWait(queue: asyncio.Queue, event: RobotEvent):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
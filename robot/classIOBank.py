@@ -0,0 +1,262 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Mapping, NamedTuple, Optional, Union
+
+from robot.registerMap import DRV_REGISTER_MAP
+
+IO_CHANNEL_COUNT = 16               # DI/DO各16個點(一個寄存器)
+IO_FIELDS = ("digitalInput", "digitalOutput")
+
+Channel = Union[int, str]           # 點位編號(0~15)或已命名的通道名稱
+
+
+class IOState(NamedTuple):
+    """
+    一次讀取的數位輸入/輸出狀態
+
+    inputs: DI_0~DI_15(以二進制表示)
+    outputs: DO_0~DO_15(以二進制表示)
+    """
+    inputs: int
+    outputs: int
+
+    def input(self, bit: int) -> bool:
+        return bool(self.inputs >> bit & 1)
+
+    def output(self, bit: int) -> bool:
+        return bool(self.outputs >> bit & 1)
+
+
+class IOChannels:
+    """
+    DI/DO通道名稱表與點位計算(不通訊)
+
+    IOBank與AsyncRobot.io共用，兩者的命名規則與bit合併方式因此一致。
+    """
+    def __init__(self,
+                 outputs: Optional[Mapping[str, int]] = None,
+                 inputs: Optional[Mapping[str, int]] = None):
+        """
+        參數:
+        outputs: DO通道名稱 -> 點位編號
+        inputs: DI通道名稱 -> 點位編號
+        """
+        self.__outputNames: dict[str, int] = {}
+        self.__inputNames: dict[str, int] = {}
+        self.nameOutputs(**(outputs or {}))
+        self.nameInputs(**(inputs or {}))
+
+    def nameOutputs(self, **channels: int):
+        """
+        命名DO通道，例如nameOutputs(suction=0, gripper=3)
+        """
+        self.__outputNames.update({name: checkIOBit(bit) for name, bit in channels.items()})
+
+    def nameInputs(self, **channels: int):
+        """
+        命名DI通道，例如nameInputs(partPresent=2)
+        """
+        self.__inputNames.update({name: checkIOBit(bit) for name, bit in channels.items()})
+
+    def outputBit(self, channel: Channel) -> int:
+        return self.__resolve(channel, self.__outputNames, "DO")
+
+    def inputBit(self, channel: Channel) -> int:
+        return self.__resolve(channel, self.__inputNames, "DI")
+
+    def applyStates(self, value: int, states: Mapping[Channel, bool]) -> int:
+        """
+        將states(通道 -> 狀態)套用到DO值value，返回新的值
+        """
+        for channel, state in states.items():
+            mask = 1 << self.outputBit(channel)
+            value = value | mask if state else value & ~mask
+        return value
+
+    @staticmethod
+    def __resolve(channel: Channel, names: dict[str, int], kind: str) -> int:
+        if isinstance(channel, str):
+            if channel not in names:
+                raise KeyError(f"沒有名為 {channel} 的{kind}通道")
+            return names[channel]
+        return checkIOBit(channel)
+
+
+class IOBank(IOChannels):
+    """
+    數位輸入/輸出(DI/DO)的控制
+
+    - 在本地保存DO的值，一次修改多個點位只寫入一次(set()、batch())，值沒有改變時不寫入
+    - read()以一次讀取同時取得DI與DO，並以讀回的DO校正本地的值
+    - 通道可以命名(例如"suction" -> DO_0)，之後以名稱操作
+    - pulse()在背景計時，到時間後只還原該點位，不影響期間其他點位的修改
+
+    使用方法:
+    io = robotDRV.io
+    io.nameOutputs(suction=0, gripper=3)
+    io.nameInputs(partPresent=2)
+    with io.batch():
+        io.on("suction")
+        io.off("gripper")
+    io.pulse("gripper", 0.2)
+    if io.read().input(io.inputBit("partPresent")): ...
+    """
+    def __init__(self,
+                 writeRegister: Callable[[int, int], None],
+                 readFields: Callable[..., dict],
+                 outputs: Optional[Mapping[str, int]] = None,
+                 inputs: Optional[Mapping[str, int]] = None):
+        """
+        參數:
+        writeRegister: 寫入單一寄存器的函式(address, value)，通常為Robot.writeRegister
+        readFields: 讀取欄位的函式，通常為Robot.readFields
+        outputs: DO通道名稱 -> 點位編號
+        inputs: DI通道名稱 -> 點位編號
+        """
+        super().__init__(outputs, inputs)
+        self.__writeRegister = writeRegister
+        self.__readFields = readFields
+        self.__lock = threading.RLock()
+        self.__outputs = 0
+        self.__batchDepth = 0
+        self.__pulseTimers: dict[int, threading.Timer] = {}
+        self.__writtenOutputs: Optional[int] = None     # 最近一次寫入(或讀回)的值，None表示未知
+        self.lastError: Optional[Exception] = None      # 脈衝還原(背景執行緒)寫入失敗時的例外
+
+    @property
+    def outputs(self) -> int:
+        """
+        本地保存的DO值(以二進制表示)
+        """
+        return self.__outputs
+
+    ##################################################################
+
+    def set(self, states: Optional[Mapping[Channel, bool]] = None, **namedStates: bool):
+        """
+        同時設定多個DO點位，只寫入一次
+
+        參數:
+        states: 通道 -> 狀態
+        namedStates: 以關鍵字指定已命名的通道，例如set(suction=True, gripper=False)
+        """
+        states = dict(states or {}, **namedStates)
+        with self.__lock:
+            self.__outputs = self.applyStates(self.__outputs, states)
+            self.__flush()
+
+    def on(self, *channels: Channel):
+        self.set({channel: True for channel in channels})
+
+    def off(self, *channels: Channel):
+        self.set({channel: False for channel in channels})
+
+    def writeAll(self, value: int):
+        """
+        以二進制設定所有DO
+        """
+        if not 0 <= value < 1 << IO_CHANNEL_COUNT:
+            raise ValueError(f"DO值應介於0到{(1 << IO_CHANNEL_COUNT) - 1}之間")
+        with self.__lock:
+            self.__outputs = value
+            self.__flush()
+
+    @contextmanager
+    def batch(self):
+        """
+        在with區塊中的所有DO修改，於離開區塊時合併為一次寫入
+        """
+        with self.__lock:
+            self.__batchDepth += 1
+            try:
+                yield self
+            finally:
+                self.__batchDepth -= 1
+                self.__flush()
+
+    def pulse(self, channel: Channel, duration: float, state: bool = True) -> threading.Timer:
+        """
+        將DO點位設為state，duration秒後在背景執行緒還原(不阻塞呼叫端)
+
+        同一點位在脈衝期間再次呼叫pulse()時，會取消前一次的還原並重新計時
+
+        返回:
+        threading.Timer: 可呼叫cancel()取消還原
+        """
+        bit = self.outputBit(channel)
+        with self.__lock:
+            previous = self.__pulseTimers.pop(bit, None)
+            if previous is not None:
+                previous.cancel()
+            self.set({bit: state})
+            timer = threading.Timer(duration, self.__endPulse, (bit, not state))
+            timer.daemon = True
+            self.__pulseTimers[bit] = timer
+            timer.start()
+        return timer
+
+    def __endPulse(self, bit: int, state: bool):
+        with self.__lock:
+            if self.__pulseTimers.get(bit) is not threading.current_thread():
+                return      # 已被新的脈衝取代或取消
+            del self.__pulseTimers[bit]
+            try:
+                self.set({bit: state})
+            except Exception as e:
+                self.lastError = e
+
+    def cancelPulses(self):
+        """
+        取消所有尚未還原的脈衝(點位保持目前的狀態)
+        """
+        with self.__lock:
+            for timer in self.__pulseTimers.values():
+                timer.cancel()
+            self.__pulseTimers.clear()
+
+    ##################################################################
+
+    def read(self) -> IOState:
+        """
+        以一次讀取取得DI與DO，並以讀回的DO更新本地的值
+        """
+        values = self.__readFields(*IO_FIELDS)
+        with self.__lock:
+            if self.__batchDepth == 0:
+                self.__outputs = values["digitalOutput"]
+            self.__writtenOutputs = values["digitalOutput"]
+        return IOState(values["digitalInput"], values["digitalOutput"])
+
+    def getInput(self, channel: Channel) -> bool:
+        """
+        讀取單一DI點位(會通訊一次，需要多個點位時請使用read())
+        """
+        return self.read().input(self.inputBit(channel))
+
+    def getOutput(self, channel: Channel) -> bool:
+        """
+        本地保存的DO點位狀態(不通訊)
+        """
+        return bool(self.__outputs >> self.outputBit(channel) & 1)
+
+    def invalidate(self):
+        """
+        讓下一次修改一定寫入(重新連線或控制器可能被其他來源修改DO時呼叫)
+        """
+        with self.__lock:
+            self.__writtenOutputs = None
+
+    def __flush(self):
+        if self.__batchDepth > 0 or self.__outputs == self.__writtenOutputs:
+            return
+        self.__writeRegister(DRV_REGISTER_MAP["digitalOutput"].address, self.__outputs)
+        self.__writtenOutputs = self.__outputs
+
+
+def checkIOBit(bit: int) -> int:
+    """
+    檢查點位編號(0~15)，返回bit
+    """
+    if not isinstance(bit, int) or not 0 <= bit < IO_CHANNEL_COUNT:
+        raise ValueError(f"點位編號應為0~{IO_CHANNEL_COUNT - 1}的整數，但收到 {bit}")
+    return bit
@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from robot.enumRobotCommand import eRobotCommand, CONTINUE_JOG_COMMANDS
+
+
+class JogSessionError(RuntimeError):
+    """
+    JOG工作階段無法開始(機器人未準備好)或已關閉
+    """
+
+
+class JogSession:
+    """
+    連續JOG的工作階段
+
+    取代「每100ms呼叫一次sendMotionCommand(robotCommand=JOG命令)」的作法：
+    1. 開始時只檢查一次機器人是否可運動
+    2. jog()只在方向改變時寫入命令(0x0300)，方向不變時不通訊；
+       需要定期重送時以heartbeatInterval設定重送間隔
+    3. 看門狗(deadman)：超過deadmanTimeout沒有呼叫jog()或keepAlive()時，自動送出Motion_Stop，
+       避免用戶端當機、斷線或漏掉放開按鍵事件時手臂持續移動
+
+    使用方法:
+    with robotDRV.startJogSession(speed=20) as session:
+        while keyHeld:
+            session.jog(eRobotCommand.Continue_JOG_X_Positive)   # 方向不變時不通訊，只重設看門狗
+            time.sleep(0.1)
+        session.stop()
+    """
+    def __init__(self,
+                 writeCommand: Callable[[eRobotCommand], None],
+                 deadmanTimeout: float = 0.5,
+                 heartbeatInterval: Optional[float] = None,
+                 onDeadman: Optional[Callable[[], None]] = None):
+        """
+        參數:
+        writeCommand: 寫入運動命令的函式(只需寫入0x0300，不檢查是否可運動)
+        deadmanTimeout: 沒有收到jog()或keepAlive()多久後自動停止(秒)
+        heartbeatInterval: JOG中重送相同命令的間隔(秒)，None表示方向不變時不重送
+        onDeadman: 看門狗觸發停止時的回呼(在看門狗執行緒中呼叫)
+        """
+        if deadmanTimeout <= 0:
+            raise ValueError("deadmanTimeout必須大於0")
+        if heartbeatInterval is not None and heartbeatInterval <= 0:
+            raise ValueError("heartbeatInterval必須大於0")
+        self.__writeCommand = writeCommand
+        self.deadmanTimeout = deadmanTimeout
+        self.heartbeatInterval = heartbeatInterval
+        self.onDeadman = onDeadman
+        self.__lock = threading.Lock()
+        self.__command = eRobotCommand.Motion_Stop      # 目前(最近一次寫入)的命令
+        self.__lastFeed = time.monotonic()              # 最近一次jog()/keepAlive()的時間
+        self.__lastWrite = 0.0
+        self.__closed = threading.Event()
+        self.__watchdog: Optional[threading.Thread] = None
+        self.writeCount = 0                             # 實際寫入的命令數
+        self.deadmanCount = 0                           # 看門狗觸發停止的次數
+        self.lastError: Optional[Exception] = None      # 看門狗執行緒寫入失敗時的例外
+
+    def __enter__(self) -> "JogSession":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def command(self) -> eRobotCommand:
+        """
+        目前的命令(Motion_Stop表示停止中)
+        """
+        return self.__command
+
+    @property
+    def isJogging(self) -> bool:
+        return self.__command != eRobotCommand.Motion_Stop
+
+    @property
+    def isClosed(self) -> bool:
+        return self.__closed.is_set()
+
+    def start(self):
+        """
+        啟動看門狗執行緒(Robot.startJogSession()會自動呼叫)
+        """
+        if self.__watchdog is not None:
+            return
+        self.__lastFeed = time.monotonic()
+        self.__watchdog = threading.Thread(target=self.__run, daemon=True)
+        self.__watchdog.start()
+
+    def jog(self, command: eRobotCommand):
+        """
+        以command連續JOG(傳入Motion_Stop等同stop())，同時重設看門狗
+
+        方向與目前相同時不寫入(除非到了heartbeatInterval)
+        """
+        if command != eRobotCommand.Motion_Stop and command not in CONTINUE_JOG_COMMANDS:
+            raise ValueError(f"{command} 不是連續JOG命令")
+        if self.isClosed:
+            raise JogSessionError("JOG工作階段已關閉")
+        with self.__lock:
+            self.__lastFeed = time.monotonic()
+            if command != self.__command:
+                self.__write(command)
+
+    def keepAlive(self):
+        """
+        重設看門狗，維持目前的JOG方向
+        """
+        self.__lastFeed = time.monotonic()
+
+    def stop(self):
+        """
+        停止JOG(一定會寫入Motion_Stop)
+        """
+        with self.__lock:
+            self.__write(eRobotCommand.Motion_Stop)
+
+    def close(self):
+        """
+        停止JOG並結束看門狗執行緒
+        """
+        if self.isClosed:
+            return
+        self.__closed.set()
+        if self.__watchdog is not None and self.__watchdog is not threading.current_thread():
+            self.__watchdog.join()
+        self.stop()
+
+    def __write(self, command: eRobotCommand):
+        """
+        寫入命令(呼叫端需持有__lock)
+        """
+        self.__writeCommand(command)
+        self.__command = command
+        self.__lastWrite = time.monotonic()
+        self.writeCount += 1
+
+    def __run(self):
+        interval = self.deadmanTimeout / 4
+        if self.heartbeatInterval is not None:
+            interval = min(interval, self.heartbeatInterval / 2)
+        while not self.__closed.wait(interval):
+            triggered = False
+            with self.__lock:
+                if not self.isJogging:
+                    continue
+                now = time.monotonic()
+                try:
+                    if now - self.__lastFeed > self.deadmanTimeout:
+                        self.__write(eRobotCommand.Motion_Stop)
+                        self.deadmanCount += 1
+                        triggered = True
+                    elif self.heartbeatInterval is not None and now - self.__lastWrite >= self.heartbeatInterval:
+                        self.__write(self.__command)
+                except Exception as e:
+                    # 寫入失敗時保留目前狀態，下一輪再試
+                    self.lastError = e
+            if triggered and self.onDeadman is not None:
+                self.onDeadman()
@@ -0,0 +1,178 @@
+import time
+import threading
+from typing import Callable, Optional, TypeVar
+
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+T = TypeVar("T")
+
+
+class ModbusConnectionError(ConnectionError):
+    """
+    重新連線或重試後仍無法與控制器通訊
+    """
+
+
+class ModbusConnection:
+    """
+    Modbus TCP連線管理
+
+    包裝一個ModbusTcpClient，負責：
+    1. 執行緒安全：ModbusTcpClient非執行緒安全，所有請求都在此連線的鎖內執行
+    2. 健康檢查：每次請求前確認socket仍開啟，checkHealth()可主動以一次輕量讀取確認控制器有回應
+    3. 自動重連：socket中斷時以指數退避重新連線，重連成功後呼叫onReconnect(如讓寄存器影子快取失效)
+    4. 重試：傳輸層失敗時關閉socket，可安全重複的請求(讀取)會在重連後重試，寫入則直接拋出例外，
+       避免命令在已送達的情況下被重送
+
+    每個ModbusConnection只有一個socket，需要讓遙測讀取與命令寫入互不等待時，
+    可用clone()開啟第二條連線(見Robot.startTelemetry(dedicatedConnection=True))。
+    """
+    def __init__(self,
+                 client: ModbusTcpClient,
+                 retryTimes: int = 2,
+                 reconnectAttempts: int = 3,
+                 reconnectDelay: float = 0.1,
+                 maxReconnectDelay: float = 2.0,
+                 onReconnect: Optional[Callable[[], None]] = None):
+        """
+        參數:
+        client: 要管理的ModbusTcpClient
+        retryTimes: 可重試的請求在傳輸失敗後最多重試的次數
+        reconnectAttempts: 每次重新連線最多嘗試的次數
+        reconnectDelay: 第一次重連失敗後的等待時間(秒)，之後每次加倍
+        maxReconnectDelay: 重連等待時間的上限(秒)
+        onReconnect: 斷線後重新連線成功時呼叫的函式
+        """
+        self.client = client
+        self.retryTimes = retryTimes
+        self.reconnectAttempts = reconnectAttempts
+        self.reconnectDelay = reconnectDelay
+        self.maxReconnectDelay = maxReconnectDelay
+        self.onReconnect = onReconnect
+        self.reconnectCount = 0                 #斷線後重新連線成功的次數
+        self.lastError: Optional[Exception] = None
+        self.__lock = threading.RLock()
+        self.__hasConnected = False
+
+    @classmethod
+    def fromHost(cls, host: str, port: int, **kwargs) -> "ModbusConnection":
+        """
+        以主機地址建立連線(尚未連線，第一次請求或connect()時才會連線)，kwargs同__init__
+        """
+        return cls(ModbusTcpClient(host, port), **kwargs)
+
+    def clone(self, **kwargs) -> "ModbusConnection":
+        """
+        開啟一條連到同一台控制器的新連線(不共用socket與鎖)，kwargs可覆寫__init__的參數
+        """
+        options = dict(retryTimes=self.retryTimes,
+                       reconnectAttempts=self.reconnectAttempts,
+                       reconnectDelay=self.reconnectDelay,
+                       maxReconnectDelay=self.maxReconnectDelay)
+        options.update(kwargs)
+        return ModbusConnection.fromHost(self.client.comm_params.host, self.client.comm_params.port, **options)
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        此連線的鎖，需要連續執行多個請求而不被其他執行緒插入時可取得
+        """
+        return self.__lock
+
+    def isConnected(self) -> bool:
+        return self.client.is_socket_open()
+
+    def connect(self) -> bool:
+        """
+        連線一次(不重試)
+
+        返回:
+        bool: 是否連線成功
+        """
+        with self.__lock:
+            if self.client.is_socket_open():
+                return True
+            if not self.client.connect():
+                return False
+            if self.__hasConnected:
+                self.reconnectCount += 1
+                if self.onReconnect is not None:
+                    self.onReconnect()
+            self.__hasConnected = True
+            return True
+
+    def ensureConnected(self):
+        """
+        確認socket開啟，否則以指數退避重新連線，全部失敗時拋出ModbusConnectionError
+        """
+        with self.__lock:
+            delay = self.reconnectDelay
+            for attempt in range(max(1, self.reconnectAttempts)):
+                if attempt > 0:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.maxReconnectDelay)
+                if self.connect():
+                    return
+                self.client.close()
+            self.lastError = ModbusConnectionError(f"無法連線至 {self.describe()}")
+            raise self.lastError
+
+    def close(self):
+        with self.__lock:
+            self.client.close()
+
+    def execute(self, request: Callable[[ModbusTcpClient], T], retry: bool = False,
+                onRetry: Optional[Callable[[Exception], None]] = None) -> T:
+        """
+        在連線鎖內執行一次請求
+
+        參數:
+        request: 以ModbusTcpClient執行請求的函式，如 lambda client: client.read_holding_registers(0x00F0, 12, 2)
+        retry: 是否可在傳輸失敗後重新連線並重試(只有可安全重複的請求，例如讀取，才應設為True)
+        onRetry: 每次傳輸失敗且即將重試時呼叫，參數為失敗的例外(用於統計，見TransactionMetrics)
+
+        返回:
+        request的返回值(控制器回應的Modbus例外碼不視為傳輸失敗，仍會返回，由呼叫端檢查isError())
+        """
+        attempts = self.retryTimes + 1 if retry else 1
+        with self.__lock:
+            for attempt in range(attempts):
+                self.ensureConnected()
+                try:
+                    response = request(self.client)
+                except (ConnectionException, ModbusIOException, OSError) as e:
+                    error = e
+                else:
+                    if not isinstance(response, ModbusIOException):
+                        self.lastError = None
+                        return response
+                    error = response
+                # 傳輸失敗後socket狀態不明，關閉讓下一次請求重新連線
+                self.client.close()
+                if onRetry is not None and attempt < attempts - 1:
+                    onRetry(error)
+            self.lastError = ModbusConnectionError(f"與 {self.describe()} 通訊失敗: {error}")
+            raise self.lastError from error
+
+    def checkHealth(self, address: int = 0x0138, unit: int = 2) -> bool:
+        """
+        以一次單一寄存器的讀取(預設為系統狀態0x0138)確認控制器有回應
+
+        返回:
+        bool: 控制器是否正常回應
+        """
+        try:
+            response = self.execute(lambda client: client.read_holding_registers(address, 1, unit), retry=True)
+        except ModbusConnectionError:
+            return False
+        return not response.isError()
+
+    def describe(self) -> str:
+        """
+        連線對象的說明(主機與埠)，用於錯誤訊息
+        """
+        commParams = getattr(self.client, "comm_params", None)
+        if commParams is None:
+            return "modbus連接對象"
+        return f"modbus連接對象{commParams.host}:{commParams.port}"
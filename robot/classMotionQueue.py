@@ -0,0 +1,138 @@
+import time
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+from robot.enumRobotCommand import eRobotCommand, POSITIONLESS_COMMANDS
+from robot.classRobot import Robot, RobotErrorException
+from robot.registerMap import DRV_REGISTER_MAP, encodeRegisterField
+
+
+class MotionStep(NamedTuple):
+    """
+    佇列中的一個步驟(運動或動作)，目標位姿在加入佇列時就已編碼完成
+
+    robotCommand: 機器人指令，動作步驟為None
+    position: 目標位姿
+    payload: 已編碼的目標位姿寄存器值
+    speed, acceleration, deceleration: 此步驟的運動參數，None表示沿用目前設定
+    action: 動作步驟要執行的函式(如吸盤開關)，參數為Robot
+    """
+    robotCommand: Optional[eRobotCommand] = None
+    position: Optional[tuple[float, float, float, float, float, float]] = None
+    payload: Optional[list[int]] = None
+    speed: Optional[int] = None
+    acceleration: Optional[int] = None
+    deceleration: Optional[int] = None
+    action: Optional[Callable[[Robot], None]] = None
+
+
+class MotionProgress(NamedTuple):
+    """
+    執行進度
+
+    index: 剛完成的步驟索引(從0開始)
+    total: 步驟總數
+    step: 剛完成的步驟
+    elapsed: 從開始執行到目前經過的秒數
+    """
+    index: int
+    total: int
+    step: MotionStep
+    elapsed: float
+
+
+class MotionQueue:
+    """
+    運動佇列
+
+    一次加入多個運動，先把所有目標位姿編碼好，執行時只在開始前檢查一次機器人是否可運動，
+    速度、加減速度與上次寫入相同時不重複寫入(見Robot.writeMotionCommand())，並在控制器回報上一步完成後立即送出下一步，
+    減少連續取放(如warp_suction_example.py的Suction_Behave)中每一步之間的空檔。
+
+    使用方法:
+    queue = MotionQueue(robotDRV)
+    queue.append(abovePick, speed=50)
+    queue.append(pick)
+    queue.addAction(Robot.suctionON)
+    queue.append(abovePick)
+    for progress in queue.run():
+        print(f"{progress.index + 1}/{progress.total}")
+    """
+    def __init__(self, robot: Robot, moveTimeout: Optional[float] = None):
+        """
+        參數:
+        robot: 要控制的Robot
+        moveTimeout: 每一步運動的最長等待時間(秒)，None表示不限
+        """
+        self.robot = robot
+        self.moveTimeout = moveTimeout
+        self.steps: list[MotionStep] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def append(self,
+               position: Optional[Sequence[float]] = None,
+               robotCommand: eRobotCommand = eRobotCommand.Robot_Go_MovL,
+               speed: Optional[int] = None,
+               acceleration: Optional[int] = None,
+               deceleration: Optional[int] = None) -> "MotionQueue":
+        """
+        加入一個運動，參數意義與Robot.sendMotionCommand()相同(預設為MovL)
+        """
+        for name, value in (("speed", speed), ("acceleration", acceleration), ("deceleration", deceleration)):
+            if value is not None and not 0 <= value <= 100:
+                raise ValueError(f"{name} 應設為0到100之間的數值")
+        payload = None
+        if robotCommand not in POSITIONLESS_COMMANDS:
+            if position is None or len(position) != 6:
+                raise ValueError("參數錯誤，應傳入一個包含6個值的座標")
+            position = tuple(position)
+            payload = encodeRegisterField(DRV_REGISTER_MAP["targetPose"], list(position))
+        self.steps.append(MotionStep(robotCommand, position, payload, speed, acceleration, deceleration))
+        return self
+
+    def extend(self, positions: Sequence[Sequence[float]], **kwargs) -> "MotionQueue":
+        """
+        加入多個使用相同參數的運動，kwargs同append()
+        """
+        for position in positions:
+            self.append(position, **kwargs)
+        return self
+
+    def addAction(self, action: Callable[[Robot], None]) -> "MotionQueue":
+        """
+        加入一個在運動之間執行的動作，如Robot.suctionON
+        """
+        self.steps.append(MotionStep(action=action))
+        return self
+
+    def clear(self):
+        self.steps.clear()
+
+    def run(self) -> Iterator[MotionProgress]:
+        """
+        依序執行佇列中的步驟，每完成一步就產生一次MotionProgress
+
+        機器人不可運動時拋出RobotErrorException；單步逾時拋出TimeoutError
+        """
+        snapshot = self.robot.getRobotStatusSnapshot(maxAge=0)
+        if not snapshot.isRobotReadyForMotion:
+            raise RobotErrorException(f"機器人不允許運動: {snapshot.notReadyReason}")
+
+        startTime = time.monotonic()
+        total = len(self.steps)
+        for index, step in enumerate(list(self.steps)):
+            if step.action is not None:
+                step.action(self.robot)
+            else:
+                self.robot.writeMotionCommand(step.robotCommand, step.position, step.payload,
+                                              step.speed, step.acceleration, step.deceleration)
+                self.robot.waitRobotReachTargetPosition(timeout=self.moveTimeout)
+            yield MotionProgress(index, total, step, time.monotonic() - startTime)
+
+    def execute(self) -> list[MotionProgress]:
+        """
+        執行整個佇列直到完成，返回所有進度紀錄
+        """
+        return list(self.run())
+
@@ -0,0 +1,150 @@
+import math
+import time
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, Sequence
+
+# 已知目標位姿時，運動狀態(0x00E0)與TCP位姿(0x00F0~0x00FB)可以合併為一次讀取
+TARGET_WAIT_FIELDS = ("robotMotionState", "tcpPose")
+# 未知目標位姿時(如回原點、停止)，只看位姿狀態標誌
+FLAG_WAIT_FIELDS = ("poseFlag",)
+
+
+class MotionWaiter:
+    """
+    運動完成等待引擎
+
+    取代固定間隔的time.sleep輪詢：
+    1. 已知目標位姿時，每次只做一次合併讀取(運動狀態+TCP位姿)，運動停止且位姿接近目標即視為完成
+    2. 依接近目標的速度預估到達時間，接近到達時縮短輪詢間隔，距離尚遠時放寬間隔
+    3. 支援逾時，以及Future/回呼介面(waitAsync())
+    """
+    def __init__(self,
+                 readFields: Callable[..., dict],
+                 closeToTargetThreshold: float = 0.01,
+                 minInterval: float = 0.005,
+                 maxInterval: float = 0.1,
+                 abortEvent: Optional[threading.Event] = None,
+                 abortError: Optional[Callable[[], Exception]] = None):
+        """
+        參數:
+        readFields: 讀取欄位的函式，通常是Robot.readFieldsCached(可與遙測執行緒共用讀取)
+        closeToTargetThreshold: 位姿到達目標的閥值
+        minInterval: 最短輪詢間隔(秒)，接近到達時使用
+        maxInterval: 最長輪詢間隔(秒)
+        abortEvent: 被set時立即中止等待(例如ErrorMonitor.faultEvent)
+        abortError: 中止時拋出的例外，None表示拋出RuntimeError
+        """
+        if minInterval <= 0 or maxInterval < minInterval:
+            raise ValueError("輪詢間隔應滿足 0 < minInterval <= maxInterval")
+        self.__readFields = readFields
+        self.closeToTargetThreshold = closeToTargetThreshold
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.abortEvent = abortEvent
+        self.__abortError = abortError or (lambda: RuntimeError("運動等待已中止"))
+
+    def isComplete(self, values: dict, targetPose: Optional[Sequence[float]] = None) -> bool:
+        """
+        由讀取到的欄位判斷運動是否完成
+        """
+        if targetPose is None:
+            return values["poseFlag"] == 1
+        return (values["robotMotionState"] == 0 and
+                math.dist(values["tcpPose"], targetPose) < self.closeToTargetThreshold)
+
+    def wait(self,
+             targetPose: Optional[Sequence[float]] = None,
+             timeout: Optional[float] = None,
+             expectedDuration: Optional[float] = None) -> dict:
+        """
+        等待運動完成
+
+        參數:
+        targetPose: 目標位姿(x, y, z, rx, ry, rz)，None表示只看位姿狀態標誌
+        timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+        expectedDuration: 預估的運動時間(秒)，提供時會在預估到達前後縮短輪詢間隔
+
+        返回:
+        dict: 判定完成時讀到的欄位
+
+        abortEvent被set時(如機器人發生錯誤)拋出abortError()
+        """
+        fields = FLAG_WAIT_FIELDS if targetPose is None else TARGET_WAIT_FIELDS
+        startTime = time.monotonic()
+        deadline = None if timeout is None else startTime + timeout
+        interval = self.minInterval
+        previousDistance, previousTime = None, None
+
+        while True:
+            now = time.monotonic()
+            values = self.__readFields(*fields)
+            if self.isComplete(values, targetPose):
+                return values
+            if self.abortEvent is not None and self.abortEvent.is_set():
+                raise self.__abortError()
+            if deadline is not None and now >= deadline:
+                raise TimeoutError(f"等待運動完成逾時({timeout}秒)")
+
+            if targetPose is not None:
+                distance = math.dist(values["tcpPose"], targetPose)
+                interval = self.__nextIntervalByDistance(interval, distance, previousDistance, now - (previousTime or now))
+                previousDistance, previousTime = distance, now
+            elif expectedDuration is not None:
+                remaining = startTime + expectedDuration - now
+                interval = self.__clamp(remaining / 2) if remaining > 0 else self.minInterval
+            else:
+                interval = self.__clamp(interval * 1.5)
+
+            if deadline is not None:
+                interval = min(interval, max(0.0, deadline - time.monotonic()))
+            if self.abortEvent is not None:
+                self.abortEvent.wait(interval)     # 中止時立即醒來
+            else:
+                time.sleep(interval)
+
+    def waitAsync(self,
+                  targetPose: Optional[Sequence[float]] = None,
+                  timeout: Optional[float] = None,
+                  expectedDuration: Optional[float] = None,
+                  callback: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        在背景執行緒等待運動完成，立即返回concurrent.futures.Future
+
+        參數同wait()，另外:
+        callback: 完成(或失敗)時呼叫的回呼，參數為Future本身
+
+        返回:
+        Future: result()為wait()的返回值，逾時則為TimeoutError
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.wait(targetPose, timeout, expectedDuration))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def __nextIntervalByDistance(self, interval: float, distance: float,
+                                 previousDistance: Optional[float], elapsed: float) -> float:
+        """
+        依距離變化預估到達時間，取預估時間的一半作為下一次的輪詢間隔
+        """
+        if distance < self.closeToTargetThreshold * 10:     # 已非常接近(減速或穩定中)
+            return self.minInterval
+        if previousDistance is None or elapsed <= 0:
+            return self.minInterval                         # 先快速取得第二個樣本以估計速度
+        approachSpeed = (previousDistance - distance) / elapsed
+        if approachSpeed <= 0:
+            return self.__clamp(interval * 1.5)             # 尚未開始接近(加速中或停頓)，逐步放寬
+        return self.__clamp(distance / approachSpeed / 2)
+
+    def __clamp(self, interval: float) -> float:
+        return min(self.maxInterval, max(self.minInterval, interval))
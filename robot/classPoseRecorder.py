@@ -0,0 +1,242 @@
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+from robot.poseCodec import POSE_REGISTER_COUNT, POSE_SCALE
+from robot.registerMap import DRV_REGISTER_MAP
+
+# 每筆樣本的格式：取樣時間(time.monotonic)、位姿(x, y, z, rx, ry, rz)、運動狀態(0:停止 1:運動中)
+POSE_SAMPLE_DTYPE = np.dtype([("timestamp", "<f8"), ("pose", "<f8", (6,)), ("motionState", "<u2")])
+
+# 運動狀態(0x00E0)與位姿(0x00F0~0x00FB)以一次讀取取得
+_MOTION_STATE_ADDRESS = DRV_REGISTER_MAP["robotMotionState"].address
+_POSE_OFFSET = DRV_REGISTER_MAP["tcpPose"].address - _MOTION_STATE_ADDRESS
+_SAMPLE_REGISTER_COUNT = _POSE_OFFSET + POSE_REGISTER_COUNT
+
+
+class PoseRecorder:
+    """
+    高頻率的TCP位姿紀錄器
+
+    取樣執行緒以固定頻率(例如50~100Hz)一次讀取運動狀態與位姿，直接解碼寫入預先配置的NumPy環形緩衝區，
+    取樣過程不產生dict、tuple等Python物件，適合週期時間(cycle time)分析。
+
+    環形緩衝區配置兩倍容量，每筆樣本同時寫在i與i+capacity兩個位置，
+    因此最近N筆樣本永遠是連續的一段記憶體，latest()可以直接返回view而不需要複製。
+
+    指定spillDirectory時，每累積chunkSize筆樣本就把該段複製一份交給寫檔執行緒存成.npy，
+    取樣執行緒不等待檔案寫入；寫檔跟不上時丟棄該段並累加droppedChunks，而不是拖慢取樣。
+
+    使用方法:
+    recorder = robotDRV.createPoseRecorder(rate=100, spillDirectory="records")
+    recorder.start()
+    ...
+    samples = recorder.latest(500)
+    print(samples["timestamp"], samples["pose"][:, 0:3], samples["motionState"])
+    recorder.stop()
+    allSamples = PoseRecorder.loadSpilledChunks("records")
+    """
+    def __init__(self,
+                 readRegisters: Callable[[int, int], list[int]],
+                 rate: float = 100.0,
+                 capacity: int = 6000,
+                 spillDirectory: Optional[str] = None,
+                 chunkSize: int = 1000,
+                 filePrefix: str = "poses",
+                 maxPendingChunks: int = 8):
+        """
+        參數:
+        readRegisters: 讀取寄存器的函式(address, count) -> list[int]，通常為Robot.readRegisters
+        rate: 取樣頻率(Hz)
+        capacity: 環形緩衝區保留的樣本數
+        spillDirectory: 寫出.npy檔案的資料夾，None表示只保留在記憶體
+        chunkSize: 每個.npy檔案的樣本數，需不大於capacity
+        filePrefix: .npy檔名前綴，檔名為{filePrefix}_{序號:06d}.npy
+        maxPendingChunks: 等待寫檔的最大段數，超過時丟棄新的段
+        """
+        if rate <= 0:
+            raise ValueError("取樣頻率必須大於0")
+        if capacity <= 0:
+            raise ValueError("緩衝區容量必須大於0")
+        if spillDirectory is not None and not 0 < chunkSize <= capacity:
+            raise ValueError("chunkSize必須大於0且不大於capacity")
+        self.__readRegisters = readRegisters
+        self.period = 1.0 / rate
+        self.capacity = capacity
+        self.spillDirectory = spillDirectory
+        self.chunkSize = chunkSize
+        self.filePrefix = filePrefix
+        self.__buffer = np.zeros(2 * capacity, dtype=POSE_SAMPLE_DTYPE)
+        self.__count = 0                # 累計取樣數，下一筆寫入位置為__count % capacity
+        self.__spilledCount = 0         # 已交給寫檔執行緒的樣本數
+        self.__chunkIndex = 0
+        self.__sampleLock = threading.Lock()
+        self.__stopEvent = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__spillQueue: queue.Queue = queue.Queue(maxPendingChunks)
+        self.__spillThread: Optional[threading.Thread] = None
+        self.overrunCount = 0           # 因讀取太慢而錯過的取樣週期數
+        self.droppedChunks = 0          # 因寫檔跟不上而丟棄的段數
+        self.spilledFiles: list[str] = []
+        self.lastError: Optional[Exception] = None
+
+    def __enter__(self) -> "PoseRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def __len__(self) -> int:
+        return min(self.__count, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """
+        開始至今的累計取樣數(包含已被覆蓋的樣本)
+        """
+        return self.__count
+
+    @property
+    def isRunning(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        最近n筆樣本(依時間排序)，為環形緩衝區的唯讀view，不會複製資料
+
+        注意：取樣持續進行時，view的內容會在capacity筆樣本後被新的樣本覆蓋，
+        需要長期保存或跨越較長時間分析時請呼叫.copy()
+
+        參數:
+        n: 樣本數，None表示緩衝區內的全部樣本
+
+        返回:
+        np.ndarray: dtype為POSE_SAMPLE_DTYPE的結構化陣列，可用["timestamp"], ["pose"], ["motionState"]取欄位
+        """
+        count = self.__count
+        available = min(count, self.capacity)
+        n = available if n is None else max(0, min(n, available))
+        end = count % self.capacity + self.capacity
+        view = self.__buffer[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def sampleOnce(self) -> int:
+        """
+        立即讀取一次並寫入緩衝區
+
+        返回:
+        int: 此樣本的累計序號
+        """
+        timestamp = time.monotonic()
+        registers = self.__readRegisters(_MOTION_STATE_ADDRESS, _SAMPLE_REGISTER_COUNT)
+        with self.__sampleLock:
+            index = self.__count
+            slot = index % self.capacity
+            sample = self.__buffer[slot]
+            sample["timestamp"] = timestamp
+            sample["motionState"] = registers[0]
+            words = np.asarray(registers[_POSE_OFFSET:_SAMPLE_REGISTER_COUNT], dtype="<u2")
+            np.multiply(words.view("<i4"), POSE_SCALE, out=sample["pose"])
+            self.__buffer[slot + self.capacity] = sample
+            self.__count = index + 1    # 資料寫完才更新計數，讀取端不會看到寫到一半的樣本
+            if self.spillDirectory is not None and self.__count - self.__spilledCount >= self.chunkSize:
+                self.__queueChunk(self.chunkSize)
+        return index
+
+    def start(self):
+        """
+        啟動取樣執行緒(有指定spillDirectory時一併啟動寫檔執行緒)
+        """
+        if self.isRunning:
+            return
+        if self.spillDirectory is not None:
+            os.makedirs(self.spillDirectory, exist_ok=True)
+            if self.__spillThread is None or not self.__spillThread.is_alive():
+                self.__spillThread = threading.Thread(target=self.__runSpill, daemon=True)
+                self.__spillThread.start()
+        self.__stopEvent.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        停止取樣，並把尚未寫出的樣本寫成最後一個.npy檔後等待寫檔完成
+        """
+        self.__stopEvent.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+        if self.__spillThread is not None:
+            with self.__sampleLock:
+                remaining = self.__count - self.__spilledCount
+                if remaining > 0:
+                    self.__queueChunk(remaining, block=True)
+            self.__spillQueue.put(None, block=True)
+            self.__spillThread.join()
+            self.__spillThread = None
+
+    def __run(self):
+        # 以絕對時間排程，讀取耗時的變化不會累積成頻率漂移
+        nextTime = time.monotonic()
+        while not self.__stopEvent.is_set():
+            try:
+                self.sampleOnce()
+                self.lastError = None
+            except Exception as e:
+                # 讀取失敗時跳過這次取樣，由lastError回報
+                self.lastError = e
+            nextTime += self.period
+            now = time.monotonic()
+            if now > nextTime:
+                missed = int((now - nextTime) / self.period) + 1
+                self.overrunCount += missed
+                nextTime += missed * self.period
+            self.__stopEvent.wait(nextTime - now)
+
+    def __queueChunk(self, size: int, block: bool = False):
+        """
+        複製size筆尚未寫出的樣本交給寫檔執行緒(呼叫端需持有__sampleLock)
+        """
+        start = self.__spilledCount
+        end = start + size
+        # 序號k的樣本位於緩衝區的 (__count % capacity + capacity) - (__count - k)
+        last = self.__count % self.capacity + self.capacity
+        chunk = self.__buffer[last - (self.__count - start):last - (self.__count - end)].copy()
+        self.__spilledCount = end
+        try:
+            self.__spillQueue.put((self.__chunkIndex, chunk), block=block)
+        except queue.Full:
+            self.droppedChunks += 1
+        self.__chunkIndex += 1
+
+    def __runSpill(self):
+        while True:
+            item = self.__spillQueue.get()
+            if item is None:
+                return
+            index, chunk = item
+            path = os.path.join(self.spillDirectory, f"{self.filePrefix}_{index:06d}.npy")
+            try:
+                np.save(path, chunk)
+                self.spilledFiles.append(path)
+            except Exception as e:
+                self.lastError = e
+
+    @staticmethod
+    def loadSpilledChunks(directory: str, filePrefix: str = "poses") -> np.ndarray:
+        """
+        依序讀取並串接spillDirectory中的.npy檔
+
+        返回:
+        np.ndarray: dtype為POSE_SAMPLE_DTYPE的結構化陣列
+        """
+        names = sorted(name for name in os.listdir(directory)
+                       if name.startswith(f"{filePrefix}_") and name.endswith(".npy"))
+        chunks = [np.load(os.path.join(directory, name)) for name in names]
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=POSE_SAMPLE_DTYPE)
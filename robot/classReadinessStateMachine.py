@@ -0,0 +1,167 @@
+import time
+from enum import Enum
+from typing import Callable, NamedTuple, Optional
+
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot, STATUS_FIELDS
+from robot.registerMap import SERVO_ENABLE_VALUE
+
+# 伺服啟用寄存器(0x0000~0x0007)，與STATUS_FIELDS一起讀取時會多一次區塊讀取
+SERVO_ENABLE_FIELDS = ("servoEnableJ1J2", "servoEnableJ3J4", "servoEnableJ5J6")
+# 判斷是否可運動所需的欄位
+READINESS_FIELDS = STATUS_FIELDS + SERVO_ENABLE_FIELDS
+
+
+class eReadinessState(Enum):
+    CHECKING = 1            # 讀取目前狀態
+    RESETTING_ERRORS = 2    # 重設錯誤
+    ENABLING_SERVO = 3      # 啟用伺服
+    WAITING_READY = 4       # 等待機器人回報可運動
+    RETRY_DELAY = 5         # 本次嘗試逾時，等待後重試
+    READY = 6               # 可運動
+    FAILED = 7              # 重試次數用完或整體逾時
+
+
+class ReadinessProgress(NamedTuple):
+    """
+    準備狀態的進度(狀態改變時通知progressCallback)
+
+    state: 目前狀態
+    attempt: 第幾次嘗試(從1開始，尚未開始為0)
+    elapsed: 開始至今經過的秒數
+    reason: 尚未可運動的原因
+    """
+    state: eReadinessState
+    attempt: int
+    elapsed: float
+    reason: str
+
+
+class ReadinessStep(NamedTuple):
+    """
+    狀態機決定的下一步
+
+    state: 決定後的狀態
+    resetErrors: 是否需要重設錯誤(Robot.resetRobotError())
+    enableServo: 是否需要寫入伺服啟用
+    delay: 執行完動作後，下一次讀取前的等待時間(秒)
+    """
+    state: eReadinessState
+    resetErrors: bool = False
+    enableServo: bool = False
+    delay: float = 0.0
+
+    @property
+    def isFinished(self) -> bool:
+        return self.state in (eReadinessState.READY, eReadinessState.FAILED)
+
+
+class ReadinessStateMachine:
+    """
+    讓機器人進入可運動狀態的狀態機
+
+    取代「重設錯誤 -> 啟用伺服 -> 固定等待2秒 -> 檢查 -> 再等待1秒」的流程：
+    每次讀取READINESS_FIELDS後由update()決定下一步，只在有錯誤時重設、只在伺服未啟用時寫入啟用，
+    之後以pollInterval輪詢，機器人一回報可運動就結束。
+    一次嘗試超過attemptTimeout仍未就緒時，等待retryDelay後重新嘗試，最多retryTimes次。
+
+    伺服啟用寄存器讀回SERVO_ENABLE_VALUE(0x0101)才算已啟用，這只是依寫入值推測，尚未在實機上確認，
+    因此預設只用它決定是否需要寫入啟用：讀回值不同時寫入一次啟用，之後只依錯誤與狀態欄位判斷是否可運動。
+    確認控制器會讀回0x0101後，可以checkServoReadback=True讓READY也必須等到讀回值相符。
+
+    狀態機本身不做通訊，Robot.prepareRobotForMotion()與AsyncRobot.prepareRobotForMotion()
+    各自負責讀取、執行動作與等待。
+    """
+    def __init__(self,
+                 retryTimes: int = 5,
+                 retryDelay: float = 1.0,
+                 attemptTimeout: float = 3.0,
+                 timeout: Optional[float] = None,
+                 pollInterval: float = 0.05,
+                 minEnableTime: float = 0.0,
+                 progressCallback: Optional[Callable[[ReadinessProgress], None]] = None,
+                 checkServoReadback: bool = False):
+        """
+        參數:
+        retryTimes: 最多嘗試次數
+        retryDelay: 一次嘗試失敗後，重新嘗試前的等待時間(秒)
+        attemptTimeout: 單次嘗試等待機器人就緒的最長時間(秒)
+        timeout: 整體最長時間(秒)，None表示只受retryTimes限制
+        pollInterval: 輪詢間隔(秒)
+        minEnableTime: 寫入伺服啟用後至少等待的時間(秒)，控制器需要時間讓伺服實際激磁時使用
+        progressCallback: 狀態改變時呼叫，參數為ReadinessProgress
+        checkServoReadback: 是否要求伺服啟用寄存器讀回SERVO_ENABLE_VALUE才算可運動
+        """
+        self.retryTimes = retryTimes
+        self.retryDelay = retryDelay
+        self.attemptTimeout = attemptTimeout
+        self.timeout = timeout
+        self.pollInterval = pollInterval
+        self.minEnableTime = minEnableTime
+        self.progressCallback = progressCallback
+        self.checkServoReadback = checkServoReadback
+        self.state = eReadinessState.CHECKING
+        self.attempt = 0
+        self.reason = ""
+        self.__startTime: Optional[float] = None
+        self.__attemptStartTime: Optional[float] = None
+        self.__enableTime: Optional[float] = None
+
+    @staticmethod
+    def isServoEnabled(values: dict) -> bool:
+        return all(values[name] == SERVO_ENABLE_VALUE for name in SERVO_ENABLE_FIELDS)
+
+    def update(self, values: dict, now: Optional[float] = None) -> ReadinessStep:
+        """
+        依讀取到的欄位決定下一步
+
+        參數:
+        values: readFields(*READINESS_FIELDS)的結果
+        now: 目前時間(time.monotonic)，None表示現在
+
+        返回:
+        ReadinessStep: 下一步
+        """
+        now = time.monotonic() if now is None else now
+        if self.__startTime is None:
+            self.__startTime = now
+        snapshot = RobotStatusSnapshot.fromFields(values, now)
+        servoEnabled = self.isServoEnabled(values)
+        # 不檢查讀回值時，寫入過啟用就視為已啟用
+        servoReady = servoEnabled or (not self.checkServoReadback and self.__enableTime is not None)
+        settled = self.__enableTime is None or now - self.__enableTime >= self.minEnableTime
+        self.reason = snapshot.notReadyReason + ("" if servoReady else "伺服未啟用\n")
+
+        if snapshot.isRobotReadyForMotion and servoReady and settled:
+            return self.__transition(eReadinessState.READY, now)
+        if self.timeout is not None and now - self.__startTime >= self.timeout:
+            return self.__transition(eReadinessState.FAILED, now)
+
+        attemptExpired = (self.__attemptStartTime is not None and
+                          now - self.__attemptStartTime >= self.attemptTimeout)
+        if attemptExpired and self.state != eReadinessState.RETRY_DELAY:
+            if self.attempt >= self.retryTimes:
+                return self.__transition(eReadinessState.FAILED, now)
+            return self.__transition(eReadinessState.RETRY_DELAY, now, delay=self.retryDelay)
+
+        if self.__attemptStartTime is None or self.state == eReadinessState.RETRY_DELAY:
+            # 開始新的一次嘗試：只做需要的動作
+            self.attempt += 1
+            self.__attemptStartTime = now
+            resetErrors = snapshot.isRobotError
+            enableServo = not servoEnabled or resetErrors     # 重設錯誤後伺服可能被關閉，一併重新啟用
+            if enableServo:
+                self.__enableTime = now
+            state = (eReadinessState.RESETTING_ERRORS if resetErrors else
+                     eReadinessState.ENABLING_SERVO if enableServo else
+                     eReadinessState.WAITING_READY)
+            return self.__transition(state, now, resetErrors, enableServo, self.pollInterval)
+
+        return self.__transition(eReadinessState.WAITING_READY, now, delay=self.pollInterval)
+
+    def __transition(self, state: eReadinessState, now: float,
+                     resetErrors: bool = False, enableServo: bool = False, delay: float = 0.0) -> ReadinessStep:
+        if state != self.state or resetErrors or enableServo:
+            self.state = state
+            if self.progressCallback is not None:
+                self.progressCallback(ReadinessProgress(state, self.attempt, now - self.__startTime, self.reason))
+        return ReadinessStep(state, resetErrors, enableServo, delay)
@@ -0,0 +1,82 @@
+import threading
+from typing import Callable, Optional
+
+
+class RegisterShadow:
+    """
+    已寫入保持寄存器的影子快取(write-through)
+
+    記錄最近一次成功寫入每個寄存器的值，讓Robot可以略過「寫入相同的值」這類多餘的通訊。
+    快取只反映本程式寫入的內容，以下情況需要讓快取失效：
+    1. 重新連線(控制器可能已重新啟動)
+    2. 重設錯誤(控制器可能回到預設參數)
+    3. 控制器上的值被外部(教導盒、其他客戶端)修改，可用verify()讀回比對
+    """
+    def __init__(self):
+        self.__values: dict[int, int] = {}
+        self.__lock = threading.Lock()
+
+    def __contains__(self, address: int) -> bool:
+        return address in self.__values
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def get(self, address: int) -> Optional[int]:
+        """
+        取得寄存器最近一次寫入的值，未知則返回None
+        """
+        return self.__values.get(address)
+
+    def isUnchanged(self, address: int, values: list[int]) -> bool:
+        """
+        檢查從address開始寫入values是否與快取完全相同(任何一個寄存器未知即視為不同)
+        """
+        with self.__lock:
+            return all(self.__values.get(address + i) == value for i, value in enumerate(values))
+
+    def update(self, address: int, values: list[int]):
+        """
+        記錄一次成功的寫入
+        """
+        with self.__lock:
+            for i, value in enumerate(values):
+                self.__values[address + i] = value
+
+    def invalidate(self, address: Optional[int] = None, count: int = 1):
+        """
+        讓快取失效
+
+        參數:
+        address: 起始地址，None表示清除全部
+        count: 寄存器數量
+        """
+        with self.__lock:
+            if address is None:
+                self.__values.clear()
+                return
+            for i in range(count):
+                self.__values.pop(address + i, None)
+
+    def verify(self, readAddresses: Callable[[list[int]], dict[int, int]]) -> list[int]:
+        """
+        讀回所有已快取的寄存器，與快取不同的(被外部修改)會被移出快取
+
+        參數:
+        readAddresses: 讀取函式，輸入地址列表，返回 地址 -> 目前的值
+
+        返回:
+        list[int]: 被外部修改的寄存器地址
+        """
+        with self.__lock:
+            addresses = sorted(self.__values)
+        if not addresses:
+            return []
+        actualValues = readAddresses(addresses)
+        mismatches = []
+        with self.__lock:
+            for address in addresses:
+                if address in self.__values and actualValues.get(address) != self.__values[address]:
+                    del self.__values[address]
+                    mismatches.append(address)
+        return mismatches
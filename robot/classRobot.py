@@ -1,19 +1,33 @@
 
+import math
+import os
+import sys
 import time
 import threading
-from typing import Union, Tuple, Optional
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Union, Tuple, Optional
 
-
-import time
-import threading
-from typing import Union, Tuple, Optional
-
-from pymodbus.payload import BinaryPayloadBuilder, BinaryPayloadDecoder
-from pymodbus.constants import Endian
 from pymodbus.client import ModbusTcpClient
 
 
-from robot.enumRobotCommand import eRobotCommand
+from robot.enumRobotCommand import eRobotCommand, POSITIONLESS_COMMANDS
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot, STATUS_FIELDS
+from robot.registerMap import RegisterField, DRV_REGISTER_MAP, planRegisterReads, decodeReadBlocks, encodeRegisterField, DEFAULT_MAX_GAP
+from robot.classTelemetryPoller import TelemetryPoller, TelemetrySnapshot, DEFAULT_TELEMETRY_FIELDS
+from robot.classMotionWaiter import MotionWaiter
+from robot.classRegisterShadow import RegisterShadow
+from robot.classWritePlan import WritePlan
+from robot.classModbusConnection import ModbusConnection, ModbusConnectionError
+from robot.classTransactionMetrics import TransactionRecord, TransactionTimer
+from robot.classReadinessStateMachine import ReadinessStateMachine, ReadinessProgress, eReadinessState, READINESS_FIELDS
+from robot.classPoseRecorder import PoseRecorder
+from robot.classErrorMonitor import ErrorMonitor, RobotEvent
+from robot.classIOBank import IOBank
+from robot.classJogSession import JogSession, JogSessionError
+from robot.classWaitCondition import WaitCondition, InputCondition, PoseReachedCondition, waitForCondition
+
+_ROBOT_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))     # 用於判斷交易的呼叫來源(見Robot.transactionLabel())
 # 自訂例外
 class RequestErrorException(Exception):
     def __init__(self, message: str = "Request error.", errorCode: int = 1):
@@ -32,18 +46,18 @@ class RobotErrorException(Exception):
 
 ###########################################################
 def clearBit(num: int, *args: int) -> int:
-    # 創建遮罩，將第 n 位設為 0，其他位設為 1
-    operationBits = args
-    for bit in operationBits:
-        mask = ~(1 << bit)
+    # 創建遮罩，將所有指定的位設為 0，其他位設為 1
+    mask = 0
+    for bit in args:
+        mask |= 1 << bit
     # 對 num 進行按位 AND 操作
-    return num & mask
+    return num & ~mask
 
 def setBit(num: int, *args: int) -> int:
-    # 創建遮罩，將第 n 位設為 1，其他位保持不變
-    operationBits = args
-    for bit in operationBits:
-        mask = 1 << bit
+    # 創建遮罩，將所有指定的位設為 1，其他位保持不變
+    mask = 0
+    for bit in args:
+        mask |= 1 << bit
     # 對 num 進行按位 OR 操作
     return num | mask
 
@@ -100,41 +114,62 @@ class Robot:
         
         """
         
+        #定義屬性：
+        self.__lastWriteTime = 0.0                                              #最近一次寫入完成的時間，早於此時間的遙測快照視為過期
+        self.registerShadow = RegisterShadow()                                  #已寫入寄存器的影子快取，用以略過重複寫入
+        self.io = IOBank(self.writeRegister, self.readFields)                     #數位輸入/輸出(吸盤為名為"suction"的DO通道)
+
         #檢查input是否合法
+        #所有通訊經由ModbusConnection(執行緒安全、斷線自動重連，重連後讓影子快取失效)
         if modbusTCPClient:
-            self.modbusTCPClient = modbusTCPClient
-            if not self.modbusTCPClient.is_socket_open():
-                self.modbusTCPClient.connect()
+            self.connection = ModbusConnection(modbusTCPClient, onReconnect=self.invalidateRegisterShadow)
+            self.connection.connect()
         elif host and port:
-            self.modbusTCPClient = ModbusTcpClient(host, port)
-            self.modbusTCPClient.connect()
+            self.connection = ModbusConnection(ModbusTcpClient(host, port), onReconnect=self.invalidateRegisterShadow)
+            self.connection.connect()
         else:
-            self.modbusTCPClient = None
-
-        #定義屬性：
+            self.connection = None
+        self.telemetryConnection: Optional[ModbusConnection] = None             #遙測專用連線(startTelemetry(dedicatedConnection=True))
+        self.__transactionListeners: list[Callable[[TransactionRecord], None]] = []    #每次Modbus交易後呼叫(見addTransactionListener())
+        self.__transactionLabel = threading.local()                             #transactionLabel()設定的呼叫來源(每個執行緒各自獨立)
+
+        self.motionWriteMaxGap = 0                                              #運動寫入規劃允許以影子快取值填補的間隙(見WritePlan)
+        self.useReadWriteMultiple = False                                       #控制器支援FC 0x17時，送出命令的同時讀回位姿狀態標誌
+        self.telemetryPoller: Optional[TelemetryPoller] = None
+        self.telemetryMaxAge: Optional[float] = None                            #getter可接受的遙測快照最大年齡(秒)
         self.__block = motionBlock                                              #定義所有的動作函式是否需要做block
         self.__blockTime = motionBlockTime                                      #定義在block的時候要等多久
         self.__suctionDigitalOutputNumber = suctionDigitalOutputNumber          #定義吸盤的位置(預設在DO_0)，請輸入0~15的值
         self.__latestMotionCommand: Tuple[Optional[float], Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]] = None, None, None, None, None, None 
-        self.__latestDigitalOutputCommand = 0
+        self.__motionWaitTarget: Optional[Tuple[float, float, float, float, float, float]] = None   #等待運動完成時比對的目標位姿，None表示只看位姿狀態標誌
+        self.io.nameOutputs(suction=suctionDigitalOutputNumber)
         self.speed = defaultSpeed
         self.acceleration = defaultAcceleration
         self.deceleration = defaultDeceleration
         
-        self.errorMonitorThread = threading.Thread(target=self.__monitorErrors)
-        self.errorMonitorThread.daemon = True  # 設置為守護執行緒
         self.errorMonitorThreadSleepTime = errorMonitorThreadSleepTime
-        self._stopThread = threading.Event()
+        self.errorMonitor: Optional[ErrorMonitor] = None                        #錯誤監控(startMonitorErrors())，發生錯誤時中止運動等待
         self.closeToTargetThreshold = closeToTargetThreshold
 
     def __del__(self):
         """
         解構函數，在物件銷毀時自動斷開 Modbus 連接
         """
-        if self.modbusTCPClient:
-            self.modbusTCPClient.close()
-        self.stopMonitorErrors
-        self.stopMonitorErrors
+        if self.telemetryPoller:
+            self.telemetryPoller.stop()
+        if self.telemetryConnection:
+            self.telemetryConnection.close()
+        if self.errorMonitor:
+            self.errorMonitor.stop()
+        if self.connection:
+            self.connection.close()
+
+    @property
+    def modbusTCPClient(self) -> Optional[ModbusTcpClient]:
+        """
+        目前使用的ModbusTcpClient(由self.connection管理)
+        """
+        return self.connection.client if self.connection else None
 
     ########################################################################
     @property
@@ -180,6 +215,7 @@ class Robot:
         """設置 suctionDigitalOutputNumber (吸盤 DO 編號)"""
         if 0 <= value <= 15:
             self.__suctionDigitalOutputNumber = value
+            self.io.nameOutputs(suction=value)
         else:
             raise ValueError("suctionDigitalOutputNumber 應設為0到15之間的整數")
         
@@ -211,19 +247,19 @@ class Robot:
     @property
     def latestDigitalOutputCommand(self) -> int:
         """
-        獲取最近一次的數位輸出命令
+        獲取最近一次的數位輸出命令(即self.io保存的DO值)
         """
-        return self.__latestDigitalOutputCommand
+        return self.io.outputs
     
     @latestDigitalOutputCommand.setter
     def latestDigitalOutputCommand(self, value: int):
         """
-        設置最近一次的數位輸出命令
+        設置數位輸出命令(值改變時寫入控制器)
         
         參數:
         value: 要設置的數位輸出命令值
         """
-        self.__latestDigitalOutputCommand = value
+        self.io.writeAll(value)
 
     @property
     def isRobotError(self) -> bool:
@@ -244,9 +280,7 @@ class Robot:
         返回:
         bool: 如果機器人可以運動則返回True，否則返回False
         """
-        return (not self.isRobotError and #self.isRobotReachTargetPosition and 
-                self.getTeachPanelState()==0  and
-                self.getRobotSystemState()==0)
+        return self.getRobotStatusSnapshot().isRobotReadyForMotion
     @property
     def speed(self) -> int:
         """
@@ -262,14 +296,8 @@ class Robot:
         參數:
         value: 要設置的預設速度值
         """
-        if value < 0:
-            raise ValueError("速度不能小於0")
-        if value > 100:
-            raise ValueError("速度不能大於100")
-        self.__speed = value
-        
-        # 設定速度、加速度、減速度
-        self.writeRegister(0x0324, value)  # 設定速度
+        self.__speed = self.__checkMotionParameter(value, "速度")
+        self.writeRegister(0x0324, value, skipIfUnchanged=True)  # 設定速度(與上次寫入相同則略過)
 
     @property
     def acceleration(self) -> int:
@@ -286,12 +314,8 @@ class Robot:
         參數:
         value: 要設置的預設加速度值
         """
-        if value < 0:
-            raise ValueError("加速度不能小於0")
-        if value > 100:
-            raise ValueError("加速度不能大於100")
-        self.__acceleration = value
-        self.writeRegister(0x030A, value)  # 設定加速度
+        self.__acceleration = self.__checkMotionParameter(value, "加速度")
+        self.writeRegister(0x030A, value, skipIfUnchanged=True)  # 設定加速度(與上次寫入相同則略過)
 
     @property
     def deceleration(self) -> int:
@@ -308,12 +332,19 @@ class Robot:
         參數:
         value: 要設置的預設減速度值
         """
+        self.__deceleration = self.__checkMotionParameter(value, "減速度")
+        self.writeRegister(0x030C, value, skipIfUnchanged=True)  # 設定減速度(與上次寫入相同則略過)
+
+    @staticmethod
+    def __checkMotionParameter(value: int, label: str) -> int:
+        """
+        檢查速度、加速度、減速度是否在0~100之間
+        """
         if value < 0:
-            raise ValueError("減速度不能小於0")
+            raise ValueError(f"{label}不能小於0")
         if value > 100:
-            raise ValueError("減速度不能大於100")
-        self.__deceleration = value
-        self.writeRegister(0x030C, value)  # 設定減速度
+            raise ValueError(f"{label}不能大於100")
+        return value
 
     def getRobotNotReadyReason(self) -> str:
         """
@@ -327,65 +358,121 @@ class Robot:
         返回:
         string: 機器人未準備運動的原因
         """
-        reason = ""
-        controllerError,robotGroupError,jointsError = self.getRobotErrorCode()
-        if controllerError != 0:
-            reason += "控制器錯誤碼: " +str(controllerError) + "\n"
-        if robotGroupError != 0:
-            reason += "機器人組錯誤碼: " +str(robotGroupError) + "\n"
-        if jointsError != [0,0,0,0,0,0]:
-            reason += "軸錯誤碼: " +str(jointsError) + "\n"
-        #if not self.isRobotReachTargetPosition:
-        #    reason += "機器人未到達位置" + "\n"
-        if self.getTeachPanelState() !=0 :
-            reason += "教導盒未釋放控制權" + "\n"
-        #if self.getRobotSystemState() != 0:
-        #    reason += "機器人系統狀態: " + str(self.getRobotSystemState()) + "\n"
-        return reason
+        return self.getRobotStatusSnapshot().notReadyReason
+
+    def getRobotStatusSnapshot(self, includePoseFlag: bool = False, maxAge: Optional[float] = None) -> RobotStatusSnapshot:
+        """
+        以區塊讀取一次取得機器人狀態快照
+        (錯誤碼、系統狀態、操作模式、教導盒狀態、運動狀態、TCP位姿)
+
+        參數:
+        includePoseFlag: 是否一併讀取位姿狀態標誌(0x031F)，會多一次讀取
+        maxAge: 可接受的遙測快照最大年齡(秒)，見readFieldsCached()
+
+        返回:
+        RobotStatusSnapshot: 不可修改的狀態快照
+        """
+        fields = STATUS_FIELDS + ("poseFlag",) if includePoseFlag else STATUS_FIELDS
+        telemetry = self.__getFreshTelemetry(fields, maxAge)
+        if telemetry is not None:
+            return telemetry.toStatusSnapshot()
+        return RobotStatusSnapshot.fromFields(self.readFields(*fields))
     ########################################################################
-    def getTCPPose(self) -> Tuple[float, float, float, float, float, float]:
+    def getTCPPose(self, maxAge: Optional[float] = None) -> Tuple[float, float, float, float, float, float]:
         """
         從機械手臂讀取 TCP 位姿 (X, Y, Z, Rx, Ry, Rz)
+        maxAge: 可接受的遙測快照最大年齡(秒)，見readFieldsCached()
         """
-        request = self.modbusTCPClient.read_holding_registers(0x00F0, 12, 2)
-        if request.isError():
-            raise RequestErrorException("Request error.")
+        x, y, z, rx, ry, rz = self.readFieldsCached("tcpPose", maxAge=maxAge)["tcpPose"]
+        return x, y, z, rx, ry, rz
 
-        # 解碼 X, Y, Z, Rx, Ry, Rz# 解碼 X, Y, Z, Rx, Ry, Rz，使用迴圈來簡化
-        positions = []
-        for i in range(0, 12, 2):
-            decoder = BinaryPayloadDecoder.fromRegisters(request.registers[i:i+2], Endian.BIG, wordorder=Endian.LITTLE)
-            positions.append(decoder.decode_32bit_int() * 0.001)
+    def getRobotPoseFlag(self, maxAge: Optional[float] = None) -> int:
+        """
+        獲取當前機械手臂的位姿狀態標誌
+        return 1 表示到達位置，2表示未到達位置
+        maxAge: 可接受的遙測快照最大年齡(秒)，見readFieldsCached()
+        """
+        return self.readFieldsCached("poseFlag", maxAge=maxAge)["poseFlag"]
 
-        # 將解碼後的值分別賦值給 x, y, z, rx, ry, rz
-        x, y, z, rx, ry, rz = positions
 
+    def waitRobotReachTargetPosition(self, timeout: Optional[float] = None, expectedDuration: Optional[float] = None):
+        """
+        等待機械手臂運動完成
 
-        return x, y, z, rx, ry, rz
+        最近一次命令有提供座標時，每次只合併讀取一次(運動狀態+TCP位姿)，運動停止且接近目標即完成；
+        否則(回原點、停止等)看位姿狀態標誌。輪詢間隔會依預估到達時間在minInterval與blockTime之間調整。
 
-    def getRobotPoseFlag(self) -> int:
+        參數:
+        timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+        expectedDuration: 預估的運動時間(秒)，可選
+        錯誤監控(startMonitorErrors())執行中且機器人發生錯誤時，立即拋出RobotErrorException
         """
-        獲取當前機械手臂的位姿狀態標誌
-        return 1 表示到達位置，2表示未到達位置
+        self.__createMotionWaiter().wait(self.__motionWaitTarget, timeout, expectedDuration)
+
+    def waitRobotReachTargetPositionAsync(self,
+                                          timeout: Optional[float] = None,
+                                          expectedDuration: Optional[float] = None,
+                                          callback=None) -> Future:
         """
+        在背景等待機械手臂運動完成，立即返回concurrent.futures.Future
 
-        request = self.modbusTCPClient.read_holding_registers(0x031F, 1, 2)
-        if request.isError():
-            raise RequestErrorException("Request error.")
-        return request.registers[0]
+        參數同waitRobotReachTargetPosition()，另外:
+        callback: 完成(或失敗)時呼叫的回呼，參數為Future本身
+        """
+        return self.__createMotionWaiter().waitAsync(self.__motionWaitTarget, timeout, expectedDuration, callback)
 
+    def __createMotionWaiter(self) -> MotionWaiter:
+        """
+        以目前的閥值與blockTime建立運動等待引擎，讀取透過readFieldsCached()與遙測執行緒共用
+        """
+        maxInterval = max(self.__blockTime, 0.001)
+        monitor = self.errorMonitor if self.errorMonitor is not None and self.errorMonitor.isRunning else None
+        return MotionWaiter(self.readFieldsCached,
+                            closeToTargetThreshold=self.closeToTargetThreshold,
+                            minInterval=min(0.005, maxInterval),
+                            maxInterval=maxInterval,
+                            abortEvent=monitor.faultEvent if monitor else None,
+                            abortError=lambda: RobotErrorException(f"機器人發生錯誤，停止等待運動完成: {monitor.faultReason}"))
 
-    def waitRobotReachTargetPosition(self):
+    def targetReachedCondition(self) -> PoseReachedCondition:
         """
-        等待機械手臂運動完成
+        「最近一次運動命令完成」的等待條件，可與其他條件組合後傳給waitUntil()
+        """
+        return PoseReachedCondition(self.__motionWaitTarget, self.closeToTargetThreshold)
+
+    def waitUntil(self, condition: WaitCondition, timeout: Optional[float] = None, pollInterval: float = 0.005) -> dict:
+        """
+        輪詢直到條件成立，條件需要的欄位每次合併為一次readFields()
+
+        例如等待吸盤真空建立且運動完成:
+        robotDRV.waitUntil(InputCondition(0) & robotDRV.targetReachedCondition(), timeout=5)
+
+        參數:
+        condition: 等待條件(見robot/classWaitCondition.py)
+        timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+        pollInterval: 輪詢間隔(秒)
+        錯誤監控(startMonitorErrors())執行中且機器人發生錯誤時，立即拋出RobotErrorException
+
+        返回:
+        dict: 條件成立時讀到的欄位
+        """
+        monitor = self.errorMonitor if self.errorMonitor is not None and self.errorMonitor.isRunning else None
+        return waitForCondition(self.readFields, condition, timeout, pollInterval,
+                                abortEvent=monitor.faultEvent if monitor else None,
+                                abortError=lambda: RobotErrorException(f"機器人發生錯誤，停止等待: {monitor.faultReason}"))
+
+    def waitForInput(self, channel: Union[int, str], state: bool = True,
+                     timeout: Optional[float] = None, pollInterval: float = 0.005):
+        """
+        等待數位輸入變為指定狀態，取代動作後固定time.sleep()的等待(例如等待真空感測器)
+
+        參數:
+        channel: DI編號(0~15)或以self.io.nameInputs()命名的通道
+        state: 等待的狀態
+        timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+        pollInterval: 輪詢間隔(秒)
         """
-        while True:#檢查何時結束
-            if self.isRobotReachTargetPosition :
-                if self.latestMotionCommand is None :#若沒有提供座標 則只看isRobotReachTargetPosition是否到達
-                    return
-                if self.isCloseToTarget():#若提供座標 則檢查座標是否到達，到達才return
-                    return
-            time.sleep(self.__blockTime)
+        self.waitUntil(InputCondition(self.io.inputBit(channel), state), timeout, pollInterval)
 
     def isCloseToTarget(self) -> bool:
         """
@@ -395,16 +482,15 @@ class Robot:
         """
         if self.closeToTargetThreshold is None:
             self.closeToTargetThreshold = 0.01
-        # 獲取機械手臂的當前位置
-        current_pose = self.getTCPPose()
         # 獲取最新的運動命令
         latest_pose = self.__latestMotionCommand
         # 如果最新的運動命令為None，則返回False
-        if latest_pose is None:
+        if latest_pose is None or None in latest_pose:
             return False
+        # 獲取機械手臂的當前位置
+        current_pose = self.getTCPPose()
         # 計算兩個位置之間的歐幾里得距離
-        import numpy as np
-        distance = np.linalg.norm(np.array(current_pose) - np.array(latest_pose))
+        distance = math.dist(current_pose, latest_pose)
         # 如果距離小於閥值，則返回True，否則返回False
         return distance < self.closeToTargetThreshold
 
@@ -431,36 +517,73 @@ class Robot:
             retryDelay: 重試延遲時間，預設為1秒。
         """
         
+        isReady = self.isRobotReadyForMotion
         if retry:
             for i in range(retryTimes):
-                if self.isRobotReadyForMotion:
+                if isReady:
                     break
                 time.sleep(retryDelay)
+                isReady = self.isRobotReadyForMotion
         
-        if not self.isRobotReadyForMotion:
+        if not isReady:
             print("機器人不允許運動")
             return
 
+        self.writeMotionCommand(robotCommand, position, speed=speed, acceleration=acceleration, deceleration=deceleration)
+        if not self.__block :#若不等待結束，則retrun
+            return
+        self.waitRobotReachTargetPosition()#卡住執行緒，直到運動完成
+        
+    def writeMotionCommand(self,
+                           robotCommand: eRobotCommand,
+                           position: Optional[Union[list[float], tuple[float, float, float, float, float, float]]] = None,
+                           payload: Optional[list[int]] = None,
+                           speed: Optional[int] = None,
+                           acceleration: Optional[int] = None,
+                           deceleration: Optional[int] = None) -> Optional[int]:
+        """
+        直接寫入運動參數、目標位姿與運動命令，不檢查機器人是否可運動、也不等待完成
+        (sendMotionCommand()與MotionQueue共用)
+
+        所有寫入先收集成WritePlan：未變更的速度、加減速度會被略過，相鄰寄存器合併為一次寫入，
+        運動命令固定最後寫入。若useReadWriteMultiple為True，命令以FC 0x17寫入並同時讀回位姿狀態標誌。
+
+        參數:
+        robotCommand: 機器人指令
+        position: 目標位姿，需要座標的命令必須提供
+        payload: 已編碼的目標位姿寄存器值(見encodeRegisterField())，提供時不再重新編碼
+        speed, acceleration, deceleration: 運動參數，None表示沿用目前設定
+
+        返回:
+        int: 使用FC 0x17時讀回的位姿狀態標誌，否則為None
+        """
+        plan = self.createMotionWritePlan(robotCommand, position, payload, speed, acceleration, deceleration)
+        return self.executeWritePlan(plan, readBackField="poseFlag" if self.useReadWriteMultiple else None)
+
+    def createMotionWritePlan(self,
+                              robotCommand: eRobotCommand,
+                              position: Optional[Union[list[float], tuple[float, float, float, float, float, float]]] = None,
+                              payload: Optional[list[int]] = None,
+                              speed: Optional[int] = None,
+                              acceleration: Optional[int] = None,
+                              deceleration: Optional[int] = None) -> WritePlan:
+        """
+        建立一次運動的寫入規劃(參數同writeMotionCommand())，並更新速度等屬性與等待目標
+        """
+        plan = WritePlan(self.registerShadow, maxGap=self.motionWriteMaxGap)
         if speed is not None:
-            self.speed = speed
+            self.__speed = self.__checkMotionParameter(speed, "速度")
+            plan.add(0x0324, speed, skipIfUnchanged=True)  # 設定速度
         if acceleration is not None:
-            self.acceleration = acceleration
+            self.__acceleration = self.__checkMotionParameter(acceleration, "加速度")
+            plan.add(0x030A, acceleration, skipIfUnchanged=True)  # 設定加速度
         if deceleration is not None:
-            self.deceleration = deceleration
-        #指定不需要提供座標的命令
-        positionlessCommand = ( eRobotCommand.Robot_All_Joints_Homing_To_Origin,
-                                eRobotCommand.Motion_Stop,
-                                eRobotCommand.Continue_JOG_X_Positive, eRobotCommand.Continue_JOG_X_Negative,
-                                eRobotCommand.Continue_JOG_Y_Positive, eRobotCommand.Continue_JOG_Y_Negative,
-                                eRobotCommand.Continue_JOG_Z_Positive, eRobotCommand.Continue_JOG_Z_Negative,
-                                eRobotCommand.Continue_JOG_RX_Positive, eRobotCommand.Continue_JOG_RX_Negative,
-                                eRobotCommand.Continue_JOG_RY_Positive, eRobotCommand.Continue_JOG_RY_Negative,
-                                eRobotCommand.Continue_JOG_RZ_Positive, eRobotCommand.Continue_JOG_RZ_Negative,
-                                eRobotCommand.Continue_JOG_External_Axis_1_Negative, eRobotCommand.Continue_JOG_External_Axis_1_Positive,
-                                eRobotCommand.Continue_JOG_External_Axis_2_Negative, eRobotCommand.Continue_JOG_External_Axis_2_Positive,
-                                eRobotCommand.Continue_JOG_External_Axis_3_Negative, eRobotCommand.Continue_JOG_External_Axis_3_Positive)
+            self.__deceleration = self.__checkMotionParameter(deceleration, "減速度")
+            plan.add(0x030C, deceleration, skipIfUnchanged=True)  # 設定減速度
+
+        self.__motionWaitTarget = None
         # 檢查 robotCommand 是否是 301~307 (動作命令)
-        if robotCommand not in positionlessCommand:
+        if robotCommand not in POSITIONLESS_COMMANDS:
             # 如果 robotCommand 需要提供座標，且 args 為 None，則拋出例外
             if position is None:
                 raise AssertionError("動作命令不正確且未提供座標")
@@ -469,77 +592,124 @@ class Robot:
                 self.latestMotionCommand = position#解析args為x,y,z,rx,ry,rz 順便紀錄
                 x, y, z, rx, ry, rz = self.latestMotionCommand#解出剛紀錄的值
                 # 構建 Payload
-                builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-                builder.add_32bit_int(int(x * 1000))
-                builder.add_32bit_int(int(y * 1000))
-                builder.add_32bit_int(int(z * 1000))
-                builder.add_32bit_int(int(rx * 1000))
-                builder.add_32bit_int(int(ry * 1000))
-                builder.add_32bit_int(int(rz * 1000))
-                payload = builder.to_registers()
-
-                # 發送位姿命令到 0x0330 地址
-                self.writeRegisters(0x0330, payload)
-
-        # 發送 robotCommand 到 0x0300 地址
-        self.writeRegister(0x0300, robotCommand.value)
-        if not self.__block :#若不等待結束，則retrun
-            return
-        self.waitRobotReachTargetPosition()#卡住執行緒，直到運動完成
-        
+                if payload is None:
+                    payload = encodeRegisterField(DRV_REGISTER_MAP["targetPose"], [x, y, z, rx, ry, rz])
+
+                # 位姿命令寫入 0x0330 地址
+                plan.add(0x0330, payload)
+                self.__motionWaitTarget = x, y, z, rx, ry, rz
+
+        # robotCommand 最後寫入 0x0300 地址
+        plan.setCommand(0x0300, robotCommand.value)
+        return plan
+
+    def executeWritePlan(self, plan: WritePlan, readBackField: Optional[str] = None):
+        """
+        依序執行寫入規劃
+
+        參數:
+        plan: 寫入規劃
+        readBackField: 若提供，最後一次寫入改用FC 0x17(read/write multiple)，同時讀回此欄位(見robot/registerMap.py)
+                       需確認控制器支援FC 0x17
+
+        返回:
+        readBackField解碼後的值，未提供readBackField時為None
+        """
+        blocks = plan.build()
+        readBackValue = None
+        for i, block in enumerate(blocks):
+            if readBackField is not None and i == len(blocks) - 1:
+                field = DRV_REGISTER_MAP[readBackField]
+                registers = self.readWriteRegisters(field.address, field.count, block.address, list(block.values))
+                readBackValue = decodeReadBlocks(planRegisterReads([field]), [registers])[field.name]
+            elif len(block.values) == 1:
+                self.writeRegister(block.address, block.values[0])
+            else:
+                self.writeRegisters(block.address, list(block.values))
+        return readBackValue
+
     ##############################################################
     def suctionON(self):
         """
         打開吸盤
         """
-        self.latestDigitalOutputCommand = setBit(self.latestDigitalOutputCommand,self.suctionDigitalOutputNumber)
-        self.writeRegister(0x02FE, self.latestDigitalOutputCommand)
+        self.io.on("suction")
 
     def suctionOFF(self):
         """
-        關閉吸盤
+        關閉吸盤(只清除吸盤的bit，其他數位輸出保持不變)
         """
-        self.latestDigitalOutputCommand = clearBit(self.latestDigitalOutputCommand,self.suctionDigitalOutputNumber)
-        self.writeRegister(0x02FE, 0)
+        self.io.off("suction")
 
     def setIO(self, *args):#設定數位輸出(以二進制設定)
         """
-        設定數位輸出
+        設定數位輸出，值沒有改變時不寫入；需要同時修改多個bit時請使用self.io.set()或self.io.batch()
         """
         if len(args) == 1 and isinstance(args[0], int):#若傳入一個值，則將該值設定為數位輸出(以二進制)
-            data = args[0]
+            self.io.writeAll(args[0])
         elif len(args) == 2 and isinstance(args[0], int) and isinstance(args[1], bool):#若傳入兩個值，則將該值所指的bit做設定或清除
             if args[0] > 15 or args[0] < 0:
                 raise ValueError("參數錯誤，應傳入一個數字或一個0~16的數字及True或False")
-            if args[1] == True:
-                data = setBit(self.latestDigitalOutputCommand,args[0])
-            else:
-                data = clearBit(self.latestDigitalOutputCommand,args[0])
+            self.io.set({args[0]: args[1]})
         else:
             raise ValueError("參數錯誤，應傳入一個數字或一個0~16的數字及True或False")
-        self.latestDigitalOutputCommand = data
-        self.writeRegister(0x02FE, self.latestDigitalOutputCommand)
     ##############################################################
 
+    def startJogSession(self,
+                        speed: Optional[int] = None,
+                        acceleration: Optional[int] = None,
+                        deceleration: Optional[int] = None,
+                        deadmanTimeout: float = 0.5,
+                        heartbeatInterval: Optional[float] = None,
+                        onDeadman: Optional[Callable[[], None]] = None) -> JogSession:
+        """
+        開始連續JOG工作階段(見JogSession)
+
+        只在開始時以一次狀態快照檢查機器人是否可運動，之後jog()只在方向改變時寫入運動命令，
+        速度等參數只在第一次寫入(之後由影子快取略過)。
+
+        參數:
+        speed, acceleration, deceleration: JOG的運動參數，None表示沿用目前設定
+        deadmanTimeout: 沒有收到jog()或keepAlive()多久後自動停止(秒)
+        heartbeatInterval: JOG中重送相同命令的間隔(秒)，None表示不重送
+        onDeadman: 看門狗觸發停止時的回呼
+
+        返回:
+        JogSession: 已啟動看門狗的工作階段，用完請close()(或使用with)
+        """
+        snapshot = self.getRobotStatusSnapshot()
+        if not snapshot.isRobotReadyForMotion:
+            raise JogSessionError(f"機器人無法JOG: {snapshot.notReadyReason}")
+        session = JogSession(lambda command: self.writeMotionCommand(command, speed=speed, acceleration=acceleration,
+                                                                     deceleration=deceleration),
+                             deadmanTimeout, heartbeatInterval, onDeadman)
+        session.start()
+        return session
+
     def motionStop(self):
         """
         停止所有運動
         """
         self.writeRegisters(0x0300, [0])
+        self.__motionWaitTarget = None
         if self.__block:
             self.waitRobotReachTargetPosition()
 
     ##############################################################
     #系統層級工作
 
-    def AllAxisEnable(self):
+    def AllAxisEnable(self, enableWaitTime: float = 2):
         """
         啟用所有伺服軸
+
+        參數:
+        enableWaitTime: 寫入後等待使能的時間(秒)；prepareRobotForMotion()改以輪詢確認，會傳入0
         """
         self.writeRegister(0x0006, int(0x0101))  # 1,2軸
         self.writeRegister(0x0007, int(0x0101))  # 3,4軸
         self.writeRegister(0x0000, int(0x0101))  # 5,6軸
-        time.sleep(2)#等待使能的時間
+        if enableWaitTime > 0:
+            time.sleep(enableWaitTime)#等待使能的時間
         
     def AllAxisDisable(self):
         """
@@ -549,44 +719,45 @@ class Robot:
         self.writeRegister(0x0007, int(0x0000))  # 3,4軸
         self.writeRegister(0x0000, int(0x0000))  # 5,6軸
 
-    def getRobotErrorCode(self):
+    def getRobotErrorCode(self, maxAge: Optional[float] = None):
         """
         獲取機器人錯誤碼
+        maxAge: 可接受的遙測快照最大年齡(秒)，見readFieldsCached()
         return:
         tuple(int,int,list[int]): 控制器錯誤碼,機器人組錯誤碼,軸錯誤碼(J1~J6)
         """
-        controllerError:int = self.readRegisters(0x01FF)
-        robotGroupError:int = self.readRegisters(0x01E0)
-        jointsError:list[int] = self.readRegisters(0x0140,16)
-        #print(jointsError)
+        values = self.readFieldsCached("controllerError", "robotGroupError", "jointsError", maxAge=maxAge)  # 合併為兩次區塊讀取
+        controllerError:int = values["controllerError"]
+        robotGroupError:int = values["robotGroupError"]
+        jointsError:list[int] = values["jointsError"]
         jointsError = jointsError[-4:]+jointsError[:2]
         
         return controllerError,robotGroupError,jointsError
     
-    def getRobotWarningCode(self):
+    def getRobotWarningCode(self, maxAge: Optional[float] = None):
         """
         獲取機器人警告碼
         return:
         
         """
-        return self.readRegisters(0x020E)
+        return self.readFieldsCached("robotWarning", maxAge=maxAge)["robotWarning"]
 
-    def getRobotMotionState(self):
+    def getRobotMotionState(self, maxAge: Optional[float] = None):
         """
         獲取機器人運動狀態,0表示停止,1表示運動中
         """
-        return self.readRegisters(0x00E0)
+        return self.readFieldsCached("robotMotionState", maxAge=maxAge)["robotMotionState"]
 
-    def getRobotSystemState(self):
+    def getRobotSystemState(self, maxAge: Optional[float] = None):
         """
         獲取機器人系統狀態,
         0表示一般狀態,
         2表示機器人停止，功能性暫停觸發,
         3表示機器人運動中，但功能性暫停觸發
         """
-        return self.readRegisters(0x0138)
+        return self.readFieldsCached("robotSystemState", maxAge=maxAge)["robotSystemState"]
 
-    def getOperationMode(self):
+    def getOperationMode(self, maxAge: Optional[float] = None):
         """
         獲取操作模式狀態,
         0表示非有線,
@@ -594,13 +765,13 @@ class Robot:
         2表示T2(不限制速度，可手自動),
         3表示自動模式(不限制速度，不可手動)
         """
-        return self.readRegisters(0x0139)
+        return self.readFieldsCached("operationMode", maxAge=maxAge)["operationMode"]
 
-    def getTeachPanelState(self):
+    def getTeachPanelState(self, maxAge: Optional[float] = None):
         """
         獲取TP教導盒啟用狀態,0表示未啟用,1表示啟用 (教導盒啟用時 遠端無法操作機器人)
         """
-        return self.readRegisters(0x013B)
+        return self.readFieldsCached("teachPanelState", maxAge=maxAge)["teachPanelState"]
 
     def resetRobotError(self):
         """
@@ -613,59 +784,143 @@ class Robot:
         self.writeRegisters(0x0180, registers)  # reset系統錯誤(wireshark抓的 不知道為甚麼是4個)
         registers = [0] * 2 
         self.writeRegisters(0x0002, registers)  # wireshark抓的 不知道是甚麼東西
+        self.invalidateRegisterShadow()  # 重設後控制器的參數可能已改變
+        if self.errorMonitor is not None:
+            self.errorMonitor.acknowledge()  # 已處理的錯誤不再中止之後的運動等待，仍存在的錯誤會在下次讀取時重新通知
         
     #####################################################
     
-    def prepareRobotForMotion(self, retryTimes: int = 5, retryDelay: float = 1) -> bool:
+    def prepareRobotForMotion(self,
+                              retryTimes: int = 5,
+                              retryDelay: float = 1,
+                              timeout: Optional[float] = None,
+                              attemptTimeout: float = 3.0,
+                              pollInterval: float = 0.05,
+                              minEnableTime: float = 0.0,
+                              progressCallback: Optional[Callable[[ReadinessProgress], None]] = None,
+                              checkServoReadback: bool = False) -> bool:
         """
         讓機器人自動進入準備狀態，包括reset軸錯誤，並開啟伺服
-        
+
+        由ReadinessStateMachine決定每一步：只在有錯誤時重設、只在伺服未啟用時寫入啟用，
+        之後輪詢伺服啟用與錯誤寄存器，機器人一回報可運動就返回，不再固定等待
+
         參數:
         retryTimes: 重試次數，預設為5次
         retryDelay: 重試延遲時間，預設為1秒
-        
+        timeout: 整體最長時間(秒)，None表示只受retryTimes限制
+        attemptTimeout: 單次嘗試等待就緒的最長時間(秒)
+        pollInterval: 輪詢間隔(秒)
+        minEnableTime: 寫入伺服啟用後至少等待的時間(秒)
+        progressCallback: 狀態改變時呼叫，參數為ReadinessProgress
+        checkServoReadback: 是否要求伺服啟用寄存器讀回0x0101才算就緒(尚未在實機上確認，預設不要求)
+
         返回:
         bool: 如果機器人成功進入準備狀態則返回True，否則返回False
         """
-        for _ in range(retryTimes):
-            self.resetRobotError()
-            self.AllAxisEnable()
-            
-            if self.isRobotReadyForMotion:
+        machine = ReadinessStateMachine(retryTimes, retryDelay, attemptTimeout, timeout,
+                                        pollInterval, minEnableTime, progressCallback, checkServoReadback)
+        while True:
+            step = machine.update(self.readFields(*READINESS_FIELDS))
+            if step.state == eReadinessState.READY:
                 print("機器人已準備運動")
                 return True
-            else:
-                print(self.getRobotNotReadyReason())
-                time.sleep(retryDelay)
-        
-        print("機器人無法進入準備狀態")
-        return False
+            if step.state == eReadinessState.FAILED:
+                print(machine.reason)
+                print("機器人無法進入準備狀態")
+                return False
+            if step.resetErrors:
+                self.resetRobotError()
+            if step.enableServo:
+                self.AllAxisEnable(enableWaitTime=0)
+            time.sleep(step.delay)
     ##################################################################
-    def __monitorErrors(self):
+    def startMonitorErrors(self, callback: Optional[Callable[[RobotEvent], None]] = None, period: Optional[float] = None):
+        """
+        啟動錯誤監控執行緒(見ErrorMonitor)
+
+        每個週期合併讀取錯誤與警告寄存器(遙測執行緒有讀取時直接共用快照)，只在錯誤碼改變時通知callback。
+        發生錯誤時，進行中的waitRobotReachTargetPosition()(包含block模式的sendMotionCommand())
+        會立即拋出RobotErrorException，而不是等到逾時。
+
+        參數:
+        callback: 事件回呼，參數為RobotEvent，在監控執行緒中呼叫
+        period: 輪詢週期(秒)，預設為errorMonitorThreadSleepTime
+
+        返回:
+        ErrorMonitor: 可再以addListener()或subscribe()(asyncio佇列)接收事件
         """
-        定期檢查機器人是否有錯誤
+        if self.errorMonitor is None:
+            self.errorMonitor = ErrorMonitor(self.readFieldsCached, self.errorMonitorThreadSleepTime)
+        if period is not None:
+            self.errorMonitor.period = period
+        if callback is not None:
+            self.errorMonitor.addListener(callback)
+        self.errorMonitor.start()
+        return self.errorMonitor
+
+    def stopMonitorErrors(self):
         """
-        while not self._stopThread.is_set():
-            if self.isRobotError:
-                self._stopThread.set()
-                raise RobotErrorException (f"機器人發生錯誤，錯誤內容: {self.getRobotNotReadyReason()}")
-            time.sleep(self.errorMonitorThreadSleepTime)
-    
-    def startMonitorErrors(self):
+        停止錯誤監控執行緒
         """
-        啟動錯誤檢查執行緒
+        if self.errorMonitor is not None:
+            self.errorMonitor.stop()
+    ##################################################################
+    def startTelemetry(self,
+                       fields = DEFAULT_TELEMETRY_FIELDS,
+                       period: float = 0.05,
+                       maxAge: Optional[float] = None,
+                       dedicatedConnection: bool = False):
         """
-        self.errorMonitorThread.start()  # 啟動執行緒
-        
-    def stopMonitorErrors(self):
+        啟動遙測輪詢執行緒(選用)
+
+        啟動後，以固定頻率合併讀取fields並發布不可修改的快照，
+        getTCPPose(), isRobotError, isRobotReachTargetPosition等getter會優先由快照取值，
+        讓視覺迴圈、錯誤監控與運動等待共用同一個輪詢來源，而不是各自向控制器發請求。
+
+        參數:
+        fields: 要輪詢的欄位(見robot/registerMap.py)
+        period: 輪詢週期(秒)
+        maxAge: getter可接受的快照最大年齡(秒)，預設為兩個輪詢週期
+        dedicatedConnection: 是否為遙測開啟第二條連線，讓輪詢讀取與命令寫入不必互相等待
+                             (需確認控制器允許多個Modbus TCP連線)
+        """
+        self.stopTelemetry()
+        readFields = self.readFields
+        if dedicatedConnection:
+            self.telemetryConnection = self.connection.clone()
+            readFields = lambda *fields: self.readFields(*fields, connection=self.telemetryConnection)
+        self.telemetryPoller = TelemetryPoller(readFields, fields, period)
+        self.telemetryMaxAge = 2 * period if maxAge is None else maxAge
+        self.telemetryPoller.start()
+
+    def stopTelemetry(self):
+        """
+        停止遙測輪詢執行緒，之後getter會恢復直接讀取
+        """
+        if self.telemetryPoller is not None:
+            self.telemetryPoller.stop()
+        if self.telemetryConnection is not None:
+            self.telemetryConnection.close()
+        self.telemetryPoller = None
+        self.telemetryConnection = None
+        self.telemetryMaxAge = None
+
+    @property
+    def telemetry(self) -> Optional[TelemetrySnapshot]:
         """
-        停止錯誤檢查執行緒
+        最新的遙測快照，未啟動遙測或尚未讀取成功時為None
         """
-        self._stopThread.set()
-        self.errorMonitorThread.join()
+        return self.telemetryPoller.latest if self.telemetryPoller else None
+
+    def createPoseRecorder(self, **kwargs) -> PoseRecorder:
+        """
+        建立以此機器人連線取樣的PoseRecorder(需自行start()/stop())，kwargs同PoseRecorder的建構函數
+        """
+        return PoseRecorder(self.readRegisters, **kwargs)
     ##################################################################
     
-    def writeRegister(self, address: int, value: int, unit: int = 2):
+    def writeRegister(self, address: int, value: int, unit: int = 2, skipIfUnchanged: bool = False):
         """
         寫入單個寄存器並檢查錯誤的輔助方法。
 
@@ -673,16 +928,22 @@ class Robot:
         address: 寄存器地址
         value: 要寫入的值
         unit: 單元標識符，預設為2
+        skipIfUnchanged: 若影子快取顯示上次寫入的值相同，則略過這次寫入
+                         (僅適用於參數類寄存器，命令寄存器重複寫入有意義，不應略過)
 
         返回:
-        寫入操作的結果
+        寫入操作的結果，略過時返回None
         """
-        result = self.modbusTCPClient.write_register(address, value, unit)
+        if skipIfUnchanged and self.registerShadow.isUnchanged(address, [value]):
+            return None
+        result = self.__execute(lambda client: client.write_register(address, value, unit), 0x06, address, 1)
         if result.isError():
+            self.registerShadow.invalidate(address)
             raise RequestErrorException(f"寫入寄存器 {address} 失敗")
+        self.registerShadow.update(address, [value])
         return result
 
-    def writeRegisters(self, address: int, values: list[int], unit: int = 2):
+    def writeRegisters(self, address: int, values: list[int], unit: int = 2, skipIfUnchanged: bool = False):
         """
         寫入多個寄存器並檢查錯誤的輔助方法。
 
@@ -690,32 +951,233 @@ class Robot:
         address: 起始寄存器地址
         values: 要寫入的值列表
         unit: 單元標識符，預設為2
+        skipIfUnchanged: 若影子快取顯示所有寄存器上次寫入的值都相同，則略過這次寫入
 
         返回:
-        寫入操作的結果
+        寫入操作的結果，略過時返回None
         """
-        result = self.modbusTCPClient.write_registers(address, values, unit)
+        if skipIfUnchanged and self.registerShadow.isUnchanged(address, values):
+            return None
+        result = self.__execute(lambda client: client.write_registers(address, values, unit), 0x10, address, len(values))
         if result.isError():
+            self.registerShadow.invalidate(address, len(values))
             raise RequestErrorException(f"寫入寄存器 {address} 失敗")
+        self.registerShadow.update(address, values)
         return result
 
-    def readRegisters(self, address: int, count: int = 1) -> list[int] | int:
+    def readWriteRegisters(self, readAddress: int, readCount: int, writeAddress: int, values: list[int], unit: int = 2) -> list[int]:
+        """
+        以FC 0x17在同一次通訊中寫入並讀取寄存器(先寫後讀)
+
+        參數:
+        readAddress: 讀取起始地址
+        readCount: 讀取數量
+        writeAddress: 寫入起始地址
+        values: 要寫入的值列表
+        unit: 單元標識符，預設為2
+
+        返回:
+        list[int]: 讀取到的寄存器值
+        """
+        result = self.__execute(lambda client: client.readwrite_registers(read_address=readAddress, read_count=readCount,
+                                                                          write_address=writeAddress, values=values, slave=unit),
+                                0x17, writeAddress, len(values))
+        if result.isError():
+            self.registerShadow.invalidate(writeAddress, len(values))
+            raise RequestErrorException(f"讀寫寄存器 {writeAddress} 失敗")
+        self.registerShadow.update(writeAddress, values)
+        return result.registers
+
+    def loadRegisterShadow(self, address: int, count: int):
+        """
+        讀取一段寄存器的目前值存入影子快取，讓WritePlan可以用這些值填補間隙
+        (例如loadRegisterShadow(0x030A, 0x0334 - 0x030A + 8)後，將motionWriteMaxGap設為足夠大，
+        加減速度、速度與目標位姿即可合併為一次寫入；間隙中的寄存器會被寫回原值，請先確認控制器允許)
+        """
+        registers = self.readRegisters(address, count)
+        self.registerShadow.update(address, registers if count > 1 else [registers])
+
+    def invalidateRegisterShadow(self, address: Optional[int] = None, count: int = 1):
+        """
+        讓寄存器影子快取失效，下一次寫入一定會送出
+        (重新連線、重設錯誤時會自動呼叫；若知道控制器的值被外部修改，也可手動呼叫)
+
+        參數:
+        address: 起始地址，None表示全部
+        count: 寄存器數量
+        """
+        self.registerShadow.invalidate(address, count)
+        digitalOutput = DRV_REGISTER_MAP["digitalOutput"].address
+        if address is None or address <= digitalOutput < address + count:
+            self.io.invalidate()
+
+    def verifyRegisterShadow(self) -> list[int]:
+        """
+        讀回影子快取中的寄存器(合併為最少次數的區塊讀取)，偵測被教導盒或其他客戶端修改的值，
+        不一致的寄存器會被移出快取
+
+        返回:
+        list[int]: 被外部修改的寄存器地址
+        """
+        def readAddresses(addresses: list[int]) -> dict[int, int]:
+            fields = [RegisterField(str(address), address) for address in addresses]
+            return {int(name): value for name, value in self.readFields(*fields).items()}
+        return self.registerShadow.verify(readAddresses)
+
+    def __execute(self, request, functionCode: int, address: int, count: int,
+                  connection: Optional[ModbusConnection] = None, isWrite: bool = True):
+        """
+        經由ModbusConnection執行一次請求，連線失敗轉為RequestErrorException
+        有交易監聽者時，會量測耗時與重試次數並通知監聽者
+
+        參數:
+        request: 以ModbusTcpClient執行請求的函式
+        functionCode, address, count: 請求的function code、起始地址與寄存器數量(供統計使用)
+        connection: 使用的連線，預設為self.connection
+        isWrite: 是否為寫入；寫入不重試(避免重送命令)並更新最近一次寫入的時間，讀取則可在重連後重試
+        """
+        connection = connection or self.connection
+        timer = None
+        if self.__transactionListeners:
+            timer = TransactionTimer(functionCode, address, count, self.__getCallSite())
+        outcome = "connection"
+        try:
+            result = connection.execute(request, retry=not isWrite, onRetry=timer.onRetry if timer else None)
+            outcome = "exception" if result.isError() else "ok"
+        except ModbusConnectionError as e:
+            raise RequestErrorException(str(e)) from e
+        finally:
+            if isWrite:
+                self.__lastWriteTime = time.monotonic()
+            if timer is not None:
+                self.__notifyTransaction(timer.finish(outcome))
+        return result
+
+    def addTransactionListener(self, listener: Callable[[TransactionRecord], None]):
+        """
+        註冊交易監聽者，每次Modbus交易(讀取、寫入、讀寫)完成後會以TransactionRecord呼叫
+        (在送出請求的執行緒中呼叫，請保持輕量)，例如TransactionMetrics可彙總為直方圖並輸出Prometheus格式
+        沒有監聽者時不會進行任何量測
+        """
+        self.__transactionListeners = self.__transactionListeners + [listener]
+
+    def removeTransactionListener(self, listener: Callable[[TransactionRecord], None]):
+        self.__transactionListeners = [item for item in self.__transactionListeners if item is not listener]
+
+    @contextmanager
+    def transactionLabel(self, label: str):
+        """
+        在with區塊內，目前執行緒送出的交易以label作為呼叫來源，例如:
+        with robotDRV.transactionLabel("visionLoop"):
+            pose = robotDRV.getTCPPose()
+        未設定時，呼叫來源為最外層呼叫的robot套件方法名稱(如Robot.getTCPPose、MotionQueue.run)
+        """
+        previous = getattr(self.__transactionLabel, "value", None)
+        self.__transactionLabel.value = label
+        try:
+            yield
+        finally:
+            self.__transactionLabel.value = previous
+
+    def __getCallSite(self) -> str:
+        """
+        取得目前交易的呼叫來源：transactionLabel()設定的標籤，否則為呼叫堆疊中最外層的robot套件函式名稱
+        """
+        label = getattr(self.__transactionLabel, "value", None)
+        if label is not None:
+            return label
+        callSite = "unknown"
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code.co_filename.startswith(_ROBOT_PACKAGE_DIR):
+            callSite = frame.f_code.co_qualname
+            frame = frame.f_back
+        return callSite
+
+    def __notifyTransaction(self, record: TransactionRecord):
+        for listener in self.__transactionListeners:
+            try:
+                listener(record)
+            except Exception as e:
+                print(f"交易監聽者發生錯誤: {e}")
+
+    def readRegisters(self, address: int, count: int = 1, connection: Optional[ModbusConnection] = None) -> list[int] | int:
         """
         讀取寄存器並檢查錯誤的輔助方法。
+        傳輸失敗時會自動重新連線並重試(見ModbusConnection)
 
         參數:
         address: 寄存器地址
         count: 讀取的寄存器數量
+        connection: 使用的連線，預設為self.connection
 
         返回:
         list[int]: 寄存器的值(當數量>1時)
         int: 寄存器的值(當數量=1時)
         """
-        request = self.modbusTCPClient.read_holding_registers(address, count, 2)
+        request = self.__execute(lambda client: client.read_holding_registers(address, count, 2), 0x03, address, count,
+                                 connection, isWrite=False)
         if request.isError():
-            raise RequestErrorException(f"與modbus連接對象{self.modbusTCPClient.comm_params.host}:{self.modbusTCPClient.comm_params.port}無法通訊")
+            raise RequestErrorException(f"與{(connection or self.connection).describe()}無法通訊")
         return request.registers if count > 1 else request.registers[0]
 
+    def readFields(self, *fields: Union[str, RegisterField], maxGap: int = DEFAULT_MAX_GAP,
+                   connection: Optional[ModbusConnection] = None) -> dict:
+        """
+        依寄存器表(robot/registerMap.py)讀取多個欄位，
+        會自動合併成最少次數的區塊讀取(單次不超過125個寄存器)
+
+        參數:
+        fields: 欄位名稱(如"tcpPose", "poseFlag")或RegisterField
+        maxGap: 合併時允許跨過的未使用寄存器數量
+        connection: 使用的連線，預設為self.connection
+
+        返回:
+        dict: 欄位名稱 -> 解碼後的值
+        """
+        blocks = planRegisterReads(fields, maxGap=maxGap)
+        blockRegisters = []
+        for block in blocks:
+            registers = self.readRegisters(block.address, block.count, connection)
+            blockRegisters.append(registers if block.count > 1 else [registers])
+        return decodeReadBlocks(blocks, blockRegisters)
+
+    def readFieldsCached(self, *fields: str, maxAge: Optional[float] = None) -> dict:
+        """
+        與readFields()相同，但若遙測執行緒(startTelemetry())已有夠新的快照，則直接由快照取值而不通訊
+
+        快照需同時滿足：包含所有欄位、年齡不超過maxAge、且在最近一次寫入之後才開始讀取
+        (避免剛送出運動命令後讀到命令前的位姿狀態標誌)
+
+        參數:
+        fields: 欄位名稱
+        maxAge: 可接受的快照最大年齡(秒)，None表示使用telemetryMaxAge，0表示強制重新讀取
+
+        返回:
+        dict: 欄位名稱 -> 解碼後的值
+        """
+        telemetry = self.__getFreshTelemetry(fields, maxAge)
+        if telemetry is not None:
+            # 快照中的多值欄位為tuple，轉回list讓返回值與readFields()相同
+            values = {name: telemetry[name] for name in fields}
+            return {name: list(value) if isinstance(value, tuple) else value for name, value in values.items()}
+        return self.readFields(*fields)
+
+    def __getFreshTelemetry(self, fields: tuple[str, ...], maxAge: Optional[float]) -> Optional[TelemetrySnapshot]:
+        """
+        取得符合readFieldsCached()條件的遙測快照，沒有則返回None
+        """
+        if maxAge is None:
+            maxAge = self.telemetryMaxAge
+        if self.telemetryPoller is None or maxAge is None:
+            return None
+        telemetry = self.telemetryPoller.latest
+        if (telemetry is None or
+                telemetry.timestamp < self.__lastWriteTime or
+                telemetry.age > maxAge or
+                not all(name in telemetry for name in fields)):
+            return None
+        return telemetry
+
     
 
     
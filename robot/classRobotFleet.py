@@ -0,0 +1,263 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Sequence, TypeVar
+
+from robot.classRobot import Robot
+from robot.classReadinessStateMachine import ReadinessProgress
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot
+
+T = TypeVar("T")
+
+
+class FleetError(Exception):
+    """
+    群組操作中有一台或多台機器人失敗
+
+    errors: 機器人名稱 -> 例外
+    results: 成功的機器人名稱 -> 返回值
+    """
+    def __init__(self, errors: dict[str, Exception], results: dict):
+        message = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        super().__init__(f"{len(errors)}台機器人操作失敗 - {message}")
+        self.errors = errors
+        self.results = results
+
+
+@dataclass(frozen=True)
+class FleetSnapshot:
+    """
+    所有機器人的狀態快照(同時讀取)
+
+    snapshots: 機器人名稱 -> RobotStatusSnapshot(讀取成功的)
+    errors: 機器人名稱 -> 讀取失敗的例外
+    timestamp: 建立時間(time.monotonic)
+    """
+    snapshots: Mapping[str, RobotStatusSnapshot]
+    errors: Mapping[str, Exception] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.monotonic)
+
+    def __getitem__(self, name: str) -> RobotStatusSnapshot:
+        return self.snapshots[name]
+
+    @property
+    def isAllReadyForMotion(self) -> bool:
+        """
+        所有機器人都讀取成功且可運動
+        """
+        return not self.errors and all(snapshot.isRobotReadyForMotion for snapshot in self.snapshots.values())
+
+    @property
+    def errorRobots(self) -> list[str]:
+        """
+        處於錯誤狀態或無法讀取的機器人名稱
+        """
+        return [name for name, snapshot in self.snapshots.items() if snapshot.isRobotError] + list(self.errors)
+
+    @property
+    def notReadyReasons(self) -> dict[str, str]:
+        """
+        無法運動的機器人名稱 -> 原因
+        """
+        reasons = {name: snapshot.notReadyReason for name, snapshot in self.snapshots.items()
+                   if not snapshot.isRobotReadyForMotion}
+        reasons.update({name: f"無法讀取狀態: {error}" for name, error in self.errors.items()})
+        return reasons
+
+
+class RobotFleet:
+    """
+    多台機器人的群組控制
+
+    以執行緒池同時對多台Robot送出命令或讀取狀態(每台Robot有自己的連線與鎖)，
+    例如prepareAll()會讓所有手臂的重設錯誤與伺服啟用同時進行，總時間約等於最慢的一台，而不是所有手臂的總和。
+
+    使用方法:
+    with RobotFleet.fromHosts({"left": ("192.168.1.1", 502), "right": ("192.168.1.2", 502)}) as fleet:
+        fleet.prepareAll()
+        fleet.sendMotionCommandAll({"left": leftPose, "right": rightPose}, robotCommand=eRobotCommand.Robot_Go_MovL)
+        fleet.waitAllReachTargetPosition(timeout=30)
+        print(fleet.getSnapshot().notReadyReasons)
+    """
+    def __init__(self, robots: Optional[Mapping[str, Robot]] = None, maxWorkers: Optional[int] = None):
+        """
+        參數:
+        robots: 機器人名稱 -> Robot
+        maxWorkers: 執行緒池大小，預設為機器人數量(至少1)
+        """
+        self.robots: dict[str, Robot] = dict(robots or {})
+        self.maxWorkers = maxWorkers
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def fromHosts(cls, hosts: Mapping[str, tuple[str, int]], maxWorkers: Optional[int] = None, **robotKwargs) -> "RobotFleet":
+        """
+        依主機地址建立所有Robot，robotKwargs會傳給每台Robot的建構函數
+        """
+        return cls({name: Robot(host=host, port=port, **robotKwargs) for name, (host, port) in hosts.items()}, maxWorkers)
+
+    def __enter__(self) -> "RobotFleet":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, name: str) -> Robot:
+        return self.robots[name]
+
+    def __len__(self) -> int:
+        return len(self.robots)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.robots)
+
+    def add(self, name: str, robot: Robot):
+        self.robots[name] = robot
+        self.__resetExecutor()
+
+    def remove(self, name: str) -> Robot:
+        robot = self.robots.pop(name)
+        self.__resetExecutor()
+        return robot
+
+    def close(self):
+        """
+        停止所有遙測、關閉執行緒池與所有連線
+        """
+        for robot in self.robots.values():
+            robot.stopTelemetry()
+            if robot.connection is not None:
+                robot.connection.close()
+        self.__resetExecutor()
+
+    ##################################################################
+
+    def map(self,
+            function: Callable[[Robot], T],
+            names: Optional[Iterable[str]] = None,
+            timeout: Optional[float] = None,
+            raiseOnError: bool = True) -> dict[str, T]:
+        """
+        對多台機器人同時執行function，等待全部完成
+
+        參數:
+        function: 以Robot為參數的函式
+        names: 要執行的機器人名稱，None表示全部
+        timeout: 最長等待時間(秒)，逾時拋出concurrent.futures.TimeoutError
+        raiseOnError: 任一台失敗時是否在全部完成後拋出FleetError；False時失敗的機器人以例外物件作為結果
+
+        返回:
+        dict: 機器人名稱 -> function的返回值
+        """
+        names = list(self.robots) if names is None else list(names)
+        return self.__run({name: functools.partial(function, self.robots[name]) for name in names}, timeout, raiseOnError)
+
+    def __run(self, calls: dict[str, Callable[[], T]], timeout: Optional[float], raiseOnError: bool) -> dict[str, T]:
+        """
+        在執行緒池同時執行calls(機器人名稱 -> 無參數函式)並收集結果，規則同map()
+        """
+        executor = self.__getExecutor()
+        futures = {name: executor.submit(call) for name, call in calls.items()}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results, errors = {}, {}
+        for name, future in futures.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                results[name] = future.result(remaining)
+            except Exception as e:
+                if isinstance(e, TimeoutError) and not future.done():
+                    raise
+                errors[name] = e
+        if errors and raiseOnError:
+            raise FleetError(errors, results)
+        results.update(errors)
+        return results
+
+    def prepareAll(self,
+                   retryTimes: int = 5,
+                   retryDelay: float = 1,
+                   timeout: Optional[float] = None,
+                   progressCallback: Optional[Callable[[str, ReadinessProgress], None]] = None,
+                   **kwargs) -> dict[str, bool]:
+        """
+        同時讓所有機器人進入準備狀態(見Robot.prepareRobotForMotion())
+
+        參數:
+        retryTimes, retryDelay, timeout: 同Robot.prepareRobotForMotion()，每台機器人各自計算
+        progressCallback: 狀態改變時呼叫，參數為(機器人名稱, ReadinessProgress)，在執行緒池中呼叫
+        kwargs: 傳給Robot.prepareRobotForMotion()的其他參數(如attemptTimeout, minEnableTime)
+
+        返回:
+        dict: 機器人名稱 -> 是否成功進入準備狀態
+        """
+        calls = {}
+        for name, robot in self.robots.items():
+            callback = None if progressCallback is None else functools.partial(progressCallback, name)
+            calls[name] = functools.partial(robot.prepareRobotForMotion, retryTimes, retryDelay,
+                                            timeout=timeout, progressCallback=callback, **kwargs)
+        return self.__run(calls, None, True)
+
+    def stopAll(self):
+        """
+        同時停止所有機器人(單台失敗不影響其他機器人送出停止命令，全部送出後才拋出FleetError)
+        """
+        self.map(Robot.motionStop)
+
+    def setIOAll(self, *args):
+        """
+        對所有機器人設定相同的數位輸出，參數同Robot.setIO()
+        """
+        self.map(lambda robot: robot.setIO(*args))
+
+    def sendMotionCommandAll(self, positions: Mapping[str, Sequence[float]], **kwargs):
+        """
+        同時對多台機器人送出運動命令
+
+        參數:
+        positions: 機器人名稱 -> 目標位姿
+        kwargs: 傳給Robot.sendMotionCommand()的其他參數(如speed, robotCommand)
+        """
+        self.__run({name: functools.partial(self.robots[name].sendMotionCommand, position, **kwargs)
+                    for name, position in positions.items()}, None, True)
+
+    def waitAllReachTargetPosition(self, timeout: Optional[float] = None, names: Optional[Iterable[str]] = None):
+        """
+        同時等待多台機器人運動完成(見Robot.waitRobotReachTargetPosition())
+        """
+        self.map(lambda robot: robot.waitRobotReachTargetPosition(timeout=timeout), names=names)
+
+    def startTelemetryAll(self, **kwargs):
+        """
+        啟動所有機器人的遙測輪詢，kwargs同Robot.startTelemetry()
+        """
+        for robot in self.robots.values():
+            robot.startTelemetry(**kwargs)
+
+    def stopTelemetryAll(self):
+        for robot in self.robots.values():
+            robot.stopTelemetry()
+
+    def getSnapshot(self, includePoseFlag: bool = False, maxAge: Optional[float] = None) -> FleetSnapshot:
+        """
+        同時讀取所有機器人的狀態快照，讀取失敗的機器人記錄在FleetSnapshot.errors
+
+        參數:
+        includePoseFlag, maxAge: 同Robot.getRobotStatusSnapshot()
+        """
+        results = self.map(lambda robot: robot.getRobotStatusSnapshot(includePoseFlag, maxAge), raiseOnError=False)
+        return FleetSnapshot(snapshots={name: value for name, value in results.items() if not isinstance(value, Exception)},
+                             errors={name: value for name, value in results.items() if isinstance(value, Exception)})
+
+    ##################################################################
+
+    def __getExecutor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.maxWorkers or max(1, len(self.robots)),
+                                                 thread_name_prefix="RobotFleet")
+        return self.__executor
+
+    def __resetExecutor(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+        self.__executor = None
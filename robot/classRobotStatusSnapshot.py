@@ -0,0 +1,107 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+# 狀態快照需要的寄存器欄位(見robot/registerMap.py)
+# 依預設的合併規則會被規劃成兩次區塊讀取：
+# 0x00E0~0x014F(運動狀態、TCP位姿、系統狀態、操作模式、教導盒狀態、軸錯誤碼)及0x01E0~0x01FF(機器人組、控制器錯誤碼)
+# 兩個區塊之間相距超過Modbus單次讀取上限(125個寄存器)，因此至少需要兩次讀取
+STATUS_FIELDS = ("robotMotionState", "tcpPose", "robotSystemState", "operationMode", "teachPanelState",
+                 "jointsError", "robotGroupError", "controllerError")
+
+
+@dataclass(frozen=True)
+class RobotStatusSnapshot:
+    """
+    機器人狀態快照
+
+    以少量的區塊讀取一次取得機器人的錯誤碼、系統狀態、操作模式、教導盒狀態、運動狀態及位姿，
+    取代逐一呼叫getRobotErrorCode(), getTeachPanelState(), getRobotSystemState()等方法。
+    快照建立後不可修改，可安全地在多個執行緒之間共用。
+    """
+    controllerError: int
+    robotGroupError: int
+    jointsError: Tuple[int, int, int, int, int, int]
+    robotSystemState: int
+    operationMode: int
+    teachPanelState: int
+    robotMotionState: int
+    tcpPose: Tuple[float, float, float, float, float, float]
+    poseFlag: Optional[int] = None                                  #未讀取時為None
+    timestamp: float = field(default_factory=time.monotonic)        #建立快照的時間(time.monotonic)
+
+    @classmethod
+    def fromFields(cls, values: dict, timestamp: Optional[float] = None) -> "RobotStatusSnapshot":
+        """
+        由Robot.readFields(*STATUS_FIELDS)的結果建立狀態快照，
+        若values包含poseFlag則一併記錄
+
+        timestamp: 資料讀取的時間(time.monotonic)，None表示現在
+        """
+        jointsError = values["jointsError"]
+        jointsError = jointsError[-4:] + jointsError[:2]
+        return cls(controllerError=values["controllerError"],
+                   robotGroupError=values["robotGroupError"],
+                   jointsError=tuple(jointsError),
+                   robotSystemState=values["robotSystemState"],
+                   operationMode=values["operationMode"],
+                   teachPanelState=values["teachPanelState"],
+                   robotMotionState=values["robotMotionState"],
+                   tcpPose=tuple(values["tcpPose"]),
+                   poseFlag=values.get("poseFlag"),
+                   timestamp=time.monotonic() if timestamp is None else timestamp)
+
+    @property
+    def errorCode(self) -> Tuple[int, int, list[int]]:
+        """
+        與Robot.getRobotErrorCode()相同格式的錯誤碼
+        """
+        return self.controllerError, self.robotGroupError, list(self.jointsError)
+
+    @property
+    def isRobotError(self) -> bool:
+        """
+        檢查機器人是否處於錯誤狀態
+        """
+        return self.errorCode != (0, 0, [0, 0, 0, 0, 0, 0])
+
+    @property
+    def isRobotReachTargetPosition(self) -> Optional[bool]:
+        """
+        檢查Robot是否到達位置，若快照未讀取位姿狀態標誌則返回None
+        """
+        if self.poseFlag is None:
+            return None
+        return self.poseFlag == 1
+
+    @property
+    def isRobotReadyForMotion(self) -> bool:
+        """
+        檢查機器人是否處於可以運動的狀態(與Robot.isRobotReadyForMotion條件相同)
+        """
+        return (not self.isRobotError and
+                self.teachPanelState == 0 and
+                self.robotSystemState == 0)
+
+    @property
+    def notReadyReason(self) -> str:
+        """
+        機器人未準備運動的原因(與Robot.getRobotNotReadyReason()格式相同)
+        """
+        reason = ""
+        if self.controllerError != 0:
+            reason += "控制器錯誤碼: " + str(self.controllerError) + "\n"
+        if self.robotGroupError != 0:
+            reason += "機器人組錯誤碼: " + str(self.robotGroupError) + "\n"
+        if list(self.jointsError) != [0, 0, 0, 0, 0, 0]:
+            reason += "軸錯誤碼: " + str(list(self.jointsError)) + "\n"
+        if self.teachPanelState != 0:
+            reason += "教導盒未釋放控制權" + "\n"
+        return reason
+
+    @property
+    def age(self) -> float:
+        """
+        快照建立至今經過的秒數
+        """
+        return time.monotonic() - self.timestamp
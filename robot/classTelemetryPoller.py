@@ -0,0 +1,136 @@
+import time
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping, Optional, Union
+
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot, STATUS_FIELDS
+from robot.registerMap import RegisterField
+
+# 預設輪詢的欄位：狀態快照所需欄位加上位姿狀態標誌與警告碼，涵蓋錯誤監控(ErrorMonitor)、運動等待與位姿讀取
+# (警告碼0x020E與控制器錯誤0x01FF在同一個讀取區塊內，不會增加讀取次數)
+DEFAULT_TELEMETRY_FIELDS = STATUS_FIELDS + ("poseFlag", "robotWarning")
+
+
+@dataclass(frozen=True)
+class TelemetrySnapshot:
+    """
+    遙測快照，包含一次輪詢讀到的所有欄位
+
+    values: 欄位名稱 -> 解碼後的值(唯讀，多值欄位為tuple)
+    timestamp: 開始讀取的時間(time.monotonic)，以開始時間為準可確保快照不會比實際資料新
+    """
+    values: Mapping[str, object]
+    timestamp: float
+
+    def __getitem__(self, name: str):
+        return self.values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    @property
+    def age(self) -> float:
+        """
+        快照建立至今經過的秒數
+        """
+        return time.monotonic() - self.timestamp
+
+    def toStatusSnapshot(self) -> RobotStatusSnapshot:
+        """
+        轉換為RobotStatusSnapshot(需包含STATUS_FIELDS的所有欄位)
+        """
+        return RobotStatusSnapshot.fromFields(self.values, self.timestamp)
+
+
+class TelemetryPoller:
+    """
+    遙測輪詢執行緒
+
+    以固定頻率讀取指定的欄位(自動合併為最少次數的區塊讀取)，並將結果發布為不可修改的TelemetrySnapshot。
+    發布只是替換一個參考，讀取端不需要加鎖，多個執行緒(視覺迴圈、錯誤監控、運動等待)可以共用同一個輪詢來源。
+    """
+    def __init__(self,
+                 readFields: Callable[..., dict],
+                 fields: Iterable[Union[str, RegisterField]] = DEFAULT_TELEMETRY_FIELDS,
+                 period: float = 0.05):
+        """
+        參數:
+        readFields: 讀取欄位的函式，通常是Robot.readFields
+        fields: 要輪詢的欄位
+        period: 輪詢週期(秒)
+        """
+        if period <= 0:
+            raise ValueError("period 應設為正數")
+        self.__readFields = readFields
+        self.fields = tuple(fields)
+        self.period = period
+        self.__latest: Optional[TelemetrySnapshot] = None
+        self.lastError: Optional[Exception] = None      #最近一次讀取失敗的例外，成功後清除
+        self.__listeners: list[Callable[[TelemetrySnapshot], None]] = []
+        self.__stopEvent = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    @property
+    def latest(self) -> Optional[TelemetrySnapshot]:
+        """
+        最新的遙測快照，尚未讀取成功時為None
+        """
+        return self.__latest
+
+    @property
+    def isRunning(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def addListener(self, callback: Callable[[TelemetrySnapshot], None]):
+        """
+        註冊快照更新的回呼，會在輪詢執行緒中呼叫，請避免在回呼中做耗時工作
+        """
+        self.__listeners.append(callback)
+
+    def removeListener(self, callback: Callable[[TelemetrySnapshot], None]):
+        self.__listeners.remove(callback)
+
+    def pollOnce(self) -> TelemetrySnapshot:
+        """
+        立即讀取一次並發布快照
+        """
+        timestamp = time.monotonic()
+        values = self.__readFields(*self.fields)
+        # 多值欄位(位姿、軸錯誤碼)轉為tuple，讓所有讀取端共用的快照真正不可修改
+        values = {name: tuple(value) if isinstance(value, list) else value for name, value in values.items()}
+        snapshot = TelemetrySnapshot(MappingProxyType(values), timestamp)
+        self.__latest = snapshot
+        for callback in list(self.__listeners):
+            callback(snapshot)
+        return snapshot
+
+    def start(self):
+        """
+        啟動輪詢執行緒
+        """
+        if self.isRunning:
+            return
+        self.__stopEvent.clear()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        停止輪詢執行緒
+        """
+        self.__stopEvent.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        while not self.__stopEvent.is_set():
+            startTime = time.monotonic()
+            try:
+                self.pollOnce()
+                self.lastError = None
+            except Exception as e:
+                # 讀取失敗時保留舊快照，讀取端會因快照過期而改為直接讀取
+                self.lastError = e
+            self.__stopEvent.wait(max(0.0, self.period - (time.monotonic() - startTime)))
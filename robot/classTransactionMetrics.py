@@ -0,0 +1,171 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional, Sequence
+
+# 預設的延遲直方圖區間上限(秒)
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class TransactionRecord(NamedTuple):
+    """
+    一次Modbus交易的紀錄(Robot每次經由連線送出請求後產生)
+
+    functionCode: Modbus function code(0x03讀取、0x06/0x10寫入、0x17讀寫)
+    address: 起始地址(0x17為寫入地址)
+    count: 寄存器數量
+    duration: 耗時(秒)，包含重連與重試
+    outcome: "ok"、"exception"(控制器回應Modbus例外碼)或"connection"(重連、重試後仍無法通訊)
+    retries: 傳輸失敗後重試的次數
+    callSite: 呼叫來源，見Robot.transactionLabel()
+    timestamp: 交易開始的時間(time.monotonic)
+    """
+    functionCode: int
+    address: int
+    count: int
+    duration: float
+    outcome: str
+    retries: int
+    callSite: str
+    timestamp: float
+
+
+class TransactionMetrics:
+    """
+    Modbus交易統計
+
+    作為Robot.addTransactionListener()的監聽者，依(function code, 呼叫來源)彙總交易次數、
+    結果、重試次數、寄存器數量與延遲直方圖，可輸出為Prometheus文字格式。
+
+    使用方法:
+    metrics = TransactionMetrics()
+    robotDRV.addTransactionListener(metrics)
+    ...
+    print(metrics.toPrometheus())
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, prefix: str = "drv_modbus"):
+        """
+        參數:
+        buckets: 延遲直方圖的區間上限(秒)，需遞增
+        prefix: Prometheus指標名稱的前綴
+        """
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, record: TransactionRecord):
+        self.record(record)
+
+    def reset(self):
+        """
+        清除所有統計
+        """
+        with self.__lock:
+            self.__transactions: dict[tuple, int] = defaultdict(int)          # (fc, callSite, outcome) -> 次數
+            self.__retries: dict[tuple, int] = defaultdict(int)               # (fc, callSite) -> 重試次數
+            self.__registers: dict[tuple, int] = defaultdict(int)             # (fc, callSite) -> 寄存器數量
+            self.__bucketCounts: dict[tuple, list[int]] = {}                  # (fc, callSite) -> 各區間次數(最後一格為+Inf)
+            self.__durationSum: dict[tuple, float] = defaultdict(float)
+            self.__maxDuration: dict[tuple, float] = defaultdict(float)
+
+    def record(self, record: TransactionRecord):
+        """
+        記錄一次交易
+        """
+        key = (record.functionCode, record.callSite)
+        with self.__lock:
+            self.__transactions[key + (record.outcome,)] += 1
+            self.__retries[key] += record.retries
+            self.__registers[key] += record.count
+            counts = self.__bucketCounts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, record.duration)] += 1
+            self.__durationSum[key] += record.duration
+            self.__maxDuration[key] = max(self.__maxDuration[key], record.duration)
+
+    def summary(self) -> list[dict]:
+        """
+        依交易次數由多到少排列的彙總，方便找出產生最多往返的呼叫來源
+
+        返回:
+        list[dict]: 每個(function code, 呼叫來源)一筆，包含次數、錯誤數、重試數、平均與最大延遲
+        """
+        with self.__lock:
+            rows = []
+            for key, counts in self.__bucketCounts.items():
+                total = sum(counts)
+                errors = sum(value for (functionCode, callSite, outcome), value in self.__transactions.items()
+                             if (functionCode, callSite) == key and outcome != "ok")
+                rows.append({
+                    "functionCode": key[0],
+                    "callSite": key[1],
+                    "transactions": total,
+                    "errors": errors,
+                    "retries": self.__retries[key],
+                    "registers": self.__registers[key],
+                    "meanSeconds": self.__durationSum[key] / total,
+                    "maxSeconds": self.__maxDuration[key],
+                })
+        return sorted(rows, key=lambda row: row["transactions"], reverse=True)
+
+    def toPrometheus(self) -> str:
+        """
+        輸出為Prometheus文字格式(exposition format 0.0.4)
+        """
+        name = self.prefix
+        lines = [f"# HELP {name}_transactions_total Modbus transactions by function code, call site and outcome",
+                 f"# TYPE {name}_transactions_total counter"]
+        with self.__lock:
+            for (functionCode, callSite, outcome), value in sorted(self.__transactions.items()):
+                lines.append(f"{name}_transactions_total{{{self.__labels(functionCode, callSite)},outcome=\"{outcome}\"}} {value}")
+
+            lines += [f"# HELP {name}_retries_total Retries after transport failures",
+                      f"# TYPE {name}_retries_total counter"]
+            for (functionCode, callSite), value in sorted(self.__retries.items()):
+                lines.append(f"{name}_retries_total{{{self.__labels(functionCode, callSite)}}} {value}")
+
+            lines += [f"# HELP {name}_registers_total Registers transferred",
+                      f"# TYPE {name}_registers_total counter"]
+            for (functionCode, callSite), value in sorted(self.__registers.items()):
+                lines.append(f"{name}_registers_total{{{self.__labels(functionCode, callSite)}}} {value}")
+
+            lines += [f"# HELP {name}_transaction_duration_seconds Modbus transaction latency",
+                      f"# TYPE {name}_transaction_duration_seconds histogram"]
+            for key, counts in sorted(self.__bucketCounts.items()):
+                labels = self.__labels(*key)
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_transaction_duration_seconds_bucket{{{labels},le=\"{le}\"}} {cumulative}")
+                lines.append(f"{name}_transaction_duration_seconds_sum{{{labels}}} {self.__durationSum[key]}")
+                lines.append(f"{name}_transaction_duration_seconds_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def __labels(functionCode: int, callSite: str) -> str:
+        callSite = callSite.replace("\\", "\\\\").replace("\"", "\\\"")
+        return f"function_code=\"{functionCode}\",call_site=\"{callSite}\""
+
+
+class TransactionTimer:
+    """
+    量測一次交易的耗時與重試次數，結束後產生TransactionRecord(Robot內部使用)
+    """
+    def __init__(self, functionCode: int, address: int, count: int, callSite: str):
+        self.functionCode = functionCode
+        self.address = address
+        self.count = count
+        self.callSite = callSite
+        self.retries = 0
+        self.timestamp = time.monotonic()
+        self.__start = time.perf_counter()
+
+    def onRetry(self, error: Optional[Exception] = None):
+        self.retries += 1
+
+    def finish(self, outcome: str) -> TransactionRecord:
+        return TransactionRecord(self.functionCode, self.address, self.count,
+                                 time.perf_counter() - self.__start, outcome,
+                                 self.retries, self.callSite, self.timestamp)
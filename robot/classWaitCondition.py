@@ -0,0 +1,186 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Sequence
+
+
+class WaitCondition:
+    """
+    等待條件
+
+    每個條件宣告需要讀取的欄位(fields)，並由讀到的值判斷是否成立(evaluate())。
+    條件可以用 & | ~ 組合，組合後的欄位會合併為一次readFields()(依寄存器表合併為最少的區塊讀取)，
+    例如「吸盤真空到達且運動完成」每次輪詢只需要一次合併讀取。
+
+    使用方法:
+    condition = InputCondition(0) & PoseReachedCondition(target)
+    robotDRV.waitUntil(condition, timeout=5)
+    """
+    fields: tuple[str, ...] = ()
+
+    def evaluate(self, values: dict) -> bool:
+        raise NotImplementedError
+
+    def __and__(self, other: "WaitCondition") -> "WaitCondition":
+        return AllOf(self, other)
+
+    def __or__(self, other: "WaitCondition") -> "WaitCondition":
+        return AnyOf(self, other)
+
+    def __invert__(self) -> "WaitCondition":
+        return NotCondition(self)
+
+
+class FieldCondition(WaitCondition):
+    """
+    以任意函式判斷單一欄位，例如FieldCondition("robotMotionState", lambda value: value == 0)
+    """
+    def __init__(self, field: str, predicate: Callable[[object], bool], description: str = ""):
+        self.fields = (field,)
+        self.predicate = predicate
+        self.description = description or field
+
+    def evaluate(self, values: dict) -> bool:
+        return bool(self.predicate(values[self.fields[0]]))
+
+    def __repr__(self) -> str:
+        return f"FieldCondition({self.description})"
+
+
+class InputCondition(WaitCondition):
+    """
+    數位輸入DI_bit為state
+    """
+    fields = ("digitalInput",)
+
+    def __init__(self, bit: int, state: bool = True):
+        if not 0 <= bit <= 15:
+            raise ValueError("DI編號應為0~15")
+        self.bit = bit
+        self.state = state
+
+    def evaluate(self, values: dict) -> bool:
+        return bool(values["digitalInput"] >> self.bit & 1) == self.state
+
+    def __repr__(self) -> str:
+        return f"InputCondition(DI_{self.bit}={self.state})"
+
+
+class PoseReachedCondition(WaitCondition):
+    """
+    運動完成：已知目標位姿時為「運動停止且TCP位姿接近目標」，否則看位姿狀態標誌(與MotionWaiter相同)
+    """
+    def __init__(self, targetPose: Optional[Sequence[float]] = None, threshold: float = 0.01):
+        self.targetPose = None if targetPose is None else tuple(targetPose)
+        self.threshold = threshold
+        self.fields = ("poseFlag",) if targetPose is None else ("robotMotionState", "tcpPose")
+
+    def evaluate(self, values: dict) -> bool:
+        if self.targetPose is None:
+            return values["poseFlag"] == 1
+        return values["robotMotionState"] == 0 and math.dist(values["tcpPose"], self.targetPose) < self.threshold
+
+    def __repr__(self) -> str:
+        return f"PoseReachedCondition({self.targetPose})"
+
+
+class AllOf(WaitCondition):
+    def __init__(self, *conditions: WaitCondition):
+        self.conditions = conditions
+        self.fields = _mergeFields(conditions)
+
+    def evaluate(self, values: dict) -> bool:
+        return all(condition.evaluate(values) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return " & ".join(map(repr, self.conditions))
+
+
+class AnyOf(WaitCondition):
+    def __init__(self, *conditions: WaitCondition):
+        self.conditions = conditions
+        self.fields = _mergeFields(conditions)
+
+    def evaluate(self, values: dict) -> bool:
+        return any(condition.evaluate(values) for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return "(" + " | ".join(map(repr, self.conditions)) + ")"
+
+
+class NotCondition(WaitCondition):
+    def __init__(self, condition: WaitCondition):
+        self.condition = condition
+        self.fields = condition.fields
+
+    def evaluate(self, values: dict) -> bool:
+        return not self.condition.evaluate(values)
+
+    def __repr__(self) -> str:
+        return f"~{self.condition!r}"
+
+
+def _mergeFields(conditions: Sequence[WaitCondition]) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(field for condition in conditions for field in condition.fields))
+
+
+def waitForCondition(readFields: Callable[..., dict],
+                     condition: WaitCondition,
+                     timeout: Optional[float] = None,
+                     pollInterval: float = 0.005,
+                     abortEvent: Optional[threading.Event] = None,
+                     abortError: Optional[Callable[[], Exception]] = None) -> dict:
+    """
+    以固定間隔輪詢直到條件成立
+
+    參數:
+    readFields: 讀取欄位的函式(Robot.readFields)
+    condition: 等待條件
+    timeout: 最長等待時間(秒)，None表示不限；逾時拋出TimeoutError
+    pollInterval: 輪詢間隔(秒)，一次合併讀取約為一個Modbus往返，間隔可以很短
+    abortEvent: 被set時立即中止等待(例如ErrorMonitor.faultEvent)
+    abortError: 中止時拋出的例外，None表示拋出RuntimeError
+
+    返回:
+    dict: 條件成立時讀到的欄位
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        values = readFields(*condition.fields)
+        if condition.evaluate(values):
+            return values
+        if abortEvent is not None and abortEvent.is_set():
+            raise abortError() if abortError is not None else RuntimeError("等待已中止")
+        interval = pollInterval
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"等待條件 {condition!r} 逾時({timeout}秒)")
+            interval = min(interval, remaining)
+        if abortEvent is not None:
+            abortEvent.wait(interval)
+        else:
+            time.sleep(interval)
+
+
+async def waitForConditionAsync(readFields: Callable[..., Awaitable[dict]],
+                                condition: WaitCondition,
+                                timeout: Optional[float] = None,
+                                pollInterval: float = 0.005) -> dict:
+    """
+    waitForCondition()的asyncio版本，readFields為AsyncRobot.readFields；逾時拋出TimeoutError
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        values = await readFields(*condition.fields)
+        if condition.evaluate(values):
+            return values
+        interval = pollInterval
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"等待條件 {condition!r} 逾時({timeout}秒)")
+            interval = min(interval, remaining)
+        await asyncio.sleep(interval)
+
@@ -0,0 +1,120 @@
+from typing import NamedTuple, Optional, Union
+
+from robot.classRegisterShadow import RegisterShadow
+from robot.registerMap import DRV_REGISTER_MAP, encodeRegisterField
+
+MODBUS_MAX_WRITE_COUNT = 123    # Modbus function code 0x10 單次最多寫入的寄存器數量
+
+
+class WriteBlock(NamedTuple):
+    """
+    一次寫入(function code 0x10，只有一個寄存器時可用0x06)
+    address: 起始地址
+    values: 要寫入的值
+    """
+    address: int
+    values: tuple[int, ...]
+
+
+class WritePlan:
+    """
+    寫入規劃
+
+    收集一次運動需要寫入的所有寄存器(速度、加減速度、目標位姿...)，合併相鄰的寄存器為一次寫入，
+    並把命令寄存器固定放在最後，確保控制器收到命令時參數與目標位姿都已經寫好。
+
+    合併規則:
+    1. 地址連續的寄存器直接合併
+    2. 中間有間隙時，只有在影子快取知道所有間隙寄存器的值、且間隙不超過maxGap時，
+       才以快取值填補間隙並合併(等於把間隙寫回原值)；maxGap預設為0，即不跨越間隙
+    3. 以skipIfUnchanged加入、且影子快取顯示值未變的寄存器會被略過
+    """
+    def __init__(self,
+                 shadow: Optional[RegisterShadow] = None,
+                 maxGap: int = 0,
+                 maxCount: int = MODBUS_MAX_WRITE_COUNT):
+        """
+        參數:
+        shadow: 寄存器影子快取，用來略過未變更的值與填補間隙
+        maxGap: 允許以快取值填補的間隙寄存器數量
+        maxCount: 單次寫入的寄存器上限
+        """
+        self.shadow = shadow
+        self.maxGap = maxGap
+        self.maxCount = maxCount
+        self.__entries: list[tuple[int, list[int], bool]] = []
+        self.command: Optional[WriteBlock] = None
+
+    def add(self, address: int, values: Union[int, list[int]], skipIfUnchanged: bool = False) -> "WritePlan":
+        """
+        加入要寫入的寄存器
+
+        參數:
+        address: 起始地址
+        values: 單一值或值列表
+        skipIfUnchanged: 若影子快取顯示值未變更則略過
+        """
+        if isinstance(values, int):
+            values = [values]
+        self.__entries.append((address, list(values), skipIfUnchanged))
+        return self
+
+    def addField(self, name: str, value, skipIfUnchanged: bool = False) -> "WritePlan":
+        """
+        依寄存器表(robot/registerMap.py)加入欄位，如addField("targetPose", [x, y, z, rx, ry, rz])
+        """
+        field = DRV_REGISTER_MAP[name]
+        return self.add(field.address, encodeRegisterField(field, value), skipIfUnchanged)
+
+    def setCommand(self, address: int, value: int) -> "WritePlan":
+        """
+        設定最後寫入的命令寄存器(如0x0300的運動命令)，命令永遠不會被略過或合併
+        """
+        self.command = WriteBlock(address, (value,))
+        return self
+
+    def build(self) -> list[WriteBlock]:
+        """
+        產生寫入順序，命令(若有)固定在最後
+
+        返回:
+        list[WriteBlock]: 依序執行的寫入
+        """
+        values: dict[int, int] = {}
+        for address, entryValues, skipIfUnchanged in self.__entries:
+            if skipIfUnchanged and self.shadow is not None and self.shadow.isUnchanged(address, entryValues):
+                continue
+            for i, value in enumerate(entryValues):
+                values[address + i] = value
+
+        blocks: list[WriteBlock] = []
+        current: list[int] = []
+        currentStart = None
+        for address in sorted(values):
+            if currentStart is not None:
+                currentEnd = currentStart + len(current)
+                gap = address - currentEnd
+                gapValues = self.__gapValues(currentEnd, gap)
+                if gapValues is not None and len(current) + gap + 1 <= self.maxCount:
+                    current.extend(gapValues)
+                    current.append(values[address])
+                    continue
+                blocks.append(WriteBlock(currentStart, tuple(current)))
+            currentStart, current = address, [values[address]]
+        if currentStart is not None:
+            blocks.append(WriteBlock(currentStart, tuple(current)))
+
+        if self.command is not None:
+            blocks.append(self.command)
+        return blocks
+
+    def __gapValues(self, address: int, gap: int) -> Optional[list[int]]:
+        """
+        取得填補間隙用的值，無法填補時返回None
+        """
+        if gap == 0:
+            return []
+        if gap > self.maxGap or self.shadow is None:
+            return None
+        gapValues = [self.shadow.get(address + i) for i in range(gap)]
+        return None if None in gapValues else gapValues
@@ -114,3 +114,11 @@ class eRobotCommand(Enum):
     
     # (1000: Motion Stop)
     Motion_Stop = 0
+
+
+# 連續JOG命令(持續運動直到寫入Motion_Stop)
+CONTINUE_JOG_COMMANDS = tuple(command for command in eRobotCommand if command.name.startswith("Continue_JOG"))
+
+# 不需要提供座標的命令(停止、回原點、連續JOG)
+POSITIONLESS_COMMANDS = (eRobotCommand.Robot_All_Joints_Homing_To_Origin,
+                         eRobotCommand.Motion_Stop) + CONTINUE_JOG_COMMANDS
@@ -0,0 +1,103 @@
+"""
+位姿(與其他32位元整數)寄存器的編碼與解碼
+
+DRV的32位元整數以兩個寄存器表示：每個寄存器內為big-endian，低位字在前(word order little)，
+等同於把寄存器以little-endian的16位元依序排列後，直接以little-endian的32位元整數讀出。
+因此一次struct.unpack(或NumPy的view)即可完成整個位姿的轉換，不需要BinaryPayloadDecoder/Builder。
+
+位姿為12個寄存器，對應x, y, z, rx, ry, rz六個值，單位為0.001(mm、度)。
+"""
+import struct
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+POSE_REGISTER_COUNT = 12        # 一個位姿佔用的寄存器數量
+POSE_SCALE = 0.001              # 寄存器整數值 * POSE_SCALE = 實際數值
+POSE_INVERSE_SCALE = 1000       # 實際數值 * POSE_INVERSE_SCALE 後取整數 = 寄存器整數值(與原本int(x * 1000)一致)
+
+_POSE_REGISTERS = struct.Struct("<12H")
+_POSE_INTS = struct.Struct("<6i")
+
+
+@lru_cache(maxsize=None)
+def _int32Structs(count: int) -> tuple[struct.Struct, struct.Struct]:
+    """
+    取得count個32位元整數對應的(寄存器, 整數)Struct，依數量快取
+    """
+    return struct.Struct(f"<{count * 2}H"), struct.Struct(f"<{count}i")
+
+
+def decodeInt32(registers: Sequence[int]) -> tuple[int, ...]:
+    """
+    將寄存器值解碼為32位元有號整數(每兩個寄存器一個值)
+    """
+    if len(registers) % 2:
+        raise ValueError(f"32位元整數需要偶數個寄存器，但收到 {len(registers)} 個")
+    registerStruct, intStruct = _int32Structs(len(registers) // 2)
+    return intStruct.unpack(registerStruct.pack(*registers))
+
+
+def encodeInt32(values: Sequence[int]) -> list[int]:
+    """
+    將32位元有號整數編碼為寄存器值(decodeInt32()的反向操作)
+    """
+    registerStruct, intStruct = _int32Structs(len(values))
+    return list(registerStruct.unpack(intStruct.pack(*values)))
+
+
+def decodePose(registers: Sequence[int]) -> tuple[float, float, float, float, float, float]:
+    """
+    將12個寄存器解碼為位姿
+
+    參數:
+    registers: 從0x00F0(目前位姿)或0x0330(目標位姿)讀取的12個寄存器
+
+    返回:
+    tuple: (x, y, z, rx, ry, rz)
+    """
+    return tuple(value * POSE_SCALE for value in _POSE_INTS.unpack(_POSE_REGISTERS.pack(*registers)))
+
+
+def encodePose(pose: Sequence[float]) -> list[int]:
+    """
+    將位姿編碼為12個寄存器(decodePose()的反向操作)
+
+    參數:
+    pose: (x, y, z, rx, ry, rz)
+
+    返回:
+    list[int]: 可直接寫入0x0330的寄存器值
+    """
+    return list(_POSE_REGISTERS.unpack(_POSE_INTS.pack(*(int(value * POSE_INVERSE_SCALE) for value in pose))))
+
+
+def decodePoses(registers) -> np.ndarray:
+    """
+    批次解碼N個位姿
+
+    參數:
+    registers: 形狀為(N, 12)或長度為N*12的寄存器值(list或numpy陣列)
+
+    返回:
+    np.ndarray: 形狀為(N, 6)的float64陣列
+    """
+    words = np.ascontiguousarray(registers, dtype="<u2").reshape(-1, POSE_REGISTER_COUNT)
+    return words.view("<i4") * POSE_SCALE
+
+
+def encodePoses(poses) -> np.ndarray:
+    """
+    批次編碼N個位姿(decodePoses()的反向操作)
+
+    參數:
+    poses: 形狀為(N, 6)的位姿
+
+    返回:
+    np.ndarray: 形狀為(N, 12)的uint16陣列
+    """
+    scaled = np.trunc(np.asarray(poses, dtype=np.float64).reshape(-1, 6) * POSE_INVERSE_SCALE)
+    if np.any(scaled < np.iinfo(np.int32).min) or np.any(scaled > np.iinfo(np.int32).max):
+        raise ValueError("位姿數值超出32位元整數範圍")
+    return np.ascontiguousarray(scaled.astype("<i4")).view("<u2")
@@ -0,0 +1,195 @@
+"""
+台達DRV機器人的Modbus寄存器表，以及合併讀取的規劃工具
+
+每個RegisterField描述一個邏輯值(地址、寄存器數量、資料型別、縮放比例)，
+planRegisterReads()會把一組欄位合併成最少次數的區塊讀取(單次不超過125個寄存器)。
+"""
+from enum import Enum
+from typing import Iterable, NamedTuple, Optional, Union
+
+from robot.poseCodec import decodeInt32, encodeInt32
+
+MODBUS_MAX_READ_COUNT = 125     # Modbus function code 0x03 單次最多讀取的寄存器數量
+DEFAULT_MAX_GAP = 64            # 合併時允許跨過的未使用寄存器數量，多讀幾個寄存器比多一次往返便宜
+SERVO_ENABLE_VALUE = 0x0101     # 伺服啟用寄存器的啟用值(兩個軸各一個位元組)
+
+
+class eRegisterType(Enum):
+    UINT16 = 1      # 單一寄存器，無號
+    INT16 = 2       # 單一寄存器，有號
+    INT32 = 3       # 兩個寄存器，大端位元組、低位字在前(台達位姿格式)
+
+
+class RegisterField(NamedTuple):
+    """
+    寄存器欄位定義
+    name: 欄位名稱
+    address: 起始地址
+    count: 寄存器數量
+    dataType: 資料型別(eRegisterType)
+    scale: 解碼後乘上的比例，None表示保留整數
+    """
+    name: str
+    address: int
+    count: int = 1
+    dataType: eRegisterType = eRegisterType.UINT16
+    scale: Optional[float] = None
+
+    @property
+    def end(self) -> int:
+        """欄位結束地址(不含)"""
+        return self.address + self.count
+
+
+class ReadBlock(NamedTuple):
+    """
+    一次區塊讀取
+    address: 起始地址
+    count: 讀取的寄存器數量
+    fields: 此區塊涵蓋的欄位
+    """
+    address: int
+    count: int
+    fields: tuple[RegisterField, ...]
+
+
+# 台達DRV寄存器表(robot/classRobot.py使用到的寄存器)
+DRV_REGISTER_MAP: dict[str, RegisterField] = {field.name: field for field in (
+    RegisterField("servoEnableJ5J6", 0x0000),                                   # 伺服啟用(寫入SERVO_ENABLE_VALUE啟用，0停用)
+    RegisterField("servoEnableJ1J2", 0x0006),
+    RegisterField("servoEnableJ3J4", 0x0007),
+    RegisterField("robotMotionState", 0x00E0),                                  # 0:停止 1:運動中
+    RegisterField("tcpPose", 0x00F0, 12, eRegisterType.INT32, 0.001),           # X, Y, Z, Rx, Ry, Rz
+    RegisterField("robotSystemState", 0x0138),
+    RegisterField("operationMode", 0x0139),
+    RegisterField("teachPanelState", 0x013B),
+    RegisterField("jointsError", 0x0140, 16),                                   # 原始順序，J1~J6需另外重排
+    RegisterField("robotGroupError", 0x01E0),
+    RegisterField("controllerError", 0x01FF),
+    RegisterField("robotWarning", 0x020E),
+    RegisterField("digitalInput", 0x02FA),                                      # DI_0~DI_15(位址依手冊推定，請以實機確認)
+    RegisterField("digitalOutput", 0x02FE),                                     # DO_0~DO_15
+    RegisterField("robotCommand", 0x0300),
+    RegisterField("acceleration", 0x030A),
+    RegisterField("deceleration", 0x030C),
+    RegisterField("poseFlag", 0x031F),                                          # 1:到達 2:未到達
+    RegisterField("speed", 0x0324),
+    RegisterField("targetPose", 0x0330, 12, eRegisterType.INT32, 0.001),
+)}
+
+
+def getRegisterFields(fields: Iterable[Union[str, RegisterField]]) -> list[RegisterField]:
+    """
+    將欄位名稱轉為RegisterField，已經是RegisterField的則直接使用
+    """
+    result = []
+    for field in fields:
+        if isinstance(field, RegisterField):
+            result.append(field)
+        elif field in DRV_REGISTER_MAP:
+            result.append(DRV_REGISTER_MAP[field])
+        else:
+            raise KeyError(f"寄存器表中沒有欄位 {field}")
+    return result
+
+
+def planRegisterReads(fields: Iterable[Union[str, RegisterField]],
+                      maxGap: int = DEFAULT_MAX_GAP,
+                      maxCount: int = MODBUS_MAX_READ_COUNT) -> list[ReadBlock]:
+    """
+    將一組欄位合併為最少次數的區塊讀取
+
+    依地址排序後貪婪地延伸目前區塊，只要延伸後的長度不超過maxCount，
+    且與前一欄位之間的間隙不超過maxGap，就併入同一次讀取。
+
+    參數:
+    fields: 欄位名稱或RegisterField
+    maxGap: 允許跨過的未使用寄存器數量
+    maxCount: 單次讀取的寄存器上限
+
+    返回:
+    list[ReadBlock]: 依地址排序的區塊讀取
+    """
+    registerFields = sorted(set(getRegisterFields(fields)), key=lambda field: (field.address, field.count))
+    blocks: list[ReadBlock] = []
+    blockStart, blockEnd, blockFields = None, None, []
+    for field in registerFields:
+        if field.count > maxCount:
+            raise ValueError(f"欄位 {field.name} 的長度({field.count})超過單次讀取上限({maxCount})")
+        if (blockStart is not None and
+                field.address - blockEnd <= maxGap and
+                max(blockEnd, field.end) - blockStart <= maxCount):
+            blockEnd = max(blockEnd, field.end)
+            blockFields.append(field)
+            continue
+        if blockStart is not None:
+            blocks.append(ReadBlock(blockStart, blockEnd - blockStart, tuple(blockFields)))
+        blockStart, blockEnd, blockFields = field.address, field.end, [field]
+    if blockStart is not None:
+        blocks.append(ReadBlock(blockStart, blockEnd - blockStart, tuple(blockFields)))
+    return blocks
+
+
+def decodeRegisterField(field: RegisterField, registers: list[int]):
+    """
+    解碼單一欄位的原始寄存器值
+
+    返回:
+    單一數值(欄位只包含一個值時)或list(欄位包含多個值時)
+    """
+    if field.dataType == eRegisterType.INT32:
+        values = list(decodeInt32(registers))
+    elif field.dataType == eRegisterType.INT16:
+        values = [value - 0x10000 if value & 0x8000 else value for value in registers]
+    else:
+        values = list(registers)
+
+    if field.scale is not None:
+        values = [value * field.scale for value in values]
+    return values[0] if len(values) == 1 else values
+
+
+def encodeRegisterField(field: RegisterField, values) -> list[int]:
+    """
+    將數值編碼為欄位的原始寄存器值(decodeRegisterField()的反向操作)
+
+    參數:
+    field: 欄位定義
+    values: 單一數值或數值序列(會先乘上1/scale再取整數，與原本int(x * 1000)的行為一致)
+
+    返回:
+    list[int]: 寄存器值，長度等於field.count
+    """
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    if field.scale is not None:
+        inverseScale = 1 / field.scale
+        values = [value * inverseScale for value in values]
+
+    if field.dataType == eRegisterType.INT32:
+        registers = encodeInt32([int(value) for value in values])
+    else:
+        registers = [int(value) & 0xFFFF for value in values]
+
+    if len(registers) != field.count:
+        raise ValueError(f"欄位 {field.name} 需要 {field.count} 個寄存器，但編碼出 {len(registers)} 個")
+    return registers
+
+
+def decodeReadBlocks(blocks: list[ReadBlock], blockRegisters: list[list[int]]) -> dict:
+    """
+    由區塊讀取的結果解碼出所有欄位
+
+    參數:
+    blocks: planRegisterReads()的結果
+    blockRegisters: 與blocks一一對應的寄存器值
+
+    返回:
+    dict: 欄位名稱 -> 解碼後的值
+    """
+    values = {}
+    for block, registers in zip(blocks, blockRegisters):
+        for field in block.fields:
+            offset = field.address - block.address
+            values[field.name] = decodeRegisterField(field, registers[offset:offset + field.count])
+    return values
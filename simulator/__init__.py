@@ -0,0 +1 @@
+from .classDRVSimulator import DRVSimulator
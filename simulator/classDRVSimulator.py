@@ -0,0 +1,493 @@
+"""
+台達DRV控制器的Modbus TCP模擬器
+
+實作Robot使用到的寄存器(見robot/registerMap.py)與function code 0x03/0x06/0x10/0x17，
+並模擬運動時間、連續JOG、伺服啟用、錯誤與重設，另外可注入延遲、Modbus例外與斷線，
+讓Robot/AsyncRobot可以在沒有手臂的環境下做迴歸測試與效能量測。
+
+使用方法:
+with DRVSimulator(servoEnabled=True) as simulator:
+    robotDRV = Robot(host=simulator.host, port=simulator.port)
+    robotDRV.sendMotionCommand([400, 0, 300, 180, 0, 90], robotCommand=eRobotCommand.Robot_Go_MovL)
+"""
+import math
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from typing import Optional, Sequence
+
+from robot.enumRobotCommand import eRobotCommand
+from robot.poseCodec import decodePose, encodePose
+from robot.registerMap import DRV_REGISTER_MAP, MODBUS_MAX_READ_COUNT, SERVO_ENABLE_VALUE
+from robot.classWritePlan import MODBUS_MAX_WRITE_COUNT
+
+SERVO_ENABLE_ADDRESSES = tuple(DRV_REGISTER_MAP[name].address for name in ("servoEnableJ1J2", "servoEnableJ3J4", "servoEnableJ5J6"))
+JOINT_ERROR_RESET_ADDRESS = 0x0020              # 寫入257重設軸錯誤
+SYSTEM_ERROR_RESET_ADDRESS = 0x0180             # 寫入257重設系統錯誤
+JOINT_ERROR_OFFSETS = (12, 13, 14, 15, 0, 1)    # J1~J6錯誤碼在0x0140區塊中的位置(Robot以[-4:]+[:2]重排)
+DEFAULT_HOME_POSE = (0.0, 367.0, 293.5, 180.0, 0.0, 90.0)
+
+# 連續JOG命令 -> (位姿索引, 方向)
+CONTINUE_JOG_AXES = {
+    eRobotCommand.Continue_JOG_X_Positive.value: (0, 1), eRobotCommand.Continue_JOG_X_Negative.value: (0, -1),
+    eRobotCommand.Continue_JOG_Y_Positive.value: (1, 1), eRobotCommand.Continue_JOG_Y_Negative.value: (1, -1),
+    eRobotCommand.Continue_JOG_Z_Positive.value: (2, 1), eRobotCommand.Continue_JOG_Z_Negative.value: (2, -1),
+    eRobotCommand.Continue_JOG_RX_Positive.value: (3, 1), eRobotCommand.Continue_JOG_RX_Negative.value: (3, -1),
+    eRobotCommand.Continue_JOG_RY_Positive.value: (4, 1), eRobotCommand.Continue_JOG_RY_Negative.value: (4, -1),
+    eRobotCommand.Continue_JOG_RZ_Positive.value: (5, 1), eRobotCommand.Continue_JOG_RZ_Negative.value: (5, -1),
+}
+# 需要目標位姿(0x0330)的運動命令
+GO_COMMANDS = (eRobotCommand.Robot_Go_MovP.value, eRobotCommand.Robot_Go_MovL.value,
+               eRobotCommand.Robot_Go_MultiMoveJ.value, eRobotCommand.Robot_Go_MArchP.value,
+               eRobotCommand.Robot_Go_MArchL.value)
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+
+
+class _Motion:
+    """
+    一段運動：start -> target 線性內插，或連續JOG(target為None)
+    """
+    def __init__(self, start: Sequence[float], startTime: float,
+                 target: Optional[Sequence[float]] = None, duration: float = 0.0,
+                 jogAxis: Optional[int] = None, jogVelocity: float = 0.0):
+        self.start = tuple(start)
+        self.startTime = startTime
+        self.target = None if target is None else tuple(target)
+        self.duration = duration
+        self.jogAxis = jogAxis
+        self.jogVelocity = jogVelocity
+
+    def poseAt(self, now: float) -> tuple[tuple[float, ...], bool]:
+        """
+        返回(now時的位姿, 是否已完成)
+        """
+        elapsed = now - self.startTime
+        if self.target is None:
+            pose = list(self.start)
+            pose[self.jogAxis] += self.jogVelocity * elapsed
+            return tuple(pose), False
+        if elapsed >= self.duration:
+            return self.target, True
+        ratio = elapsed / self.duration
+        return tuple(a + (b - a) * ratio for a, b in zip(self.start, self.target)), False
+
+
+class DRVSimulator:
+    """
+    台達DRV控制器模擬器(Modbus TCP伺服器)
+
+    模擬行為:
+    1. 運動: 寫入0x0300的Go命令後，位姿由目前位置線性移動到0x0330的目標，時間依距離與速度(0x0324)計算；
+       運動中運動狀態(0x00E0)為1、位姿狀態標誌(0x031F)為2，到達後為0與1
+    2. 連續JOG(601~612)持續移動直到寫入停止命令(0)；回原點(1405)移動到homePose
+    3. 伺服: 0x0006/0x0007/0x0000都寫入0x0101才視為啟用，未啟用、有錯誤或教導盒啟用時忽略運動命令
+    4. 錯誤: injectError()注入的錯誤會停止運動，寫入0x0020/0x0180(Robot.resetRobotError())後清除
+
+    故障注入:
+    latency / latencyJitter: 每個請求回應前的延遲(秒)
+    failRequests(): 接下來的請求回應Modbus例外碼，或直接斷線
+    dropConnections(): 立即關閉所有用戶端連線
+
+    統計:
+    requestCounts: function code -> 請求次數
+    """
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 servoEnabled: bool = False,
+                 homePose: Sequence[float] = DEFAULT_HOME_POSE,
+                 linearSpeed: float = 500.0,
+                 angularSpeed: float = 180.0,
+                 jogSpeed: float = 50.0,
+                 minMoveTime: float = 0.05,
+                 timeScale: float = 1.0,
+                 latency: float = 0.0,
+                 latencyJitter: float = 0.0):
+        """
+        參數:
+        host, port: 監聽地址，port為0時自動選擇可用的埠(啟動後見self.port)
+        servoEnabled: 啟動時伺服是否已啟用
+        homePose: 初始位姿，也是回原點命令的目標
+        linearSpeed: 速度100%時的直線速度(mm/s)
+        angularSpeed: 速度100%時的旋轉速度(度/s)
+        jogSpeed: 速度100%時連續JOG的速度(mm/s或度/s)
+        minMoveTime: 每段運動的最短時間(秒)
+        timeScale: 運動時間的倍率，小於1可加速測試
+        latency: 每個請求回應前的固定延遲(秒)
+        latencyJitter: 額外的隨機延遲上限(秒)
+        """
+        self.homePose = tuple(homePose)
+        self.linearSpeed = linearSpeed
+        self.angularSpeed = angularSpeed
+        self.jogSpeed = jogSpeed
+        self.minMoveTime = minMoveTime
+        self.timeScale = timeScale
+        self.latency = latency
+        self.latencyJitter = latencyJitter
+        self.requestCounts: Counter = Counter()
+        self.ignoredCommands: list[int] = []     #因伺服未啟用、錯誤或教導盒啟用而被忽略的命令
+
+        self.__registers = [0] * 0x10000
+        self.__lock = threading.RLock()
+        self.__pose = self.homePose
+        self.__motion: Optional[_Motion] = None
+        self.__failures: list[Optional[int]] = []
+        self.__connections: set[socket.socket] = set()
+        self.__server: Optional[socketserver.ThreadingTCPServer] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__address = (host, port)
+
+        self.__setRegister("poseFlag", 1)
+        self.__setRegister("operationMode", 3)
+        self.__setRegister("speed", 10)
+        self.__setRegister("acceleration", 10)
+        self.__setRegister("deceleration", 10)
+        if servoEnabled:
+            for address in SERVO_ENABLE_ADDRESSES:
+                self.__registers[address] = SERVO_ENABLE_VALUE
+        self.__publishPose(self.__pose)
+
+    def __enter__(self) -> "DRVSimulator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    ##################################################################
+    # 伺服器
+
+    def start(self):
+        """
+        在背景執行緒啟動Modbus TCP伺服器
+        """
+        simulator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                simulator._serveConnection(self.request)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self.__server = Server(self.__address, Handler)
+        self.__address = self.__server.server_address[:2]
+        self.__thread = threading.Thread(target=self.__server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        停止伺服器並關閉所有連線
+        """
+        if self.__server is None:
+            return
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.dropConnections()
+        self.__thread.join()
+        self.__server = None
+
+    @property
+    def host(self) -> str:
+        return self.__address[0]
+
+    @property
+    def port(self) -> int:
+        return self.__address[1]
+
+    def _serveConnection(self, connection: socket.socket):
+        """
+        處理一條用戶端連線，直到對方關閉或被dropConnections()中斷
+        """
+        with self.__lock:
+            self.__connections.add(connection)
+        try:
+            while True:
+                header = self.__receive(connection, 7)
+                if header is None:
+                    return
+                transactionId, protocolId, length, unit = struct.unpack(">HHHB", header)
+                pdu = self.__receive(connection, length - 1)
+                if pdu is None:
+                    return
+                delay = self.latency + (random.uniform(0, self.latencyJitter) if self.latencyJitter else 0.0)
+                if delay > 0:
+                    time.sleep(delay)
+                response = self.handleRequest(pdu)
+                if response is None:        # 注入斷線
+                    return
+                connection.sendall(struct.pack(">HHHB", transactionId, protocolId, len(response) + 1, unit) + response)
+        except OSError:
+            return
+        finally:
+            with self.__lock:
+                self.__connections.discard(connection)
+            connection.close()
+
+    @staticmethod
+    def __receive(connection: socket.socket, size: int) -> Optional[bytes]:
+        data = b""
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def handleRequest(self, pdu: bytes) -> Optional[bytes]:
+        """
+        處理一個Modbus PDU(不含MBAP標頭)，返回回應的PDU；返回None表示關閉連線
+        """
+        functionCode = pdu[0]
+        with self.__lock:
+            self.requestCounts[functionCode] += 1
+            if self.__failures:
+                exceptionCode = self.__failures.pop(0)
+                if exceptionCode is None:
+                    return None
+                return struct.pack(">BB", functionCode | 0x80, exceptionCode)
+            try:
+                if functionCode == 0x03:
+                    address, count = struct.unpack(">HH", pdu[1:5])
+                    values = self.readRegisters(address, count)
+                    return struct.pack(f">BB{count}H", functionCode, count * 2, *values)
+                if functionCode == 0x06:
+                    address, value = struct.unpack(">HH", pdu[1:5])
+                    self.writeRegisters(address, [value])
+                    return pdu[:5]
+                if functionCode == 0x10:
+                    address, count = struct.unpack(">HH", pdu[1:5])
+                    self.__checkRange(address, count, MODBUS_MAX_WRITE_COUNT)
+                    self.writeRegisters(address, list(struct.unpack(f">{count}H", pdu[6:6 + count * 2])))
+                    return pdu[:5]
+                if functionCode == 0x17:
+                    readAddress, readCount, writeAddress, writeCount = struct.unpack(">HHHH", pdu[1:9])
+                    self.__checkRange(writeAddress, writeCount, 121)
+                    self.writeRegisters(writeAddress, list(struct.unpack(f">{writeCount}H", pdu[10:10 + writeCount * 2])))
+                    values = self.readRegisters(readAddress, readCount)
+                    return struct.pack(f">BB{readCount}H", functionCode, readCount * 2, *values)
+            except _ModbusError as e:
+                return struct.pack(">BB", functionCode | 0x80, e.exceptionCode)
+            return struct.pack(">BB", functionCode | 0x80, ILLEGAL_FUNCTION)
+
+    @staticmethod
+    def __checkRange(address: int, count: int, maxCount: int):
+        if not 1 <= count <= maxCount:
+            raise _ModbusError(ILLEGAL_DATA_VALUE)
+        if address + count > 0x10000:
+            raise _ModbusError(ILLEGAL_DATA_ADDRESS)
+
+    ##################################################################
+    # 寄存器
+
+    def readRegisters(self, address: int, count: int) -> list[int]:
+        """
+        讀取寄存器(會先依目前時間更新運動狀態)
+        """
+        self.__checkRange(address, count, MODBUS_MAX_READ_COUNT)
+        with self.__lock:
+            self.__updateMotion(time.monotonic())
+            return self.__registers[address:address + count]
+
+    def writeRegisters(self, address: int, values: list[int]):
+        """
+        寫入寄存器，並處理命令、伺服啟用與錯誤重設
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__updateMotion(now)
+            self.__registers[address:address + len(values)] = values
+            for offset, value in enumerate(values):
+                self.__onWrite(address + offset, value, now)
+
+    def __onWrite(self, address: int, value: int, now: float):
+        if address == DRV_REGISTER_MAP["robotCommand"].address:
+            self.__onCommand(value, now)
+        elif address in SERVO_ENABLE_ADDRESSES and value != SERVO_ENABLE_VALUE:
+            self.__stopMotion(now)
+        elif address == JOINT_ERROR_RESET_ADDRESS and value == 257:
+            jointsError = DRV_REGISTER_MAP["jointsError"]
+            self.__registers[jointsError.address:jointsError.end] = [0] * jointsError.count
+        elif address == SYSTEM_ERROR_RESET_ADDRESS and value == 257:
+            self.__setRegister("controllerError", 0)
+            self.__setRegister("robotGroupError", 0)
+
+    def __onCommand(self, command: int, now: float):
+        if command == eRobotCommand.Motion_Stop.value:
+            self.__stopMotion(now)
+            return
+        if not self.isReadyForMotion:
+            self.ignoredCommands.append(command)
+            return
+        speedRatio = max(self.__getRegister("speed"), 1) / 100
+        if command in GO_COMMANDS:
+            targetPose = DRV_REGISTER_MAP["targetPose"]
+            target = decodePose(self.__registers[targetPose.address:targetPose.end])
+            self.__startMove(target, speedRatio, now)
+        elif command == eRobotCommand.Robot_All_Joints_Homing_To_Origin.value:
+            self.__startMove(self.homePose, speedRatio, now)
+        elif command in CONTINUE_JOG_AXES:
+            axis, direction = CONTINUE_JOG_AXES[command]
+            velocity = direction * self.jogSpeed * speedRatio / self.timeScale
+            self.__motion = _Motion(self.__pose, now, jogAxis=axis, jogVelocity=velocity)
+            self.__setMoving(True)
+        else:
+            self.ignoredCommands.append(command)
+
+    def __startMove(self, target: Sequence[float], speedRatio: float, now: float):
+        linear = math.dist(self.__pose[:3], target[:3]) / (self.linearSpeed * speedRatio)
+        angular = math.dist(self.__pose[3:], target[3:]) / (self.angularSpeed * speedRatio)
+        duration = max(self.minMoveTime, linear, angular) * self.timeScale
+        self.__motion = _Motion(self.__pose, now, target, duration)
+        self.__setMoving(True)
+
+    def __stopMotion(self, now: float):
+        self.__updateMotion(now)
+        self.__motion = None
+        self.__setMoving(False)
+
+    def __updateMotion(self, now: float):
+        if self.__motion is None:
+            return
+        pose, finished = self.__motion.poseAt(now)
+        self.__publishPose(pose)
+        if finished:
+            self.__motion = None
+            self.__setMoving(False)
+
+    def __setMoving(self, moving: bool):
+        self.__setRegister("robotMotionState", 1 if moving else 0)
+        self.__setRegister("poseFlag", 2 if moving else 1)
+
+    def __publishPose(self, pose: Sequence[float]):
+        self.__pose = tuple(pose)
+        tcpPose = DRV_REGISTER_MAP["tcpPose"]
+        self.__registers[tcpPose.address:tcpPose.end] = encodePose(self.__pose)
+
+    def __getRegister(self, name: str) -> int:
+        return self.__registers[DRV_REGISTER_MAP[name].address]
+
+    def __setRegister(self, name: str, value: int):
+        self.__registers[DRV_REGISTER_MAP[name].address] = value
+
+    ##################################################################
+    # 狀態與故障注入
+
+    @property
+    def pose(self) -> tuple[float, ...]:
+        """
+        目前的模擬位姿
+        """
+        with self.__lock:
+            self.__updateMotion(time.monotonic())
+            return self.__pose
+
+    @property
+    def isMoving(self) -> bool:
+        with self.__lock:
+            self.__updateMotion(time.monotonic())
+            return self.__motion is not None
+
+    @property
+    def isServoEnabled(self) -> bool:
+        return all(self.__registers[address] == SERVO_ENABLE_VALUE for address in SERVO_ENABLE_ADDRESSES)
+
+    @property
+    def isReadyForMotion(self) -> bool:
+        """
+        伺服啟用、無錯誤、教導盒未啟用且系統狀態正常
+        """
+        jointsError = DRV_REGISTER_MAP["jointsError"]
+        return (self.isServoEnabled and
+                self.__getRegister("controllerError") == 0 and
+                self.__getRegister("robotGroupError") == 0 and
+                not any(self.__registers[jointsError.address:jointsError.end]) and
+                self.__getRegister("teachPanelState") == 0 and
+                self.__getRegister("robotSystemState") == 0)
+
+    def getRegister(self, address: int) -> int:
+        with self.__lock:
+            return self.__registers[address]
+
+    def setRegister(self, address: int, value: int):
+        """
+        直接設定寄存器，不觸發命令處理(用於設定測試情境)
+        """
+        with self.__lock:
+            self.__registers[address] = value
+
+    def injectError(self,
+                    controllerError: Optional[int] = None,
+                    robotGroupError: Optional[int] = None,
+                    jointsError: Optional[dict[int, int]] = None):
+        """
+        注入錯誤，進行中的運動會立即停止
+
+        參數:
+        controllerError: 控制器錯誤碼(0x01FF)
+        robotGroupError: 機器人組錯誤碼(0x01E0)
+        jointsError: 軸編號(1~6) -> 錯誤碼
+        """
+        with self.__lock:
+            self.__stopMotion(time.monotonic())
+            if controllerError is not None:
+                self.__setRegister("controllerError", controllerError)
+            if robotGroupError is not None:
+                self.__setRegister("robotGroupError", robotGroupError)
+            for joint, code in (jointsError or {}).items():
+                self.__registers[DRV_REGISTER_MAP["jointsError"].address + JOINT_ERROR_OFFSETS[joint - 1]] = code
+
+    def setWarning(self, code: int):
+        self.setRegister(DRV_REGISTER_MAP["robotWarning"].address, code)
+
+    def setDigitalInput(self, value: int):
+        self.setRegister(DRV_REGISTER_MAP["digitalInput"].address, value)
+
+    def setTeachPanelState(self, enabled: bool):
+        self.setRegister(DRV_REGISTER_MAP["teachPanelState"].address, int(enabled))
+
+    def failRequests(self, count: int = 1, exceptionCode: Optional[int] = SERVER_DEVICE_FAILURE):
+        """
+        讓接下來count個請求失敗
+
+        參數:
+        count: 失敗的請求數
+        exceptionCode: 回應的Modbus例外碼，None表示不回應並直接關閉連線
+        """
+        with self.__lock:
+            self.__failures.extend([exceptionCode] * count)
+
+    def dropConnections(self):
+        """
+        立即關閉所有用戶端連線(模擬網路中斷)
+        """
+        with self.__lock:
+            connections = list(self.__connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    @property
+    def totalRequests(self) -> int:
+        return sum(self.requestCounts.values())
+
+    def resetCounters(self):
+        with self.__lock:
+            self.requestCounts.clear()
+
+
+class _ModbusError(Exception):
+    def __init__(self, exceptionCode: int):
+        super().__init__(exceptionCode)
+        self.exceptionCode = exceptionCode
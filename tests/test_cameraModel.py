@@ -0,0 +1,71 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from utils import CameraModel, getCameraModel, clearCameraModels
+from utils import classCameraModel
+
+K = np.array([[615.0, 0.0, 320.5],
+              [0.0, 614.0, 240.25],
+              [0.0, 0.0, 1.0]])
+
+
+class TestCameraModel(unittest.TestCase):
+
+    def setUp(self):
+        clearCameraModels()
+
+    def test_rayGridMatchesInverseProjection(self):
+        camera = CameraModel(K)
+        rays = camera.rayGrid(48, 64)
+        self.assertEqual(rays.shape, (48, 64, 3))
+        self.assertEqual(rays.dtype, np.float32)
+        self.assertFalse(rays.flags.writeable)
+        expected = np.linalg.inv(K) @ np.array([10.0, 20.0, 1.0])
+        np.testing.assert_allclose(rays[20, 10], expected, rtol=1e-6)
+        np.testing.assert_allclose(camera.pixelsToRays([(10, 20)])[0], expected)
+
+    def test_rayGridIsCachedPerResolutionWithLruEviction(self):
+        camera = CameraModel(K, maxResolutions=2)
+        first = camera.rayGrid(48, 64)
+        self.assertIs(camera.rayGrid(48, 64), first)
+        camera.rayGrid(24, 32)
+        camera.rayGrid(48, 64)      # 最近使用，不應被淘汰
+        camera.rayGrid(12, 16)
+        self.assertIs(camera.rayGrid(48, 64), first)
+        camera.rayGrid(24, 32)      # 已被淘汰，重新計算
+        camera.rayGrid(12, 16)
+        camera.rayGrid(6, 8)
+        self.assertIsNot(camera.rayGrid(48, 64), first)
+
+    def test_getCameraModelSharesModelsByValue(self):
+        first = getCameraModel(K, np.zeros(5))
+        self.assertIs(getCameraModel(K.tolist()), first)
+        self.assertIs(getCameraModel(first), first)
+        self.assertIsNot(getCameraModel(K, [0.1, 0, 0, 0, 0]), first)
+
+    def test_getCameraModelEvictsLeastRecentlyUsedCamera(self):
+        previous = classCameraModel.maxCameraModels
+        classCameraModel.maxCameraModels = 2
+        try:
+            cameras = [K * [[scale], [scale], [1]] for scale in (1.0, 2.0, 3.0)]
+            first = getCameraModel(cameras[0])
+            getCameraModel(cameras[1])
+            getCameraModel(cameras[0])
+            getCameraModel(cameras[2])
+            self.assertIs(getCameraModel(cameras[0]), first)
+            self.assertEqual(len(classCameraModel._cameraModels), 2)
+        finally:
+            classCameraModel.maxCameraModels = previous
+
+    def test_fromIntrinsics(self):
+        intrinsics = SimpleNamespace(fx=615.0, fy=614.0, ppx=320.5, ppy=240.25, coeffs=[0.0] * 5)
+        camera = CameraModel.fromIntrinsics(intrinsics)
+        np.testing.assert_array_equal(camera.cameraMatrix, K)
+        self.assertFalse(camera.hasDistortion)
+        self.assertFalse(camera.cameraMatrix.flags.writeable)
+
+
+if __name__ == "__main__":
+    unittest.main()
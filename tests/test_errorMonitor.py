@@ -0,0 +1,86 @@
+import asyncio
+import time
+import unittest
+
+from robot import Robot, ErrorMonitor, RobotErrorException, eRobotCommand, eRobotEventType
+from simulator import DRVSimulator
+
+TARGET = [400.0, 0.0, 300.0, 180.0, 0.0, 90.0]
+
+
+def errorValues(controllerError=0, robotGroupError=0, jointsError=None, robotWarning=0):
+    return {"controllerError": controllerError, "robotGroupError": robotGroupError,
+            "jointsError": jointsError or [0] * 16, "robotWarning": robotWarning}
+
+
+class TestErrorMonitor(unittest.TestCase):
+
+    def test_updateReportsOnlyTransitions(self):
+        monitor = ErrorMonitor(lambda *fields: {})
+        self.assertEqual(monitor.update(errorValues()), [])
+        joints = [0] * 16
+        joints[12] = 5          # 重排後為J1
+        events = monitor.update(errorValues(controllerError=3, jointsError=joints, robotWarning=9))
+        self.assertEqual({(event.eventType, event.source, event.code) for event in events},
+                         {(eRobotEventType.ERROR_RAISED, "controllerError", 3),
+                          (eRobotEventType.ERROR_RAISED, "joint1", 5),
+                          (eRobotEventType.WARNING_RAISED, "robotWarning", 9)})
+        self.assertTrue(monitor.isFaulted)
+        self.assertEqual(monitor.update(errorValues(controllerError=3, jointsError=joints, robotWarning=9)), [])
+        events = monitor.update(errorValues())
+        self.assertEqual({event.eventType for event in events},
+                         {eRobotEventType.ERROR_CLEARED, eRobotEventType.WARNING_CLEARED})
+        self.assertFalse(monitor.isFaulted)
+
+    def test_readFailureDoesNotStopMonitor(self):
+        results = [ConnectionError("斷線"), errorValues(robotGroupError=2)]
+        def readFields(*fields):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        monitor = ErrorMonitor(readFields)
+        events = []
+        monitor.addListener(events.append)
+        monitor.pollOnce()
+        monitor.pollOnce()
+        self.assertEqual([event.eventType for event in events],
+                         [eRobotEventType.MONITOR_FAILED, eRobotEventType.MONITOR_RECOVERED, eRobotEventType.ERROR_RAISED])
+
+    def test_asyncioQueue(self):
+        async def run():
+            monitor = ErrorMonitor(lambda *fields: errorValues(controllerError=7))
+            queue = monitor.subscribe()
+            await asyncio.get_running_loop().run_in_executor(None, monitor.pollOnce)
+            return await asyncio.wait_for(queue.get(), 1)
+        event = asyncio.run(run())
+        self.assertEqual((event.eventType, event.code), (eRobotEventType.ERROR_RAISED, 7))
+
+
+class TestErrorMonitorWithSimulator(unittest.TestCase):
+
+    def test_errorAbortsMotionWait(self):
+        with DRVSimulator(servoEnabled=True, timeScale=1.0) as simulator:
+            robotDRV = Robot(host=simulator.host, port=simulator.port)
+            events = []
+            robotDRV.startMonitorErrors(callback=events.append, period=0.02)
+            try:
+                robotDRV.sendMotionCommand(TARGET, speed=10, robotCommand=eRobotCommand.Robot_Go_MovL)
+                time.sleep(0.1)
+                simulator.injectError(controllerError=12)
+                startTime = time.monotonic()
+                with self.assertRaises(RobotErrorException):
+                    robotDRV.waitRobotReachTargetPosition(timeout=10)
+                self.assertLess(time.monotonic() - startTime, 1)
+                self.assertIn((eRobotEventType.ERROR_RAISED, "controllerError", 12),
+                              [(event.eventType, event.source, event.code) for event in events])
+
+                robotDRV.resetRobotError()
+                self.assertFalse(robotDRV.errorMonitor.isFaulted)
+            finally:
+                robotDRV.stopMonitorErrors()
+                robotDRV.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import unittest
+
+from robot import Robot, AsyncRobot, IOBank, setBit, clearBit
+from simulator import DRVSimulator
+
+DIGITAL_OUTPUT = 0x02FE
+
+
+class FakeIO:
+    def __init__(self):
+        self.writes = []
+        self.inputs = 0
+
+    def writeRegister(self, address, value):
+        self.writes.append((address, value))
+
+    def readFields(self, *fields):
+        return {"digitalInput": self.inputs, "digitalOutput": self.writes[-1][1] if self.writes else 0}
+
+
+class TestIOBank(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeIO()
+        self.io = IOBank(self.fake.writeRegister, self.fake.readFields, outputs={"suction": 0, "gripper": 3})
+
+    def test_bitHelpersHonorAllBits(self):
+        self.assertEqual(setBit(0, 1, 3, 5), 0b101010)
+        self.assertEqual(clearBit(0b111111, 0, 2), 0b111010)
+
+    def test_setWritesOnceAndSkipsUnchanged(self):
+        self.io.set(suction=True, gripper=True)
+        self.io.on("suction")
+        self.assertEqual(self.fake.writes, [(DIGITAL_OUTPUT, 0b1001)])
+        self.io.off("suction")
+        self.assertEqual(self.fake.writes[-1], (DIGITAL_OUTPUT, 0b1000))
+
+    def test_batchMergesWrites(self):
+        with self.io.batch():
+            self.io.on("suction")
+            self.io.on(5)
+            self.io.off("gripper")
+        self.assertEqual(self.fake.writes, [(DIGITAL_OUTPUT, 0b100001)])
+
+    def test_pulseRestoresOnlyItsBit(self):
+        self.io.pulse("gripper", 0.05)
+        self.io.on("suction")
+        time.sleep(0.2)
+        self.assertEqual(self.io.outputs, 0b0001)
+        self.assertEqual([value for _, value in self.fake.writes], [0b1000, 0b1001, 0b0001])
+
+    def test_unknownChannel(self):
+        with self.assertRaises(KeyError):
+            self.io.on("vacuum")
+        with self.assertRaises(ValueError):
+            self.io.on(16)
+
+
+class TestIOBankWithSimulator(unittest.TestCase):
+
+    def test_readInputsAndOutputsInOneRequest(self):
+        with DRVSimulator(servoEnabled=True) as simulator:
+            robotDRV = Robot(host=simulator.host, port=simulator.port, suctionDigitalOutputNumber=2)
+            try:
+                robotDRV.setIO(0, True)
+                robotDRV.suctionON()
+                robotDRV.suctionOFF()
+                self.assertEqual(simulator.getRegister(DIGITAL_OUTPUT), 0b001)
+                simulator.setDigitalInput(0b100)
+                simulator.resetCounters()
+                state = robotDRV.io.read()
+                self.assertEqual(simulator.totalRequests, 1)
+                self.assertTrue(state.input(2))
+                self.assertTrue(state.output(0))
+
+                async def readIO():
+                    async with AsyncRobot(host=simulator.host, port=simulator.port) as asyncRobot:
+                        return await asyncRobot.readIO()
+                self.assertEqual(asyncio.run(readIO()), state)
+            finally:
+                robotDRV.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
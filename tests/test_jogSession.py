@@ -0,0 +1,77 @@
+import time
+import unittest
+
+from robot import Robot, JogSession, JogSessionError, eRobotCommand
+from simulator import DRVSimulator
+
+
+class TestJogSession(unittest.TestCase):
+
+    def setUp(self):
+        self.writes = []
+
+    def test_skipsUnchangedDirection(self):
+        with JogSession(self.writes.append, deadmanTimeout=1) as session:
+            for _ in range(10):
+                session.jog(eRobotCommand.Continue_JOG_X_Positive)
+            session.jog(eRobotCommand.Continue_JOG_Y_Negative)
+            session.jog(eRobotCommand.Motion_Stop)
+            session.jog(eRobotCommand.Motion_Stop)
+        self.assertEqual(self.writes, [eRobotCommand.Continue_JOG_X_Positive, eRobotCommand.Continue_JOG_Y_Negative,
+                                       eRobotCommand.Motion_Stop, eRobotCommand.Motion_Stop])
+        with self.assertRaises(JogSessionError):
+            session.jog(eRobotCommand.Continue_JOG_X_Positive)
+
+    def test_rejectsNonJogCommand(self):
+        session = JogSession(self.writes.append)
+        with self.assertRaises(ValueError):
+            session.jog(eRobotCommand.Robot_Go_MovL)
+
+    def test_deadmanStops(self):
+        stopped = []
+        session = JogSession(self.writes.append, deadmanTimeout=0.05, onDeadman=lambda: stopped.append(True))
+        session.start()
+        session.jog(eRobotCommand.Continue_JOG_Z_Positive)
+        time.sleep(0.2)
+        self.assertEqual(self.writes, [eRobotCommand.Continue_JOG_Z_Positive, eRobotCommand.Motion_Stop])
+        self.assertEqual((session.deadmanCount, stopped), (1, [True]))
+        session.close()
+
+    def test_heartbeatResends(self):
+        session = JogSession(self.writes.append, deadmanTimeout=1, heartbeatInterval=0.04)
+        session.start()
+        session.jog(eRobotCommand.Continue_JOG_Z_Positive)
+        time.sleep(0.15)
+        session.close()
+        self.assertGreaterEqual(self.writes.count(eRobotCommand.Continue_JOG_Z_Positive), 3)
+        self.assertEqual(self.writes[-1], eRobotCommand.Motion_Stop)
+
+
+class TestJogSessionWithSimulator(unittest.TestCase):
+
+    def test_jogMovesAndDeadmanStops(self):
+        with DRVSimulator(servoEnabled=True) as simulator:
+            robotDRV = Robot(host=simulator.host, port=simulator.port)
+            try:
+                startPose = simulator.pose
+                session = robotDRV.startJogSession(speed=50, deadmanTimeout=0.1)
+                simulator.resetCounters()
+                for _ in range(5):
+                    session.jog(eRobotCommand.Continue_JOG_X_Positive)
+                    time.sleep(0.02)
+                self.assertTrue(simulator.isMoving)
+                self.assertLessEqual(simulator.totalRequests, 4)     # 速度與命令只寫入一次
+                time.sleep(0.3)
+                self.assertFalse(simulator.isMoving)
+                self.assertGreater(simulator.pose[0], startPose[0])
+                session.close()
+
+                simulator.injectError(controllerError=1)
+                with self.assertRaises(JogSessionError):
+                    robotDRV.startJogSession()
+            finally:
+                robotDRV.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
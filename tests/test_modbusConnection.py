@@ -0,0 +1,82 @@
+import unittest
+from pymodbus.exceptions import ConnectionException
+from robot.classModbusConnection import ModbusConnection, ModbusConnectionError
+
+class FakeResponse:
+    def __init__(self, registers=()):
+        self.registers = list(registers)
+
+    def isError(self):
+        return False
+
+class FakeClient:
+    """
+    可模擬斷線的ModbusTcpClient：failRequests次請求失敗，connect()在refuseConnects次之後才成功
+    """
+    def __init__(self, failRequests=0, refuseConnects=0):
+        self.failRequests = failRequests
+        self.refuseConnects = refuseConnects
+        self.isOpen = False
+        self.connectCount = 0
+        self.requestCount = 0
+
+    def connect(self):
+        self.connectCount += 1
+        if self.refuseConnects > 0:
+            self.refuseConnects -= 1
+            return False
+        self.isOpen = True
+        return True
+
+    def is_socket_open(self):
+        return self.isOpen
+
+    def close(self):
+        self.isOpen = False
+
+    def read_holding_registers(self, address, count, unit):
+        self.requestCount += 1
+        if self.failRequests > 0:
+            self.failRequests -= 1
+            raise ConnectionException("connection reset")
+        return FakeResponse([address] * count)
+
+class TestModbusConnection(unittest.TestCase):
+
+    def createConnection(self, client, **kwargs):
+        self.reconnects = 0
+        def onReconnect():
+            self.reconnects += 1
+        return ModbusConnection(client, reconnectDelay=0.001, onReconnect=onReconnect, **kwargs)
+
+    def test_readRetriedAfterReconnect(self):
+        client = FakeClient(failRequests=1)
+        connection = self.createConnection(client)
+        response = connection.execute(lambda c: c.read_holding_registers(0x00F0, 2, 2), retry=True)
+        self.assertEqual(response.registers, [0x00F0, 0x00F0])
+        self.assertEqual(client.requestCount, 2)
+        self.assertEqual(self.reconnects, 1)
+
+    def test_writeNotRetried(self):
+        client = FakeClient(failRequests=1)
+        connection = self.createConnection(client)
+        with self.assertRaises(ModbusConnectionError):
+            connection.execute(lambda c: c.read_holding_registers(0x0300, 1, 2), retry=False)
+        self.assertEqual(client.requestCount, 1)
+        self.assertFalse(connection.isConnected())
+
+    def test_reconnectBackoff(self):
+        client = FakeClient(refuseConnects=2)
+        connection = self.createConnection(client, reconnectAttempts=3)
+        connection.ensureConnected()
+        self.assertEqual(client.connectCount, 3)
+        self.assertEqual(self.reconnects, 0)    # 第一次連線不算重連
+
+    def test_reconnectGivesUp(self):
+        connection = self.createConnection(FakeClient(refuseConnects=10), reconnectAttempts=2)
+        with self.assertRaises(ModbusConnectionError):
+            connection.ensureConnected()
+        self.assertFalse(connection.checkHealth())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import math
+import unittest
+
+from robot import Robot, MotionQueue, RobotErrorException, eRobotCommand
+from simulator import DRVSimulator
+
+ROBOT_COMMAND = 0x0300
+ACCELERATION = 0x030A
+SPEED = 0x0324
+DIGITAL_OUTPUT = 0x02FE
+
+ABOVE_PICK = [400.0, 0.0, 300.0, 180.0, 0.0, 90.0]
+PICK = [400.0, 0.0, 250.0, 180.0, 0.0, 90.0]
+DROP = [300.0, 100.0, 300.0, 180.0, 0.0, 90.0]
+
+
+class TestMotionQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=True, timeScale=0.02)
+        self.simulator.start()
+        self.writes: list[tuple[int, list[int]]] = []
+        writeRegisters = self.simulator.writeRegisters
+
+        def recordWrites(address, values):
+            self.writes.append((address, list(values)))
+            writeRegisters(address, values)
+
+        self.simulator.writeRegisters = recordWrites
+        self.robot = Robot(host=self.simulator.host, port=self.simulator.port)
+        self.writes.clear()
+
+    def tearDown(self):
+        self.robot.connection.close()
+        self.simulator.stop()
+
+    def writesTo(self, address: int) -> list[int]:
+        """
+        寫入到address的值(依寫入順序)
+        """
+        return [values[address - start] for start, values in self.writes if start <= address < start + len(values)]
+
+    def test_runSkipsRepeatedParametersAndKeepsStepOrder(self):
+        queue = MotionQueue(self.robot, moveTimeout=5)
+        queue.append(ABOVE_PICK, speed=50, acceleration=40, deceleration=40)
+        queue.append(PICK)
+        queue.addAction(Robot.suctionON)
+        queue.append(ABOVE_PICK, speed=50, acceleration=40)
+        queue.append(DROP, speed=80)
+        queue.addAction(Robot.suctionOFF)
+
+        progress = queue.execute()
+
+        self.assertEqual([p.index for p in progress], list(range(6)))
+        self.assertTrue(all(p.total == 6 for p in progress))
+        self.assertLess(math.dist(self.simulator.pose, DROP), 0.01)
+        self.assertEqual(self.writesTo(SPEED), [50, 80])
+        self.assertEqual(self.writesTo(ACCELERATION), [40])
+        # 運動命令與吸盤動作依佇列順序送出
+        events = [("command", values[0]) if start == ROBOT_COMMAND else ("io", values[0])
+                  for start, values in self.writes if start in (ROBOT_COMMAND, DIGITAL_OUTPUT)]
+        movL = eRobotCommand.Robot_Go_MovL.value
+        self.assertEqual(events, [("command", movL), ("command", movL), ("io", 1),
+                                  ("command", movL), ("command", movL), ("io", 0)])
+
+    def test_positionlessStepWaitsForCompletion(self):
+        queue = MotionQueue(self.robot, moveTimeout=5)
+        queue.append(ABOVE_PICK, speed=100)
+        queue.append(robotCommand=eRobotCommand.Robot_All_Joints_Homing_To_Origin)
+        for progress in queue.run():
+            self.assertFalse(self.simulator.isMoving)
+            if progress.step.robotCommand == eRobotCommand.Robot_All_Joints_Homing_To_Origin:
+                self.assertIsNone(progress.step.position)
+                self.assertLess(math.dist(self.simulator.pose, self.simulator.homePose), 0.01)
+        self.assertEqual(progress.index, 1)
+        self.assertGreater(progress.elapsed, 0)
+
+    def test_runChecksReadinessOnce(self):
+        self.simulator.injectError(controllerError=12)
+        queue = MotionQueue(self.robot, moveTimeout=1).append(ABOVE_PICK)
+        with self.assertRaises(RobotErrorException):
+            queue.execute()
+        self.assertEqual(self.writesTo(ROBOT_COMMAND), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
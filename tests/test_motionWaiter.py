@@ -0,0 +1,57 @@
+import time
+import unittest
+from robot.classMotionWaiter import MotionWaiter
+
+class FakeMotion:
+    """
+    以固定速度沿X軸移動到目標的假機器人，記錄讀取次數
+    """
+    def __init__(self, target, duration):
+        self.target = target
+        self.duration = duration
+        self.startTime = time.monotonic()
+        self.reads = []
+
+    def readFields(self, *fields):
+        self.reads.append(fields)
+        progress = min(1.0, (time.monotonic() - self.startTime) / self.duration)
+        pose = [self.target[0] * progress] + list(self.target[1:])
+        return {"robotMotionState": 0 if progress >= 1.0 else 1,
+                "tcpPose": pose,
+                "poseFlag": 1 if progress >= 1.0 else 2}
+
+class TestMotionWaiter(unittest.TestCase):
+
+    def test_waitWithTargetUsesOneCoalescedRead(self):
+        target = (100.0, 0, 0, 0, 0, 0)
+        motion = FakeMotion(target, 0.2)
+        values = MotionWaiter(motion.readFields, maxInterval=0.05).wait(target, timeout=2)
+        self.assertEqual(values["robotMotionState"], 0)
+        self.assertTrue(all(fields == ("robotMotionState", "tcpPose") for fields in motion.reads))
+
+    def test_detectsCompletionPromptly(self):
+        target = (100.0, 0, 0, 0, 0, 0)
+        motion = FakeMotion(target, 0.2)
+        MotionWaiter(motion.readFields, maxInterval=0.1).wait(target, timeout=2)
+        self.assertLess(time.monotonic() - motion.startTime, 0.2 + 0.05)
+
+    def test_waitWithoutTargetUsesPoseFlag(self):
+        motion = FakeMotion((0, 0, 0, 0, 0, 0), 0.05)
+        MotionWaiter(motion.readFields).wait(timeout=2)
+        self.assertTrue(all(fields == ("poseFlag",) for fields in motion.reads))
+
+    def test_timeout(self):
+        motion = FakeMotion((100.0, 0, 0, 0, 0, 0), 10)
+        with self.assertRaises(TimeoutError):
+            MotionWaiter(motion.readFields).wait((100.0, 0, 0, 0, 0, 0), timeout=0.05)
+
+    def test_waitAsyncCallback(self):
+        target = (10.0, 0, 0, 0, 0, 0)
+        motion = FakeMotion(target, 0.05)
+        done = []
+        future = MotionWaiter(motion.readFields).waitAsync(target, timeout=2, callback=done.append)
+        self.assertEqual(future.result(timeout=2)["robotMotionState"], 0)
+        self.assertEqual(done, [future])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from robot.poseCodec import decodePose, encodePose, decodePoses, encodePoses, decodeInt32, encodeInt32
+
+# x=1.0, y=-1.0, z=70000.0(超過16位元), rx=0, ry=0.5, rz=-180.0
+POSE = (1.0, -1.0, 70000.0, 0.0, 0.5, -180.0)
+REGISTERS = [1000, 0, 0xFC18, 0xFFFF, 0x1D80, 0x042C, 0, 0, 500, 0, 0x40E0, 0xFFFD]
+
+class TestPoseCodec(unittest.TestCase):
+
+    def test_encodePose(self):
+        self.assertEqual(encodePose(POSE), REGISTERS)
+
+    def test_decodePose(self):
+        for actual, expected in zip(decodePose(REGISTERS), POSE):
+            self.assertAlmostEqual(actual, expected)
+
+    def test_encodeTruncatesLikeInt(self):
+        registers = encodePose([0.0019, -0.0019, 0, 0, 0, 0])
+        self.assertEqual(decodeInt32(registers)[:2], (1, -1))
+
+    def test_int32RoundTrip(self):
+        values = [0, 1, -1, 2**31 - 1, -2**31]
+        self.assertEqual(list(decodeInt32(encodeInt32(values))), values)
+
+    def test_batch(self):
+        poses = np.array([POSE, [0.001] * 6])
+        registers = encodePoses(poses)
+        self.assertEqual(registers.shape, (2, 12))
+        self.assertEqual(registers[0].tolist(), REGISTERS)
+        np.testing.assert_allclose(decodePoses(registers), poses)
+        np.testing.assert_allclose(decodePoses(registers.ravel().tolist()), poses)
+
+if __name__ == '__main__':
+    unittest.main()
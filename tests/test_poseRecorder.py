@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from robot import Robot, PoseRecorder, POSE_SAMPLE_DTYPE, eRobotCommand, encodePose
+from simulator import DRVSimulator
+
+
+class FakeController:
+    """
+    以遞增的位姿回應讀取，x為第幾次讀取
+    """
+    def __init__(self):
+        self.reads = 0
+
+    def __call__(self, address: int, count: int) -> list[int]:
+        self.reads += 1
+        registers = [0] * count
+        registers[0] = self.reads % 2
+        registers[16:28] = encodePose([self.reads, -self.reads, 300.5, 180.0, 0.0, -90.0])
+        return registers
+
+
+class TestPoseRecorder(unittest.TestCase):
+
+    def test_sampleDecodesPoseAndState(self):
+        recorder = PoseRecorder(FakeController(), capacity=4)
+        recorder.sampleOnce()
+        samples = recorder.latest()
+        self.assertEqual(samples.dtype, POSE_SAMPLE_DTYPE)
+        self.assertEqual(len(samples), 1)
+        np.testing.assert_allclose(samples["pose"][0], [1, -1, 300.5, 180, 0, -90])
+        self.assertEqual(samples["motionState"][0], 1)
+
+    def test_latestIsOrderedZeroCopyView(self):
+        recorder = PoseRecorder(FakeController(), capacity=4)
+        for _ in range(7):
+            recorder.sampleOnce()
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(len(recorder), 4)
+        samples = recorder.latest()
+        np.testing.assert_allclose(samples["pose"][:, 0], [4, 5, 6, 7])
+        self.assertTrue(np.all(np.diff(samples["timestamp"]) >= 0))
+        np.testing.assert_allclose(recorder.latest(2)["pose"][:, 0], [6, 7])
+        self.assertFalse(samples.flags.owndata)
+        self.assertFalse(samples.flags.writeable)
+
+    def test_spillWritesChunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = PoseRecorder(FakeController(), capacity=4, spillDirectory=directory, chunkSize=3)
+            recorder.start()
+            recorder.stop()
+            for _ in range(8):
+                recorder.sampleOnce()
+            recorder.start()
+            recorder.stop()
+            samples = PoseRecorder.loadSpilledChunks(directory)
+            count = recorder.count
+            self.assertEqual(len(samples), count)
+            np.testing.assert_allclose(samples["pose"][:, 0], np.arange(1, count + 1))
+            self.assertGreaterEqual(len(os.listdir(directory)), 3)
+
+    def test_recordsSimulatedMotion(self):
+        with DRVSimulator(servoEnabled=True, timeScale=0.05) as simulator:
+            robotDRV = Robot(host=simulator.host, port=simulator.port)
+            try:
+                with robotDRV.createPoseRecorder(rate=100, capacity=1000) as recorder:
+                    robotDRV.sendMotionCommand([400.0, 0.0, 300.0, 180.0, 0.0, 90.0], speed=100,
+                                               robotCommand=eRobotCommand.Robot_Go_MovL)
+                    robotDRV.waitRobotReachTargetPosition(timeout=5)
+                    time.sleep(0.05)
+                samples = recorder.latest()
+                self.assertGreater(len(samples), 5)
+                self.assertIn(1, samples["motionState"])
+                np.testing.assert_allclose(samples["pose"][-1], [400, 0, 300, 180, 0, 90], atol=0.01)
+            finally:
+                robotDRV.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
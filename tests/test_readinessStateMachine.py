@@ -0,0 +1,91 @@
+import asyncio
+import time
+import unittest
+from robot import Robot, AsyncRobot, ReadinessStateMachine, eReadinessState, SERVO_ENABLE_VALUE
+from simulator import DRVSimulator
+
+def readinessValues(servoEnabled=True, controllerError=0, teachPanelState=0):
+    servo = SERVO_ENABLE_VALUE if servoEnabled else 0
+    return {"robotMotionState": 0, "tcpPose": [0.0] * 6, "robotSystemState": 0, "operationMode": 3,
+            "teachPanelState": teachPanelState, "jointsError": [0] * 16, "robotGroupError": 0,
+            "controllerError": controllerError,
+            "servoEnableJ1J2": servo, "servoEnableJ3J4": servo, "servoEnableJ5J6": servo}
+
+class TestReadinessStateMachine(unittest.TestCase):
+
+    def test_alreadyReady(self):
+        step = ReadinessStateMachine().update(readinessValues(), now=0)
+        self.assertEqual(step.state, eReadinessState.READY)
+
+    def test_onlyNeededActions(self):
+        step = ReadinessStateMachine().update(readinessValues(servoEnabled=False), now=0)
+        self.assertEqual((step.state, step.resetErrors, step.enableServo),
+                         (eReadinessState.ENABLING_SERVO, False, True))
+        step = ReadinessStateMachine().update(readinessValues(controllerError=5), now=0)
+        self.assertEqual((step.state, step.resetErrors, step.enableServo),
+                         (eReadinessState.RESETTING_ERRORS, True, True))
+
+    def test_minEnableTime(self):
+        machine = ReadinessStateMachine(minEnableTime=0.5)
+        machine.update(readinessValues(servoEnabled=False), now=0)
+        self.assertEqual(machine.update(readinessValues(), now=0.1).state, eReadinessState.WAITING_READY)
+        self.assertEqual(machine.update(readinessValues(), now=0.6).state, eReadinessState.READY)
+
+    def test_servoReadback(self):
+        # 預設寫入一次啟用後不再要求讀回0x0101
+        machine = ReadinessStateMachine()
+        self.assertEqual(machine.update(readinessValues(servoEnabled=False), now=0).state,
+                         eReadinessState.ENABLING_SERVO)
+        self.assertEqual(machine.update(readinessValues(servoEnabled=False), now=0.1).state,
+                         eReadinessState.READY)
+        machine = ReadinessStateMachine(checkServoReadback=True)
+        machine.update(readinessValues(servoEnabled=False), now=0)
+        self.assertEqual(machine.update(readinessValues(servoEnabled=False), now=0.1).state,
+                         eReadinessState.WAITING_READY)
+        self.assertIn("伺服未啟用", machine.reason)
+        self.assertEqual(machine.update(readinessValues(), now=0.2).state, eReadinessState.READY)
+
+    def test_retryThenFail(self):
+        progress = []
+        machine = ReadinessStateMachine(retryTimes=2, retryDelay=0.5, attemptTimeout=1, progressCallback=progress.append)
+        values = readinessValues(teachPanelState=1)
+        steps = [machine.update(values, now=now).state for now in (0, 0.5, 1.0, 1.5, 2.0, 2.5)]
+        self.assertEqual(steps, [eReadinessState.WAITING_READY, eReadinessState.WAITING_READY,
+                                 eReadinessState.RETRY_DELAY, eReadinessState.WAITING_READY,
+                                 eReadinessState.WAITING_READY, eReadinessState.FAILED])
+        self.assertEqual(progress[-1].attempt, 2)
+        self.assertIn("教導盒", progress[-1].reason)
+
+class TestPrepareRobotForMotion(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=False)
+        self.simulator.start()
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_returnsAsSoonAsReady(self):
+        robot = Robot(host=self.simulator.host, port=self.simulator.port)
+        self.simulator.injectError(robotGroupError=7)
+        startTime = time.monotonic()
+        self.assertTrue(robot.prepareRobotForMotion())
+        self.assertLess(time.monotonic() - startTime, 1)
+        self.assertTrue(self.simulator.isReadyForMotion)
+        robot.connection.close()
+
+    def test_timeout(self):
+        robot = Robot(host=self.simulator.host, port=self.simulator.port)
+        self.simulator.setTeachPanelState(True)
+        self.assertFalse(robot.prepareRobotForMotion(timeout=0.2))
+        robot.connection.close()
+
+    def test_async(self):
+        async def run():
+            async with AsyncRobot(host=self.simulator.host, port=self.simulator.port) as robot:
+                return await robot.prepareRobotForMotion(timeout=2)
+        self.assertTrue(asyncio.run(run()))
+        self.assertTrue(self.simulator.isServoEnabled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import importlib
+import importlib.util
+import sys
+import time
+import unittest
+
+import numpy as np
+
+from realsense import DepthProcessor, FrameGrabber, RealSenseCamera, StreamProfile
+
+
+class FakeFrame:
+    def __init__(self, data):
+        self.data = data
+
+    def __bool__(self):
+        return self.data is not None
+
+    def get_data(self):
+        return self.data
+
+
+class FakeFrameset:
+    def __init__(self, number):
+        self.number = number
+        self.color = np.full((4, 6, 3), number % 256, dtype=np.uint8)
+
+    def get_color_frame(self):
+        return FakeFrame(self.color)
+
+    def get_depth_frame(self):
+        return FakeFrame(None)
+
+    def get_frame_number(self):
+        return self.number
+
+    def get_timestamp(self):
+        return self.number * 33.3
+
+
+class FakePipeline:
+    """
+    每5ms產生一組影像，第failAt組逾時
+    """
+    def __init__(self, failAt=None):
+        self.count = 0
+        self.failAt = failAt
+
+    def wait_for_frames(self, timeoutMs):
+        time.sleep(0.005)
+        self.count += 1
+        if self.count == self.failAt:
+            raise RuntimeError("Frame didn't arrive within timeout")
+        return FakeFrameset(self.count)
+
+
+class TestRealSenseImport(unittest.TestCase):
+
+    def test_importDoesNotStartCamera(self):
+        module = importlib.import_module("realsense.realsense")
+        self.assertIsNone(module._camera)
+        camera = RealSenseCamera([StreamProfile("color", 640, 480, "rgb8", 30)])
+        self.assertFalse(camera.isStarted)
+        camera.stop()       # 未啟動時停止不做任何事
+
+    @unittest.skipIf(importlib.util.find_spec("pyrealsense2") is not None, "已安裝pyrealsense2")
+    def test_startWithoutDriverRaises(self):
+        with self.assertRaises(ImportError):
+            RealSenseCamera().start()
+        self.assertNotIn("pyrealsense2", sys.modules)
+
+
+class TestFrameGrabber(unittest.TestCase):
+
+    def test_latestFrameIsZeroCopyAndReadOnly(self):
+        with FrameGrabber(FakePipeline()) as grabber:
+            packet = grabber.waitForFrame(timeout=1)
+            self.assertEqual(packet.sequence, 1)
+            self.assertEqual(packet.frameNumber, 1)
+            self.assertIsNone(packet.depth)
+            self.assertTrue(np.shares_memory(packet.color, packet.frameset.color))
+            self.assertFalse(packet.color.flags.writeable)
+
+    def test_framesSkipsStaleFramesAndSurvivesTimeouts(self):
+        grabber = FrameGrabber(FakePipeline(failAt=2), bufferSize=3)
+        with grabber:
+            sequences = []
+            for packet in grabber.frames(timeout=1):
+                sequences.append(packet.sequence)
+                time.sleep(0.02)    # 處理比取像慢
+                if len(sequences) == 4:
+                    break
+            recent = grabber.recent()
+        self.assertEqual(sequences, sorted(set(sequences)))
+        self.assertGreater(sequences[-1] - sequences[0], 3)
+        self.assertEqual(len(recent), 3)
+        self.assertEqual(grabber.errorCount, 1)
+
+    def test_waitAfterStopRaises(self):
+        grabber = FrameGrabber(FakePipeline())
+        grabber.start()
+        grabber.waitForFrame(timeout=1)
+        grabber.stop()
+        self.assertFalse(grabber.isRunning)
+        with self.assertRaises(RuntimeError):
+            grabber.waitForFrame(after=grabber.frameCount, timeout=1)
+
+    def test_immediateFailuresBackOffAndStopGrabber(self):
+        class StoppedPipeline:
+            calls = 0
+
+            def wait_for_frames(self, timeoutMs):
+                self.calls += 1
+                raise RuntimeError("wait_for_frames cannot be called before start()")
+
+        pipeline = StoppedPipeline()
+        grabber = FrameGrabber(pipeline, timeoutMs=100, maxFailures=4)
+        grabber.start()
+        with self.assertRaises(RuntimeError) as context:
+            list(grabber.frames(timeout=2))
+        self.assertIsInstance(context.exception.__cause__, RuntimeError)
+        self.assertEqual(pipeline.calls, 4)
+        self.assertIs(grabber.failure, grabber.lastError)
+        grabber.stop()
+        self.assertFalse(grabber.isRunning)
+
+    def test_failureWhileConsumerIsProcessingRaises(self):
+        class FailingPipeline:
+            calls = 0
+
+            def wait_for_frames(self, timeoutMs):
+                self.calls += 1
+                if self.calls > 2:
+                    raise RuntimeError("wait_for_frames cannot be called before start()")
+                return FakeFrameset(self.calls)
+
+        grabber = FrameGrabber(FailingPipeline(), timeoutMs=100, maxFailures=2)
+        received = []
+        with grabber:
+            with self.assertRaises(RuntimeError) as context:
+                for packet in grabber.frames(timeout=2):
+                    received.append(packet.sequence)
+                    time.sleep(0.2)     # 處理期間取像執行緒失敗並停止
+        self.assertIsInstance(context.exception.__cause__, RuntimeError)
+        self.assertIsNotNone(grabber.failure)
+        self.assertEqual(len(received), 1)
+
+
+class RecordingFilter:
+    """
+    記錄收到的輸入，輸出為輸入加上名稱與累積的處理次數(模擬temporal濾波器跨幀的狀態)
+    """
+    def __init__(self, name):
+        self.name = name
+        self.inputs = []
+
+    def process(self, frame):
+        self.inputs.append(frame)
+        return f"{frame}>{self.name}{len(self.inputs)}"
+
+
+class FakeDepthFrameset:
+    def __init__(self, number):
+        self.number = number
+
+    def get_depth_frame(self):
+        return f"d{self.number}"
+
+
+class FakeDepthPipeline:
+    def __init__(self):
+        self.count = 0
+
+    def wait_for_frames(self, timeoutMs):
+        self.count += 1
+        return FakeDepthFrameset(self.count)
+
+
+class FakePoints:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def get_vertices(self):
+        return np.array([[0.0, 0.0, 0.0], [0.1, 0.2, 0.5]], dtype=np.float32)
+
+
+class FakePointCloud:
+    def __init__(self):
+        self.frames = []
+
+    def calculate(self, frame):
+        self.frames.append(frame)
+        return FakePoints(frame)
+
+
+class TestDepthProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.spatial = RecordingFilter("spatial")
+        self.temporal = RecordingFilter("temporal")
+        self.pointCloud = FakePointCloud()
+        self.processor = DepthProcessor(filters=[self.spatial, self.temporal], pointCloud=self.pointCloud)
+
+    def test_filtersAreChained(self):
+        self.assertEqual(self.processor.process(FakeDepthFrameset(1)), "d1>spatial1>temporal1")
+        self.assertEqual(self.temporal.inputs, ["d1>spatial1"])
+
+    def test_captureKeepsFilterStateAcrossCalls(self):
+        pipeline = FakeDepthPipeline()
+        self.processor.capture(pipeline, sampleLength=3)
+        points = self.processor.capture(pipeline, sampleLength=2, removeInvalid=True)
+        self.assertEqual(self.pointCloud.frames, ["d3>spatial3>temporal3", "d5>spatial5>temporal5"])
+        self.assertEqual(points.shape, (1, 3))
+        self.assertEqual(self.processor.frameCount, 5)
+
+    def test_streamYieldsOnePointCloudPerFrame(self):
+        clouds = list(self.processor.stream(FakeDepthPipeline(), count=4))
+        self.assertEqual(len(clouds), 4)
+        self.assertEqual(clouds[0].shape, (2, 3))
+        self.assertEqual(len(self.temporal.inputs), 4)
+
+    def test_noFiltersNeedsNoDriver(self):
+        processor = DepthProcessor(pointCloud=FakePointCloud())
+        self.assertEqual(processor.filters, [])
+        self.assertEqual(processor.process("d1"), "d1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from robot.registerMap import (RegisterField, eRegisterType, planRegisterReads, decodeReadBlocks,
+                               MODBUS_MAX_READ_COUNT)
+
+class TestRegisterMap(unittest.TestCase):
+
+    def test_singleField(self):
+        blocks = planRegisterReads(["poseFlag"])
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual((blocks[0].address, blocks[0].count), (0x031F, 1))
+
+    def test_mergeWithinGap(self):
+        # 0x0138, 0x0139, 0x013B 之間的間隙很小，應合併為一次讀取
+        blocks = planRegisterReads(["robotSystemState", "operationMode", "teachPanelState"])
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual((blocks[0].address, blocks[0].count), (0x0138, 4))
+
+    def test_splitWhenGapTooLarge(self):
+        blocks = planRegisterReads(["robotSystemState", "teachPanelState"], maxGap=0)
+        self.assertEqual(len(blocks), 2)
+
+    def test_respectMaxCount(self):
+        # 0x0140~0x01FF 超過125個寄存器，錯誤碼至少要兩次讀取
+        blocks = planRegisterReads(["controllerError", "robotGroupError", "jointsError"])
+        self.assertEqual(len(blocks), 2)
+        for block in blocks:
+            self.assertLessEqual(block.count, MODBUS_MAX_READ_COUNT)
+
+    def test_unknownField(self):
+        with self.assertRaises(KeyError):
+            planRegisterReads(["notExist"])
+
+    def test_decode(self):
+        custom = RegisterField("custom", 0x0010, 1, eRegisterType.INT16)
+        blocks = planRegisterReads([custom, RegisterField("pair", 0x0012, 2, eRegisterType.INT32, 0.001)])
+        self.assertEqual(len(blocks), 1)
+        values = decodeReadBlocks(blocks, [[0xFFFF, 0, 0x86A0, 0x0001]])
+        self.assertEqual(values["custom"], -1)
+        self.assertAlmostEqual(values["pair"], 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from robot.classRegisterShadow import RegisterShadow
+
+class TestRegisterShadow(unittest.TestCase):
+
+    def setUp(self):
+        self.shadow = RegisterShadow()
+
+    def test_unknownIsChanged(self):
+        self.assertFalse(self.shadow.isUnchanged(0x0324, [10]))
+
+    def test_updateAndCompare(self):
+        self.shadow.update(0x0330, [1, 2, 3])
+        self.assertTrue(self.shadow.isUnchanged(0x0330, [1, 2, 3]))
+        self.assertTrue(self.shadow.isUnchanged(0x0331, [2]))
+        self.assertFalse(self.shadow.isUnchanged(0x0330, [1, 2, 4]))
+        self.assertFalse(self.shadow.isUnchanged(0x0330, [1, 2, 3, 4]))
+
+    def test_invalidate(self):
+        self.shadow.update(0x0324, [10])
+        self.shadow.update(0x030A, [20])
+        self.shadow.invalidate(0x0324)
+        self.assertNotIn(0x0324, self.shadow)
+        self.assertIn(0x030A, self.shadow)
+        self.shadow.invalidate()
+        self.assertEqual(len(self.shadow), 0)
+
+    def test_verifyDropsExternalChanges(self):
+        self.shadow.update(0x0324, [10])
+        self.shadow.update(0x030A, [20])
+        mismatches = self.shadow.verify(lambda addresses: {0x0324: 10, 0x030A: 99})
+        self.assertEqual(mismatches, [0x030A])
+        self.assertEqual(self.shadow.get(0x0324), 10)
+        self.assertIsNone(self.shadow.get(0x030A))
+
+if __name__ == '__main__':
+    unittest.main()
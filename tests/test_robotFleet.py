@@ -0,0 +1,57 @@
+import time
+import unittest
+from robot import Robot, RobotFleet, FleetError, eRobotCommand, eReadinessState
+from simulator import DRVSimulator
+
+class TestRobotFleet(unittest.TestCase):
+
+    def setUp(self):
+        self.simulators = {name: DRVSimulator(servoEnabled=True, timeScale=0.05) for name in ("left", "right")}
+        for simulator in self.simulators.values():
+            simulator.start()
+        self.fleet = RobotFleet.fromHosts({name: (simulator.host, simulator.port)
+                                           for name, simulator in self.simulators.items()})
+
+    def tearDown(self):
+        self.fleet.close()
+        for simulator in self.simulators.values():
+            simulator.stop()
+
+    def test_mapRunsConcurrently(self):
+        startTime = time.monotonic()
+        results = self.fleet.map(lambda robot: time.sleep(0.2) or robot.getRobotPoseFlag())
+        self.assertLess(time.monotonic() - startTime, 0.35)
+        self.assertEqual(results, {"left": 1, "right": 1})
+
+    def test_snapshotAndErrors(self):
+        self.simulators["right"].injectError(controllerError=3)
+        snapshot = self.fleet.getSnapshot()
+        self.assertFalse(snapshot.isAllReadyForMotion)
+        self.assertEqual(snapshot.errorRobots, ["right"])
+        self.assertIn("right", snapshot.notReadyReasons)
+
+    def test_fanOutMotionAndIO(self):
+        targets = {"left": [400, 0, 300, 180, 0, 90], "right": [300, 100, 300, 180, 0, 90]}
+        self.fleet.sendMotionCommandAll(targets, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL)
+        self.fleet.waitAllReachTargetPosition(timeout=5)
+        for name, target in targets.items():
+            self.assertEqual([round(value, 3) for value in self.simulators[name].pose], target)
+        self.fleet.setIOAll(0b101)
+        self.assertEqual([simulator.getRegister(0x02FE) for simulator in self.simulators.values()], [0b101, 0b101])
+
+    def test_prepareAllForwardsOptions(self):
+        self.simulators["right"].injectError(controllerError=3)
+        progress = []
+        results = self.fleet.prepareAll(timeout=2, progressCallback=lambda name, p: progress.append((name, p.state)),
+                                        pollInterval=0.01)
+        self.assertEqual(results, {"left": True, "right": True})
+        self.assertIn(("right", eReadinessState.RESETTING_ERRORS), progress)
+        self.assertIn(("left", eReadinessState.READY), progress)
+
+    def test_errorsCollected(self):
+        with self.assertRaises(FleetError) as context:
+            self.fleet.map(lambda robot: robot.setIO(99, True))
+        self.assertEqual(set(context.exception.errors), {"left", "right"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from robot.classRobotStatusSnapshot import RobotStatusSnapshot, STATUS_FIELDS
+from robot.registerMap import planRegisterReads, decodeReadBlocks
+
+class TestRobotStatusSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.registers = {}
+
+    def setRegister(self, address, value):
+        self.registers[address] = value
+
+    def decodeSnapshot(self, fields=STATUS_FIELDS):
+        blocks = planRegisterReads(fields)
+        blockRegisters = [[self.registers.get(block.address + i, 0) for i in range(block.count)] for block in blocks]
+        return RobotStatusSnapshot.fromFields(decodeReadBlocks(blocks, blockRegisters))
+
+    def test_statusFieldsNeedTwoReads(self):
+        self.assertEqual(len(planRegisterReads(STATUS_FIELDS)), 2)
+
+    def test_readyWhenNoError(self):
+        snapshot = self.decodeSnapshot()
+        self.assertTrue(snapshot.isRobotReadyForMotion)
+        self.assertFalse(snapshot.isRobotError)
+        self.assertIsNone(snapshot.isRobotReachTargetPosition)
+        self.assertEqual(snapshot.notReadyReason, "")
+
+    def test_decodeErrorsAndStates(self):
+        self.setRegister(0x01FF, 7)
+        self.setRegister(0x01E0, 3)
+        self.setRegister(0x0140, 11)       # J5
+        self.setRegister(0x014F, 22)       # J4
+        self.setRegister(0x013B, 1)
+        self.setRegister(0x0139, 3)
+        self.setRegister(0x00E0, 1)
+        self.setRegister(0x031F, 1)
+        snapshot = self.decodeSnapshot(STATUS_FIELDS + ("poseFlag",))
+
+        self.assertEqual(snapshot.errorCode, (7, 3, [0, 0, 0, 22, 11, 0]))
+        self.assertEqual(snapshot.operationMode, 3)
+        self.assertEqual(snapshot.robotMotionState, 1)
+        self.assertTrue(snapshot.isRobotReachTargetPosition)
+        self.assertFalse(snapshot.isRobotReadyForMotion)
+        self.assertIn("教導盒未釋放控制權", snapshot.notReadyReason)
+
+    def test_decodePose(self):
+        # -1.5 -> -1500 (0xFFFFFA24)，字序為低位在前
+        self.setRegister(0x00F0, 0xFA24)
+        self.setRegister(0x00F1, 0xFFFF)
+        self.setRegister(0x00FA, 0x86A0)   # Rz = 100.0 -> 100000 (0x000186A0)
+        self.setRegister(0x00FB, 0x0001)
+        snapshot = self.decodeSnapshot()
+        self.assertAlmostEqual(snapshot.tcpPose[0], -1.5)
+        self.assertAlmostEqual(snapshot.tcpPose[5], 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
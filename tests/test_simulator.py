@@ -0,0 +1,98 @@
+import asyncio
+import math
+import unittest
+from robot import Robot, AsyncRobot, ModbusConnection, RequestErrorException, eRobotCommand
+from simulator import DRVSimulator
+
+TARGET = [400.0, 0.0, 300.0, 180.0, 0.0, 90.0]
+
+class TestSimulatorWithRobot(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=True, timeScale=0.05)
+        self.simulator.start()
+        self.robot = Robot(host=self.simulator.host, port=self.simulator.port)
+
+    def tearDown(self):
+        self.robot.connection.close()
+        self.simulator.stop()
+
+    def test_moveReachesTarget(self):
+        self.assertTrue(self.robot.isRobotReadyForMotion)
+        self.robot.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL)
+        self.robot.waitRobotReachTargetPosition(timeout=5)
+        self.assertLess(math.dist(self.robot.getTCPPose(), TARGET), 0.01)
+        self.assertEqual(self.robot.getRobotPoseFlag(), 1)
+        self.assertEqual(self.robot.getRobotMotionState(), 0)
+
+    def test_servoDisabledIgnoresMotion(self):
+        self.robot.AllAxisDisable()
+        self.robot.writeMotionCommand(eRobotCommand.Robot_Go_MovL, TARGET)
+        self.assertFalse(self.simulator.isMoving)
+        self.assertEqual(self.simulator.ignoredCommands, [eRobotCommand.Robot_Go_MovL.value])
+
+    def test_errorAndReset(self):
+        self.simulator.injectError(controllerError=12, jointsError={1: 5, 6: 7})
+        controllerError, groupError, jointsError = self.robot.getRobotErrorCode()
+        self.assertEqual(controllerError, 12)
+        self.assertEqual(jointsError, [5, 0, 0, 0, 0, 7])
+        self.assertFalse(self.robot.isRobotReadyForMotion)
+        self.robot.resetRobotError()
+        self.assertFalse(self.robot.isRobotError)
+
+    def test_readReconnectsAfterDrop(self):
+        self.robot.getTCPPose()
+        self.simulator.failRequests(1, exceptionCode=None)
+        self.assertEqual(len(self.robot.getTCPPose()), 6)
+        self.assertEqual(self.robot.connection.reconnectCount, 1)
+
+    def test_requestCounts(self):
+        self.simulator.resetCounters()
+        self.robot.getRobotStatusSnapshot()
+        self.assertEqual(self.simulator.requestCounts[0x03], 2)
+
+    def test_readErrorReportsUsedConnection(self):
+        other = DRVSimulator()
+        other.start()
+        connection = ModbusConnection.fromHost(other.host, other.port)
+        try:
+            other.failRequests(1)
+            with self.assertRaises(RequestErrorException) as context:
+                self.robot.readRegisters(0x0000, connection=connection)
+            self.assertIn(f"{other.host}:{other.port}", str(context.exception))
+        finally:
+            connection.close()
+            other.stop()
+
+class TestSimulatorWithAsyncRobot(unittest.TestCase):
+
+    def test_asyncMove(self):
+        async def run(host, port):
+            async with AsyncRobot(host=host, port=port) as robot:
+                await robot.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL)
+                await robot.waitRobotReachTargetPosition(timeout=5)
+                return await robot.getTCPPose()
+
+        with DRVSimulator(servoEnabled=True, timeScale=0.05) as simulator:
+            pose = asyncio.run(run(simulator.host, simulator.port))
+        self.assertLess(math.dist(pose, TARGET), 0.01)
+
+    def test_asyncHomingAfterMoveDoesNotWaitForOldTarget(self):
+        async def run(host, port):
+            async with AsyncRobot(host=host, port=port) as robot:
+                await robot.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL, block=True)
+                await robot.sendMotionCommand(speed=100, robotCommand=eRobotCommand.Robot_All_Joints_Homing_To_Origin)
+                self.assertIsNone(robot.latestMotionCommand)
+                await robot.waitRobotReachTargetPosition(timeout=5)
+                pose = await robot.getTCPPose()
+                await robot.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL)
+                await robot.motionStop()
+                self.assertIsNone(robot.latestMotionCommand)
+                return pose
+
+        with DRVSimulator(servoEnabled=True, timeScale=0.05) as simulator:
+            pose = asyncio.run(run(simulator.host, simulator.port))
+            self.assertLess(math.dist(pose, simulator.homePose), 0.01)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import time
+import unittest
+
+from robot import Robot, TelemetryPoller
+from simulator import DRVSimulator
+
+READ_HOLDING_REGISTERS = 0x03
+DIGITAL_OUTPUT = 0x02FE
+
+
+class TestTelemetryCache(unittest.TestCase):
+    """
+    遙測快照的讀取規則：夠新且在最近一次寫入之後讀取的快照才可以代替通訊
+    """
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=True, timeScale=0.05)
+        self.simulator.start()
+        self.robot = Robot(host=self.simulator.host, port=self.simulator.port)
+        # 輪詢週期很長：啟動時讀一次後不再讀取，之後的請求都來自getter
+        self.robot.startTelemetry(period=10, maxAge=10)
+        self.waitForSnapshot()
+        self.simulator.resetCounters()
+
+    def tearDown(self):
+        self.robot.stopTelemetry()
+        self.robot.connection.close()
+        self.simulator.stop()
+
+    def waitForSnapshot(self):
+        deadline = time.monotonic() + 2
+        while self.robot.telemetryPoller.latest is None:
+            self.assertLess(time.monotonic(), deadline, "遙測沒有產生快照")
+            time.sleep(0.005)
+
+    def reads(self) -> int:
+        return self.simulator.requestCounts[READ_HOLDING_REGISTERS]
+
+    def test_freshSnapshotServesGettersWithoutRequests(self):
+        pose = self.robot.getTCPPose()
+        self.robot.getRobotPoseFlag()
+        self.robot.getRobotErrorCode()
+        self.assertEqual(self.reads(), 0)
+        self.assertAlmostEqual(pose[2], self.simulator.pose[2], places=3)
+
+    def test_snapshotOlderThanMaxAgeIsNotUsed(self):
+        time.sleep(0.05)
+        self.robot.getTCPPose(maxAge=0.02)
+        self.assertEqual(self.reads(), 1)
+        self.robot.telemetryMaxAge = 0.02
+        self.robot.getTCPPose()
+        self.assertEqual(self.reads(), 2)
+
+    def test_maxAgeZeroForcesRead(self):
+        self.robot.getTCPPose(maxAge=0)
+        self.assertEqual(self.reads(), 1)
+
+    def test_snapshotTakenBeforeLastWriteIsStale(self):
+        self.robot.getRobotPoseFlag()
+        self.assertEqual(self.reads(), 0)
+        self.robot.writeRegister(DIGITAL_OUTPUT, 1)
+        self.robot.getRobotPoseFlag()
+        self.assertEqual(self.reads(), 1)
+        self.robot.telemetryPoller.pollOnce()    # 寫入後的新快照又可以使用
+        self.simulator.resetCounters()
+        self.robot.getRobotPoseFlag()
+        self.assertEqual(self.reads(), 0)
+
+    def test_fieldsMissingFromSnapshotAreRead(self):
+        self.robot.readFieldsCached("digitalOutput")
+        self.assertEqual(self.reads(), 1)
+
+
+class TestTelemetrySnapshot(unittest.TestCase):
+
+    def test_snapshotValuesAreImmutable(self):
+        poller = TelemetryPoller(lambda *fields: {"tcpPose": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0], "poseFlag": 1},
+                                 fields=("tcpPose", "poseFlag"))
+        snapshot = poller.pollOnce()
+        self.assertEqual(snapshot["tcpPose"], (1.0, 2.0, 3.0, 4.0, 5.0, 6.0))
+        with self.assertRaises(TypeError):
+            snapshot.values["poseFlag"] = 2
+        with self.assertRaises(AttributeError):
+            snapshot["tcpPose"].append(7.0)
+
+    def test_cachedReadReturnsPrivateLists(self):
+        with DRVSimulator(servoEnabled=True) as simulator:
+            robot = Robot(host=simulator.host, port=simulator.port)
+            robot.startTelemetry(period=10, maxAge=10)
+            try:
+                while robot.telemetryPoller.latest is None:
+                    time.sleep(0.005)
+                values = robot.readFieldsCached("tcpPose", "jointsError")
+                self.assertIsInstance(values["tcpPose"], list)
+                values["jointsError"][0] = 99
+                self.assertEqual(robot.getRobotErrorCode()[2], [0] * 6)
+            finally:
+                robot.stopTelemetry()
+                robot.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
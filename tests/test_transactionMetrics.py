@@ -0,0 +1,57 @@
+import unittest
+from robot import Robot, TransactionMetrics, TransactionRecord
+from simulator import DRVSimulator
+
+class TestTransactionMetrics(unittest.TestCase):
+
+    def test_prometheusHistogram(self):
+        metrics = TransactionMetrics(buckets=(0.001, 0.01))
+        metrics.record(TransactionRecord(0x03, 0x00F0, 12, 0.0005, "ok", 0, "Robot.getTCPPose", 0.0))
+        metrics.record(TransactionRecord(0x03, 0x00F0, 12, 0.005, "ok", 1, "Robot.getTCPPose", 0.0))
+        metrics.record(TransactionRecord(0x03, 0x00F0, 12, 0.5, "exception", 0, "Robot.getTCPPose", 0.0))
+        text = metrics.toPrometheus()
+        labels = 'function_code="3",call_site="Robot.getTCPPose"'
+        self.assertIn(f'drv_modbus_transactions_total{{{labels},outcome="ok"}} 2', text)
+        self.assertIn(f'drv_modbus_retries_total{{{labels}}} 1', text)
+        self.assertIn(f'drv_modbus_transaction_duration_seconds_bucket{{{labels},le="0.001"}} 1', text)
+        self.assertIn(f'drv_modbus_transaction_duration_seconds_bucket{{{labels},le="0.01"}} 2', text)
+        self.assertIn(f'drv_modbus_transaction_duration_seconds_bucket{{{labels},le="+Inf"}} 3', text)
+        row = metrics.summary()[0]
+        self.assertEqual((row["transactions"], row["errors"], row["registers"]), (3, 1, 36))
+
+class TestRobotTransactionListener(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=True)
+        self.simulator.start()
+        self.robot = Robot(host=self.simulator.host, port=self.simulator.port)
+        self.records = []
+        self.robot.addTransactionListener(self.records.append)
+
+    def tearDown(self):
+        self.robot.connection.close()
+        self.simulator.stop()
+
+    def test_callSiteAndFunctionCode(self):
+        self.robot.getTCPPose()
+        self.robot.suctionON()
+        self.assertEqual([(r.functionCode, r.callSite) for r in self.records],
+                         [(0x03, "Robot.getTCPPose"), (0x06, "Robot.suctionON")])
+        self.assertEqual(self.records[0].count, 12)
+
+    def test_labelAndRetry(self):
+        self.simulator.failRequests(1, exceptionCode=None)
+        with self.robot.transactionLabel("visionLoop"):
+            self.robot.getTCPPose()
+        self.assertEqual(self.records[-1].callSite, "visionLoop")
+        self.assertEqual(self.records[-1].retries, 1)
+        self.assertEqual(self.records[-1].outcome, "ok")
+
+    def test_exceptionOutcome(self):
+        self.simulator.failRequests(1)
+        with self.assertRaises(Exception):
+            self.robot.getRobotPoseFlag()
+        self.assertEqual(self.records[-1].outcome, "exception")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from robot import (Robot, AsyncRobot, eRobotCommand, FieldCondition, InputCondition, PoseReachedCondition,
+                   waitForCondition)
+from simulator import DRVSimulator
+
+TARGET = [400.0, 0.0, 300.0, 180.0, 0.0, 90.0]
+
+
+class TestWaitCondition(unittest.TestCase):
+
+    def test_compositeConditionMergesFields(self):
+        condition = InputCondition(2) & PoseReachedCondition(TARGET) | ~FieldCondition("robotWarning", lambda value: value == 0)
+        self.assertEqual(set(condition.fields), {"digitalInput", "robotMotionState", "tcpPose", "robotWarning"})
+        values = {"digitalInput": 0b100, "robotMotionState": 0, "tcpPose": TARGET, "robotWarning": 0}
+        self.assertTrue(condition.evaluate(values))
+        self.assertFalse(condition.evaluate(dict(values, digitalInput=0)))
+        self.assertTrue(condition.evaluate(dict(values, digitalInput=0, robotWarning=3)))
+
+    def test_timeoutAndSingleReadPerPoll(self):
+        calls = []
+        def readFields(*fields):
+            calls.append(fields)
+            return {"digitalInput": 0, "poseFlag": 1}
+        with self.assertRaises(TimeoutError):
+            waitForCondition(readFields, InputCondition(0) & PoseReachedCondition(), timeout=0.05)
+        self.assertTrue(all(fields == ("digitalInput", "poseFlag") for fields in calls))
+
+
+class TestWaitConditionWithSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = DRVSimulator(servoEnabled=True, timeScale=0.05)
+        self.simulator.start()
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_waitForInput(self):
+        robotDRV = Robot(host=self.simulator.host, port=self.simulator.port)
+        try:
+            robotDRV.io.nameInputs(vacuum=1)
+            threading.Timer(0.1, self.simulator.setDigitalInput, (0b10,)).start()
+            startTime = time.monotonic()
+            robotDRV.waitForInput("vacuum", True, timeout=2)
+            self.assertLess(time.monotonic() - startTime, 0.5)
+            with self.assertRaises(TimeoutError):
+                robotDRV.waitForInput(0, True, timeout=0.05)
+        finally:
+            robotDRV.connection.close()
+
+    def test_waitForInputAndMotion(self):
+        robotDRV = Robot(host=self.simulator.host, port=self.simulator.port)
+        try:
+            self.simulator.setDigitalInput(0b1)
+            robotDRV.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL)
+            values = robotDRV.waitUntil(InputCondition(0) & robotDRV.targetReachedCondition(), timeout=5)
+            self.assertEqual(values["robotMotionState"], 0)
+            self.assertFalse(self.simulator.isMoving)
+        finally:
+            robotDRV.connection.close()
+
+    def test_asyncWaitForInput(self):
+        async def run():
+            async with AsyncRobot(host=self.simulator.host, port=self.simulator.port) as asyncRobot:
+                asyncio.get_running_loop().call_later(0.05, self.simulator.setDigitalInput, 0b1000)
+                await asyncRobot.waitForInput(3, True, timeout=2)
+                asyncRobot.io.nameInputs(vacuum=3)
+                await asyncRobot.waitForInput("vacuum", True, timeout=2)
+                with self.assertRaises(KeyError):
+                    await asyncRobot.waitForInput("gripper", timeout=2)
+        asyncio.run(run())
+
+    def test_asyncTargetConditionAfterHoming(self):
+        async def run():
+            async with AsyncRobot(host=self.simulator.host, port=self.simulator.port) as asyncRobot:
+                await asyncRobot.sendMotionCommand(TARGET, speed=100, robotCommand=eRobotCommand.Robot_Go_MovL, block=True)
+                await asyncRobot.sendMotionCommand(speed=100, robotCommand=eRobotCommand.Robot_All_Joints_Homing_To_Origin)
+                condition = asyncRobot.targetReachedCondition()
+                self.assertIsNone(condition.targetPose)
+                await asyncRobot.waitUntil(condition, timeout=5)
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
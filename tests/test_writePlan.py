@@ -0,0 +1,47 @@
+import unittest
+from robot.classRegisterShadow import RegisterShadow
+from robot.classWritePlan import WritePlan, WriteBlock
+
+class TestWritePlan(unittest.TestCase):
+
+    def setUp(self):
+        self.shadow = RegisterShadow()
+
+    def test_commandIsLast(self):
+        plan = WritePlan(self.shadow)
+        plan.setCommand(0x0300, 301)
+        plan.add(0x0330, [1, 2, 3])
+        plan.add(0x0324, 50)
+        blocks = plan.build()
+        self.assertEqual(blocks[-1], WriteBlock(0x0300, (301,)))
+        self.assertEqual(blocks[:-1], [WriteBlock(0x0324, (50,)), WriteBlock(0x0330, (1, 2, 3))])
+
+    def test_contiguousMerged(self):
+        plan = WritePlan(self.shadow)
+        plan.add(0x0330, [1, 2])
+        plan.add(0x0332, [3, 4])
+        self.assertEqual(plan.build(), [WriteBlock(0x0330, (1, 2, 3, 4))])
+
+    def test_skipUnchanged(self):
+        self.shadow.update(0x0324, [50])
+        plan = WritePlan(self.shadow)
+        plan.add(0x0324, 50, skipIfUnchanged=True)
+        plan.add(0x030A, 20, skipIfUnchanged=True)
+        self.assertEqual(plan.build(), [WriteBlock(0x030A, (20,))])
+
+    def test_gapFilledOnlyWhenKnown(self):
+        plan = WritePlan(self.shadow, maxGap=2)
+        plan.add(0x0330, 1)
+        plan.add(0x0333, 4)
+        self.assertEqual(len(plan.build()), 2)
+        self.shadow.update(0x0331, [2, 3])
+        self.assertEqual(plan.build(), [WriteBlock(0x0330, (1, 2, 3, 4))])
+
+    def test_maxCount(self):
+        plan = WritePlan(self.shadow, maxCount=4)
+        plan.add(0x0330, list(range(6)))
+        blocks = plan.build()
+        self.assertEqual([len(block.values) for block in blocks], [4, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,2 +1,3 @@
 from .R_TRIG import *
 from .csvListUtils import readListFromCsv, writeListToCsv, appendListToCsv
+from .classCameraModel import CameraModel, getCameraModel, clearCameraModels
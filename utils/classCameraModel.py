@@ -0,0 +1,220 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+
+DEFAULT_MAX_CAMERA_MODELS = 8       # getCameraModel()最多保留的相機數
+DEFAULT_MAX_RESOLUTIONS = 4         # 每個相機最多保留幾種解析度的射線/去畸變映射表
+
+
+class CameraModel:
+    """
+    相機模型(內部參數與畸變係數)與由它衍生的預先計算結果
+
+    每張影像都要用到的資料只計算一次，並依解析度快取(超過maxResolutions時淘汰最久未使用的)：
+    - cameraMatrixInv: 內部參數矩陣的逆矩陣
+    - rayGrid(): 每個像素在深度為1時的3D座標(射線)，反投影深度圖用
+    - undistortMaps(): cv2.initUndistortRectifyMap()的映射表，去畸變時以cv2.remap()取代cv2.undistort()
+
+    快取的陣列為唯讀並由所有呼叫端共用。
+    通常以getCameraModel()取得，同一組參數會得到同一個物件。
+
+    使用方法:
+    camera = getCameraModel(K, D)
+    rays = camera.rayGrid(480, 640)
+    mapX, mapY = camera.undistortMaps(480, 640)
+    undistorted = cv2.remap(frame, mapX, mapY, cv2.INTER_LINEAR)
+    """
+    def __init__(self,
+                 cameraMatrix: Sequence[Sequence[float]],
+                 distCoeffs: Optional[Sequence[float]] = None,
+                 maxResolutions: int = DEFAULT_MAX_RESOLUTIONS):
+        """
+        參數:
+        cameraMatrix: 3x3相機內部參數矩陣
+        distCoeffs: 畸變係數，None表示不畸變
+        maxResolutions: 每種快取最多保留幾種解析度
+        """
+        cameraMatrix = np.array(cameraMatrix, dtype=np.float64)
+        if cameraMatrix.shape != (3, 3):
+            raise ValueError(f"cameraMatrix應為3x3矩陣，但收到 {cameraMatrix.shape}")
+        distCoeffs = np.zeros(5) if distCoeffs is None else np.array(distCoeffs, dtype=np.float64).ravel()
+        cameraMatrixInv = np.linalg.inv(cameraMatrix)
+        for array in (cameraMatrix, distCoeffs, cameraMatrixInv):
+            array.flags.writeable = False
+        self.cameraMatrix = cameraMatrix
+        self.distCoeffs = distCoeffs
+        self.cameraMatrixInv = cameraMatrixInv
+        self.maxResolutions = maxResolutions
+        self.__lock = threading.Lock()
+        self.__rayGrids: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.__undistortMaps: OrderedDict[tuple, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+
+    @classmethod
+    def fromIntrinsics(cls, intrinsics, **kwargs) -> "CameraModel":
+        """
+        由RealSense的rs.intrinsics(fx, fy, ppx, ppy, coeffs)建立
+        """
+        cameraMatrix = [[intrinsics.fx, 0, intrinsics.ppx],
+                        [0, intrinsics.fy, intrinsics.ppy],
+                        [0, 0, 1]]
+        return cls(cameraMatrix, list(intrinsics.coeffs), **kwargs)
+
+    @property
+    def key(self) -> tuple[bytes, bytes]:
+        """
+        getCameraModel()快取用的鍵
+        """
+        return cameraModelKey(self.cameraMatrix, self.distCoeffs)
+
+    @property
+    def hasDistortion(self) -> bool:
+        return bool(np.any(self.distCoeffs))
+
+    @property
+    def fx(self) -> float:
+        return float(self.cameraMatrix[0, 0])
+
+    @property
+    def fy(self) -> float:
+        return float(self.cameraMatrix[1, 1])
+
+    @property
+    def cx(self) -> float:
+        return float(self.cameraMatrix[0, 2])
+
+    @property
+    def cy(self) -> float:
+        return float(self.cameraMatrix[1, 2])
+
+    def rayGrid(self, height: int, width: int) -> np.ndarray:
+        """
+        每個像素在深度為1時的3D座標(射線)，即 cameraMatrix^-1 · (u, v, 1)
+        (不含畸變，與原本depthToPointCloud()的計算相同)
+
+        返回:
+        np.ndarray: (height, width, 3) float32 唯讀陣列
+        """
+        resolution = (int(height), int(width))
+        rays = self.__getCached(self.__rayGrids, resolution)
+        if rays is None:
+            v, u = np.mgrid[0:resolution[0], 0:resolution[1]]
+            pixels = np.stack((u, v, np.ones_like(u)), axis=-1).astype(np.float64) # 每個像素的齊次座標 (u, v, 1)
+            rays = (pixels @ self.cameraMatrixInv.T).astype(np.float32) # 與 cameraMatrixInv · (u, v, 1) 相同
+            rays.flags.writeable = False
+            self.__putCached(self.__rayGrids, resolution, rays)
+        return rays
+
+    def pixelsToRays(self, pixels: Sequence[Sequence[float]]) -> np.ndarray:
+        """
+        將像素座標轉換為深度為1的3D座標(不含畸變)
+
+        參數:
+        pixels: (N, 2)像素座標(u, v)
+
+        返回:
+        np.ndarray: (N, 3) float64
+        """
+        pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        return pixels @ self.cameraMatrixInv[:, :2].T + self.cameraMatrixInv[:, 2]
+
+    def undistortMaps(self, height: int, width: int,
+                      newCameraMatrix: Optional[Sequence[Sequence[float]]] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        cv2.initUndistortRectifyMap()的映射表(CV_16SC2)，供cv2.remap()去畸變
+
+        參數:
+        height, width: 影像大小
+        newCameraMatrix: 去畸變後的內部參數矩陣，None表示與cameraMatrix相同
+
+        返回:
+        tuple[np.ndarray, np.ndarray]: (map1, map2) 唯讀陣列
+        """
+        import cv2      # 只有去畸變需要OpenCV
+
+        newCameraMatrix = self.cameraMatrix if newCameraMatrix is None else np.asarray(newCameraMatrix, dtype=np.float64)
+        cacheKey = (int(height), int(width), newCameraMatrix.tobytes())
+        maps = self.__getCached(self.__undistortMaps, cacheKey)
+        if maps is None:
+            maps = cv2.initUndistortRectifyMap(self.cameraMatrix, self.distCoeffs, None, newCameraMatrix,
+                                               (int(width), int(height)), cv2.CV_16SC2)
+            for array in maps:
+                array.flags.writeable = False
+            self.__putCached(self.__undistortMaps, cacheKey, maps)
+        return maps
+
+    def clearCache(self):
+        """
+        清除所有依解析度快取的資料
+        """
+        with self.__lock:
+            self.__rayGrids.clear()
+            self.__undistortMaps.clear()
+
+    def __getCached(self, cache: OrderedDict, key):
+        with self.__lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def __putCached(self, cache: OrderedDict, key, value):
+        with self.__lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.maxResolutions:
+                cache.popitem(last=False)
+
+    def __repr__(self) -> str:
+        return f"CameraModel(fx={self.fx:.3f}, fy={self.fy:.3f}, cx={self.cx:.3f}, cy={self.cy:.3f})"
+
+
+def cameraModelKey(cameraMatrix: Sequence[Sequence[float]],
+                   distCoeffs: Optional[Sequence[float]] = None) -> tuple[bytes, bytes]:
+    """
+    以參數的數值作為鍵(畸變係數全為0與None視為相同)
+    """
+    cameraMatrix = np.asarray(cameraMatrix, dtype=np.float64)
+    distCoeffs = np.zeros(0) if distCoeffs is None else np.asarray(distCoeffs, dtype=np.float64).ravel()
+    if not np.any(distCoeffs):
+        distCoeffs = np.zeros(0)
+    return cameraMatrix.tobytes(), distCoeffs.tobytes()
+
+
+_cameraModels: OrderedDict[tuple[bytes, bytes], CameraModel] = OrderedDict()
+_cameraModelsLock = threading.Lock()
+maxCameraModels = DEFAULT_MAX_CAMERA_MODELS
+
+
+def getCameraModel(cameraMatrix: Sequence[Sequence[float]],
+                   distCoeffs: Optional[Sequence[float]] = None) -> CameraModel:
+    """
+    依內部參數與畸變係數取得共用的CameraModel
+
+    同一組參數返回同一個物件(其射線與去畸變映射表的快取也因此共用)；
+    同時使用多台相機時，超過maxCameraModels台後淘汰最久未使用的
+    """
+    if isinstance(cameraMatrix, CameraModel):
+        return cameraMatrix
+    key = cameraModelKey(cameraMatrix, distCoeffs)
+    with _cameraModelsLock:
+        model = _cameraModels.get(key)
+        if model is not None:
+            _cameraModels.move_to_end(key)
+            return model
+    model = CameraModel(cameraMatrix, distCoeffs)
+    with _cameraModelsLock:
+        model = _cameraModels.setdefault(key, model)
+        _cameraModels.move_to_end(key)
+        while len(_cameraModels) > maxCameraModels:
+            _cameraModels.popitem(last=False)
+    return model
+
+
+def clearCameraModels():
+    """
+    清除getCameraModel()的快取
+    """
+    with _cameraModelsLock:
+        _cameraModels.clear()